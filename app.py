@@ -1,31 +1,183 @@
+import time
+
+# 앱 모듈 임포트 시간 측정 시작 (가벼운 모듈만 즉시 임포트)
+_import_start = time.perf_counter()
+
+import io
 import os
+import gzip
 import json
 import uuid
-import torch
-from flask import Flask, render_template, request, jsonify
-import soundfile as sf
-import numpy as np
+import shutil
+import logging
+import tempfile
+import zipfile
+import threading
+import importlib
+import functools
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 
-# 인퍼런스 모듈 불러오기
-from inference.speech_analysis import analyze_wav_file
+# 오디오/모델 스택(torch, librosa, numpy)은 처음 필요할 때 임포트
+from jobs import JobManager, JobQueueFull
+from storage import UploadStorage
+from inference.metrics import metrics, span, request_trace, record_fallback
+from inference.batch import STATUS_OK, STATUS_EMPTY, STATUS_ERROR, EMPTY_FALLBACK_REASONS
+from inference.result_format import COMPACT_FORMAT, to_compact
 
 app = Flask(__name__)
 
 # 상수 정의
-UPLOAD_FOLDER = 'static/uploads'
+# 업로드 녹음 저장소 (저장소가 보관 기간/크기 상한에 따라 파일을 삭제하므로 버전 관리 밖의 전용 디렉터리)
+UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads'))
 ALLOWED_EXTENSIONS = {'wav'}
 MODEL_PATH = 'models/best_voice_model.pt'
+SSE_KEEPALIVE_SEC = 15  # SSE 연결 유지용 주석 전송 주기(초)
+IMPORT_TIME_BUDGET_SEC = 0.5  # app 모듈 임포트 시간 목표 (오디오 스택 제외)
+LOG_FORMAT = '%(asctime)s %(levelname)s [%(threadName)s] %(name)s: %(message)s'
+MSGPACK_MIMETYPE = 'application/msgpack'
+COMPRESSIBLE_MIMETYPES = {'application/json', MSGPACK_MIMETYPE}
+GZIP_LEVEL = 6
 
 # 앱 설정
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB 제한
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_MB', 16)) * 1024 * 1024  # 업로드 크기 제한 (긴 레슨 녹음은 늘려서 사용)
+app.config['ANALYSIS_WORKERS'] = int(os.environ.get('ANALYSIS_WORKERS', 2))        # 동시 분석 작업 수
+app.config['ANALYSIS_MAX_PENDING'] = int(os.environ.get('ANALYSIS_MAX_PENDING', 16))  # 대기 작업 최대 수
+app.config['UPLOAD_TTL_SEC'] = int(os.environ.get('UPLOAD_TTL_SEC', 7 * 24 * 3600))          # 녹음 보관 기간 (0이면 무제한)
+app.config['UPLOAD_MAX_BYTES'] = int(os.environ.get('UPLOAD_MAX_BYTES', 1024 * 1024 * 1024))  # 녹음 저장소 총 크기 상한
+app.config['UPLOAD_COMPRESS'] = os.environ.get('UPLOAD_COMPRESS', '0') == '1'               # 분석 후 FLAC 압축 여부
+app.config['UPLOAD_PERSIST'] = os.environ.get('UPLOAD_PERSIST', '1') == '1'                 # 업로드 녹음 디스크 보관 여부
+app.config['PRELOAD_AUDIO_STACK'] = os.environ.get('PRELOAD_AUDIO_STACK', '1') == '1'       # 서버 시작(start_background_tasks) 직후 백그라운드에서 오디오 스택 로드
+app.config['WARMUP_ENABLED'] = os.environ.get('WARMUP_ENABLED', '1') == '1'                 # 오디오 스택 로드 후 합성 톤 워밍업
+app.config['LOG_LEVEL'] = os.environ.get('LOG_LEVEL', 'INFO').upper()                       # 로그 수준 (DEBUG면 단계별 소요 시간도 기록)
+app.config['INCLUDE_TIMINGS'] = os.environ.get('INCLUDE_TIMINGS', '0') == '1'               # 분석 결과에 단계별 소요 시간 포함 (요청별로는 timings=1)
+app.config['BATCH_CONCURRENCY'] = int(os.environ.get('BATCH_CONCURRENCY', 2))               # 일괄 업로드 하나에서 동시에 분석할 파일 수 상한
+app.config['BATCH_WORKERS'] = int(os.environ.get('BATCH_WORKERS', 2))                       # 모든 일괄 업로드가 공유하는 분석 작업자 수
+app.config['BATCH_MAX_FILES'] = int(os.environ.get('BATCH_MAX_FILES', 100))                 # 일괄 업로드 하나의 최대 파일 수
+app.config['RESPONSE_COMPRESSION'] = os.environ.get('RESPONSE_COMPRESSION', '1') == '1'      # Accept-Encoding에 따라 JSON 응답 gzip/brotli 압축
+app.config['COMPRESS_MIN_BYTES'] = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))           # 이보다 작은 응답은 압축하지 않음
+app.config['BATCH_MAX_UNZIPPED_BYTES'] = int(os.environ.get('BATCH_MAX_UNZIPPED_BYTES', 256 * 1024 * 1024))  # zip 압축 해제 크기 상한
+app.config['WINDOWED_MIN_SEC'] = float(os.environ.get('WINDOWED_MIN_SEC', 0))               # 이 길이 이상인 업로드는 디스크에서 블록 단위 분석 (0이면 사용 안 함)
+
+logging.basicConfig(level=app.config['LOG_LEVEL'], format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+# 업로드 저장소 (폴더가 없으면 생성, 디스크 쓰기는 백그라운드 스레드에서 처리)
+upload_storage = UploadStorage(
+    app.config['UPLOAD_FOLDER'],
+    ttl_sec=app.config['UPLOAD_TTL_SEC'],
+    max_bytes=app.config['UPLOAD_MAX_BYTES'],
+    compress=app.config['UPLOAD_COMPRESS']
+)
+
+# 오디오/모델 스택 (load_audio_stack에서 한 번만 로드)
+model_registry = None
+stream_sessions = None
+audio_stack_load_sec = None
+
+# 워밍업 상태 (/ready 응답용, start_background_tasks에서 워밍업이 끝나야 준비 완료)
+warmup_state = {'ready': False, 'warmupSec': None, 'error': None}
+_audio_stack_lock = threading.Lock()
+_background_started = False
 
-# 폴더가 없으면 생성
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# 비동기 분석 작업자 풀
+job_manager = JobManager(
+    max_workers=app.config['ANALYSIS_WORKERS'],
+    max_pending=app.config['ANALYSIS_MAX_PENDING']
+)
+
+# 일괄 분석 작업자 풀 (요청마다 풀을 만들지 않고 서버 전체에서 공유, 스레드는 첫 제출 때 생성)
+batch_executor = ThreadPoolExecutor(max_workers=max(app.config['BATCH_WORKERS'], 1), thread_name_prefix='batch')
+
+# /metrics 요청 시점에 읽는 게이지
+metrics.register_gauge('queue_depth', '대기 + 실행 중인 분석 작업 수', job_manager.queue_depth)
+metrics.register_gauge('active_streams', '진행 중인 스트리밍 분석 세션 수',
+                       lambda: stream_sessions.count() if stream_sessions is not None else 0)
+
+def load_audio_stack():
+    """
+    오디오/모델 스택을 처음 필요할 때 한 번만 로드
+
+    torch, librosa 등 무거운 모듈 임포트와 모델 로드를 여기서 수행하므로
+    '/', '/scales', '/health'는 스택이 로드되기 전에도 바로 응답할 수 있습니다.
+    """
+    global model_registry, stream_sessions, audio_stack_load_sec
+    with _audio_stack_lock:
+        if model_registry is None:
+            start = time.perf_counter()
+            from inference.model_registry import get_registry
+            from inference.streaming import StreamSessions
+            
+            # 모델을 한 번 로드 (이후 요청은 레지스트리의 모델을 재사용)
+            registry = get_registry(MODEL_PATH)
+            registry.get()
+            
+            # 녹음 중 스트리밍 분석 세션
+            stream_sessions = StreamSessions()
+            model_registry = registry
+            audio_stack_load_sec = time.perf_counter() - start
+            logger.info("오디오 스택 로드 완료 (%.2f초, 디바이스: %s)", audio_stack_load_sec, registry.device)
+    return model_registry
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+@functools.lru_cache(maxsize=None)
+def optional_module(name):
+    """선택 의존성 모듈 (설치되어 있지 않으면 None)"""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+def wants_msgpack():
+    """클라이언트가 JSON보다 msgpack 응답을 선호하고 msgpack을 사용할 수 있는지 여부"""
+    best = request.accept_mimetypes.best_match(['application/json', MSGPACK_MIMETYPE])
+    return best == MSGPACK_MIMETYPE and optional_module('msgpack') is not None
+
+def wants_compact():
+    """압축 결과 형식 요청 여부 (format=compact 또는 msgpack 응답)"""
+    result_format = request.args.get('format') or request.form.get('format')
+    return result_format == COMPACT_FORMAT or wants_msgpack()
+
+def result_payload(result):
+    """요청한 결과 형식으로 변환 (기본 형식이면 그대로)"""
+    if result is not None and wants_compact():
+        return to_compact(result)
+    return result
+
+def result_response(payload, status=200):
+    """결과 응답 (Accept가 msgpack이면 msgpack, 아니면 JSON)"""
+    if wants_msgpack():
+        body = optional_module('msgpack').packb(payload, use_bin_type=True)
+        return Response(body, status=status, mimetype=MSGPACK_MIMETYPE)
+    return jsonify(payload), status
+
+@app.after_request
+def compress_response(response):
+    """큰 JSON/msgpack 응답을 Accept-Encoding에 따라 brotli(설치된 경우) 또는 gzip으로 압축"""
+    if (not app.config['RESPONSE_COMPRESSION'] or response.direct_passthrough or response.is_streamed
+            or response.status_code != 200 or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < app.config['COMPRESS_MIN_BYTES']:
+        return response
+    
+    brotli = optional_module('brotli')
+    encoding = request.accept_encodings.best_match(['br', 'gzip'] if brotli is not None else ['gzip'])
+    if encoding == 'br':
+        response.set_data(brotli.compress(data))
+    elif encoding == 'gzip':
+        response.set_data(gzip.compress(data, compresslevel=GZIP_LEVEL))
+    else:
+        return response
+    response.headers['Content-Encoding'] = encoding
+    return response
+
 @app.route('/')
 def index():
     """메인 페이지"""
@@ -64,7 +216,15 @@ def get_scales():
 
 @app.route('/upload', methods=['POST'])
 def upload_audio():
-    """녹음된 오디오 업로드, 저장 및 분석"""
+    """
+    녹음된 오디오 업로드, 저장 및 분석
+
+    기본적으로 기존처럼 요청 안에서 분석 결과까지 반환합니다.
+    mode=async (쿼리 또는 폼 필드)를 지정하면 분석 작업을 등록하고 작업 ID를 바로 반환합니다 (202).
+    timings=1을 지정하면 분석 결과에 단계별 소요 시간(timings)을 포함합니다.
+    format=compact를 지정하면 결과를 열 배열 압축 형식(inference.result_format)으로 반환하며,
+    작업 상태/이벤트 URL에도 같은 형식이 적용됩니다.
+    """
     if 'audio' not in request.files:
         return jsonify({'error': '오디오 파일이 없습니다.'}), 400
     
@@ -78,28 +238,470 @@ def upload_audio():
     
     # 고유한 파일명 생성
     filename = f"{uuid.uuid4()}.wav"
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
     
-    # 파일 저장
-    file.save(filepath)
+    if is_windowed_upload(file):
+        # 긴 녹음은 디스크에 복사한 뒤 블록 단위로 읽으며 분석 (메모리 사용량 일정)
+        analyze, source = analyze_upload_file, spool_upload(file, filename)
+    else:
+        # 요청 본문은 메모리에서 바로 디코딩 (디스크 보관은 선택 사항이며 백그라운드에서 처리)
+        analyze, source = analyze_upload, file.read()
+        if app.config['UPLOAD_PERSIST']:
+            upload_storage.save_async(source, filename)
+    
+    mode = request.args.get('mode') or request.form.get('mode') or 'sync'
+    timings = request.args.get('timings') or request.form.get('timings')
+    include_timings = timings == '1' if timings is not None else app.config['INCLUDE_TIMINGS']
+    if mode != 'async':
+        return analyze_sync(source, filename, include_timings, analyze=analyze)
+    
+    # 작업 등록 후 바로 반환
+    try:
+        job = job_manager.submit(analyze, source, filename, include_timings=include_timings, filename=filename)
+    except JobQueueFull as e:
+        # 거절한 업로드는 보관하지 않음 (저장소에 넘긴 파일도 삭제)
+        if app.config['UPLOAD_PERSIST']:
+            upload_storage.discard_async(filename)
+        elif analyze is analyze_upload_file:
+            os.remove(source)
+        return jsonify({'error': str(e)}), 503
+    
+    logger.info("파일 '%s'에 대한 분석 작업 등록 (작업 ID: %s)", filename, job.job_id)
+    query = f'?format={COMPACT_FORMAT}' if wants_compact() else ''
+    return jsonify({
+        'success': True,
+        'jobId': job.job_id,
+        'filename': filename,
+        'statusUrl': f'/jobs/{job.job_id}{query}',
+        'eventsUrl': f'/jobs/{job.job_id}/events{query}'
+    }), 202
+
+def analyze_upload(data, filename, progress_callback=None, include_timings=False):
+    """업로드 바이트를 메모리에서 디코딩하여 분석 후 저장소에 보관 처리"""
+    from inference.audio_io import decode_audio
+    from inference.speech_analysis import analyze_audio
+    from inference.segment_utils import generate_test_result
+    
+    load_audio_stack()
+    try:
+        with request_trace() as trace:
+            try:
+                with span('load'):
+                    y, sr = decode_audio(data)
+            except Exception as e:
+                logger.error("오디오 파일 로드 중 오류 발생: %s", e)
+                record_fallback('load_error')
+                return generate_test_result(filename)
+            
+            logger.info("파일 '%s'에 대한 분석 시작... (길이: %.2f초)", filename, len(y) / sr)
+            result = analyze_audio(y, sr, filename, MODEL_PATH, progress_callback=progress_callback)
+        
+        logger.info("파일 '%s' 분석 완료 (%.2f초)", filename, trace.to_dict()['totalSec'])
+        if include_timings and result is not None:
+            result['timings'] = trace.to_dict()
+        return result
+    finally:
+        if app.config['UPLOAD_PERSIST']:
+            upload_storage.archive_async(filename)
+
+def is_windowed_upload(file):
+    """업로드를 메모리에 올리지 않고 블록 단위로 분석할지 여부 (WINDOWED_MIN_SEC)"""
+    if app.config['WINDOWED_MIN_SEC'] <= 0:
+        return False
+    from inference.windowed import use_windowed
+    return use_windowed(file.stream)
+
+def spool_upload(file, filename):
+    """
+    업로드 본문을 메모리에 모두 올리지 않고 디스크에 복사
+
+    Returns:
+    --------
+    str
+        저장한 파일 경로 (UPLOAD_PERSIST가 꺼져 있으면 분석 후 삭제할 임시 파일)
+    """
+    file.stream.seek(0)
+    if app.config['UPLOAD_PERSIST']:
+        return upload_storage.save_stream(file.stream, filename)
+    
+    fd, path = tempfile.mkstemp(suffix=os.path.splitext(filename)[1])
+    with os.fdopen(fd, 'wb') as f:
+        shutil.copyfileobj(file.stream, f)
+    return path
+
+def analyze_upload_file(path, filename, progress_callback=None, include_timings=False):
+    """디스크에 저장한 긴 업로드를 블록 단위로 분석 후 저장소에 보관 처리 (또는 임시 파일 삭제)"""
+    from inference.windowed import analyze_wav_blocks
+    
+    load_audio_stack()
+    try:
+        with request_trace() as trace:
+            result = analyze_wav_blocks(path, filename, MODEL_PATH, progress_callback=progress_callback)
+        
+        logger.info("파일 '%s' 블록 단위 분석 완료 (%.2f초)", filename, trace.to_dict()['totalSec'])
+        if include_timings and result is not None:
+            result['timings'] = trace.to_dict()
+        return result
+    finally:
+        if app.config['UPLOAD_PERSIST']:
+            upload_storage.archive_async(filename)
+        else:
+            os.remove(path)
+
+def read_batch_files(files):
+    """
+    일괄 업로드 파일 목록을 (원래 이름, 바이트) 목록으로 변환
+
+    .zip 파일은 안의 WAV 항목으로 펼칩니다.
+
+    Raises:
+    -------
+    ValueError
+        허용되지 않는 형식, 파일 수 또는 압축 해제 크기 초과
+    """
+    max_files = app.config['BATCH_MAX_FILES']
+    too_many = ValueError(f"파일이 너무 많습니다 (최대 {max_files}개).")
+    entries = []
+    for file in files:
+        name = file.filename or ''
+        if name.lower().endswith('.zip'):
+            try:
+                archive = zipfile.ZipFile(io.BytesIO(file.read()))
+            except zipfile.BadZipFile:
+                raise ValueError(f"'{name}'은 올바른 zip 파일이 아닙니다.")
+            members = [info for info in archive.infolist() if not info.is_dir() and allowed_file(info.filename)]
+            # 파일 수와 크기 상한은 항목을 압축 해제하기 전에 확인
+            if len(entries) + len(members) > max_files:
+                raise too_many
+            if sum(info.file_size for info in members) > app.config['BATCH_MAX_UNZIPPED_BYTES']:
+                raise ValueError(f"'{name}'의 압축 해제 크기가 너무 큽니다.")
+            entries += [(info.filename, archive.read(info)) for info in members]
+        elif allowed_file(name):
+            if len(entries) + 1 > max_files:
+                raise too_many
+            entries.append((name, file.read()))
+        else:
+            raise ValueError(f"허용되지 않는 파일 형식입니다: '{name}'")
+    return entries
+
+def analyze_batch_file(data, filename, include_timings=False):
+    """
+    일괄 업로드 파일 하나 분석
+
+    Returns:
+    --------
+    tuple
+        (상태, 결과 또는 None, 오류 메시지 또는 None), 상태는 inference.batch와 같음
+    """
+    try:
+        with request_trace() as trace:
+            result = analyze_upload(data, filename, include_timings=include_timings)
+    except Exception as e:
+        logger.error("파일 '%s' 분석 중 오류 발생: %s", filename, e)
+        return STATUS_ERROR, None, f'분석 중 오류 발생: {str(e)}'
+    
+    # 테스트 결과로 대체된 경우 결과 대신 원인만 전달
+    if trace.fallback is None and result is not None:
+        return STATUS_OK, result, None
+    if trace.fallback in EMPTY_FALLBACK_REASONS:
+        return STATUS_EMPTY, None, trace.fallback
+    return STATUS_ERROR, None, trace.fallback or '분석에 실패했습니다.'
+
+@app.route('/batch', methods=['POST'])
+def batch_upload():
+    """
+    여러 녹음 (audio 필드 여러 개 또는 zip) 일괄 분석
+
+    파일들은 서버 전체가 공유하는 일괄 분석 작업자 풀(BATCH_WORKERS)에서 공유 모델로 분석합니다.
+    요청 하나가 동시에 풀에 넣는 파일 수는 BATCH_CONCURRENCY 이하이며(쿼리 또는 폼 필드
+    concurrency로 낮출 수 있음), 끝나는 순서대로 파일별 결과를 NDJSON 한 줄씩 전송합니다.
+    첫 줄은 batch, 파일마다 result (status: ok/empty/error), 마지막 줄은 summary 이벤트입니다.
+    """
+    files = request.files.getlist('audio')
+    if not files:
+        return jsonify({'error': '오디오 파일이 없습니다.'}), 400
     
+    try:
+        entries = read_batch_files(files)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not entries:
+        return jsonify({'error': '분석할 WAV 파일이 없습니다.'}), 400
+    
+    concurrency = max(1, min(app.config['BATCH_CONCURRENCY'], app.config['BATCH_WORKERS']))
+    requested = request.args.get('concurrency', type=int) or request.form.get('concurrency', type=int)
+    if requested:
+        concurrency = max(1, min(requested, concurrency))
+    timings = request.args.get('timings') or request.form.get('timings')
+    include_timings = timings == '1' if timings is not None else app.config['INCLUDE_TIMINGS']
+    compact = wants_compact()
+    
+    # 요청 본문은 응답 스트리밍 전에 모두 읽어 두고 파일마다 고유한 이름으로 저장
+    batch = []
+    for index, (original_name, data) in enumerate(entries):
+        filename = f"{uuid.uuid4()}.wav"
+        if app.config['UPLOAD_PERSIST']:
+            upload_storage.save_async(data, filename)
+        batch.append((index, original_name, filename, data))
+    
+    batch_id = str(uuid.uuid4())
+    logger.info("일괄 분석 시작 (배치 ID: %s, 파일 %d개, 동시 실행 %d)", batch_id, len(batch), concurrency)
+    
+    def generate():
+        start = time.perf_counter()
+        summary = {STATUS_OK: 0, STATUS_EMPTY: 0, STATUS_ERROR: 0}
+        yield json.dumps({'type': 'batch', 'batchId': batch_id, 'files': len(batch), 'concurrency': concurrency}) + '\n'
+        
+        # 동시에 풀에 넣는 파일은 concurrency개까지 (하나가 끝나면 다음 파일 제출)
+        remaining = iter(batch)
+        futures = {}
+        
+        def submit_next():
+            item = next(remaining, None)
+            if item is not None:
+                index, original_name, filename, data = item
+                future = batch_executor.submit(analyze_batch_file, data, filename, include_timings)
+                futures[future] = (index, original_name, filename)
+        
+        for _ in range(concurrency):
+            submit_next()
+        try:
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, original_name, filename = futures.pop(future)
+                    submit_next()
+                    status, result, error = future.result()
+                    summary[status] += 1
+                    line = {'type': 'result', 'index': index, 'name': original_name, 'filename': filename, 'status': status}
+                    if result is not None:
+                        line['result'] = to_compact(result) if compact else result
+                    if error is not None:
+                        line['error'] = error
+                    yield json.dumps(line, ensure_ascii=False) + '\n'
+        finally:
+            # 클라이언트 연결이 끊기면 아직 시작하지 않은 분석은 취소 (공유 풀은 유지)
+            for future in futures:
+                future.cancel()
+        
+        elapsed = time.perf_counter() - start
+        logger.info("일괄 분석 완료 (배치 ID: %s, 성공 %d개, 세그먼트 없음 %d개, 오류 %d개, %.2f초)", batch_id,
+                    summary[STATUS_OK], summary[STATUS_EMPTY], summary[STATUS_ERROR], elapsed)
+        yield json.dumps({'type': 'summary', 'batchId': batch_id, **summary, 'elapsedSec': round(elapsed, 3)}) + '\n'
+    
+    return Response(generate(), mimetype='application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def analyze_sync(source, filename, include_timings=False, analyze=analyze_upload):
+    """요청 안에서 분석 후 결과 반환 (mode=sync, source는 analyze에 넘길 업로드 바이트 또는 경로)"""
     # 분석 진행 (새로운 미세 세그먼트 분석 적용)
     try:
-        print(f"파일 '{filepath}'에 대한 분석 시작...")
-        result = analyze_wav_file(filepath, MODEL_PATH)
+        result = analyze(source, filename, include_timings=include_timings)
         
         if result is None:
             return jsonify({'error': '분석에 실패했습니다.'}), 500
         
         # 결과 반환
-        return jsonify({'success': True, 'filename': filename, 'result': result})
+        return result_response({'success': True, 'filename': filename, 'result': result_payload(result)})
     
     except Exception as e:
+        logger.exception("분석 중 오류 발생")
         return jsonify({'error': f'분석 중 오류 발생: {str(e)}'}), 500
 
-if __name__ == '__main__':
-    # 디바이스 설정 (로그용)
-    device = torch.device('mps' if torch.backends.mps.is_available() else 'cuda' if torch.cuda.is_available() else 'cpu')
-    print(f"Using device: {device}")
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """분석 작업 상태 (진행 상황, 완료 시 결과) 반환"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+    data = job.to_dict()
+    if 'result' in data:
+        data['result'] = result_payload(data['result'])
+    return result_response(data)
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """분석 작업 진행 상황을 SSE로 전송 (progress 이벤트 후 done 또는 failed 이벤트)"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+    compact = wants_compact()
+    
+    def generate():
+        version = -1
+        while True:
+            current = job_manager.wait_for_change(job, version, SSE_KEEPALIVE_SEC)
+            if current == version:
+                yield ': keep-alive\n\n'
+                continue
+            version = current
+            
+            if job.finished:
+                data = job.to_dict()
+                if compact and data.get('result') is not None:
+                    data['result'] = to_compact(data['result'])
+                yield f"event: {job.status}\ndata: {json.dumps(data)}\n\n"
+                return
+            data = json.dumps(job.to_dict(include_result=False))
+            yield f"event: progress\ndata: {data}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/stream', methods=['POST'])
+def stream_start():
+    """
+    스트리밍 분석 세션 시작
+
+    이후 녹음 중인 PCM 청크(리틀 엔디언 float32 모노)를 /stream/<id>/chunk로 보내면
+    완료된 세그먼트 결과를 바로 받을 수 있습니다. 쿼리 sr로 입력 샘플링 레이트를 지정합니다.
+    """
+    from inference.streaming import StreamLimitReached
+    
+    input_sr = request.args.get('sr', type=int) or 22050
+    load_audio_stack()
+    try:
+        stream_id, analyzer = stream_sessions.create(MODEL_PATH, input_sr)
+    except StreamLimitReached as e:
+        return jsonify({'error': str(e)}), 503
+    logger.info("스트리밍 분석 시작 (스트림 ID: %s, 입력 샘플링 레이트: %d)", stream_id, input_sr)
+    return jsonify({
+        'success': True,
+        'streamId': stream_id,
+        'chunkUrl': f'/stream/{stream_id}/chunk',
+        'finishUrl': f'/stream/{stream_id}/finish'
+    })
+
+def read_pcm_chunk():
+    """요청 본문의 PCM 청크 디코딩"""
+    import numpy as np
+    from inference.streaming import STREAM_DTYPE
+    
+    data = request.get_data()
+    if len(data) % np.dtype(STREAM_DTYPE).itemsize:
+        raise ValueError('PCM 청크 길이가 올바르지 않습니다.')
+    return np.frombuffer(data, dtype=STREAM_DTYPE)
+
+@app.route('/stream/<stream_id>/chunk', methods=['POST'])
+def stream_chunk(stream_id):
+    """PCM 청크 추가 후 새로 완료된 세그먼트 결과 반환"""
+    analyzer = stream_sessions.get(stream_id) if stream_sessions is not None else None
+    if analyzer is None:
+        return jsonify({'error': '스트림을 찾을 수 없습니다.'}), 404
+    
+    try:
+        segments = analyzer.feed(read_pcm_chunk())
+    except Exception as e:
+        return jsonify({'error': f'분석 중 오류 발생: {str(e)}'}), 400
     
+    return jsonify({'success': True, 'segments': segments, 'receivedSec': analyzer.received_sec})
+
+@app.route('/stream/<stream_id>/finish', methods=['POST'])
+def stream_finish(stream_id):
+    """마지막 청크(선택) 처리 후 최종 분석 결과 반환"""
+    analyzer = stream_sessions.pop(stream_id) if stream_sessions is not None else None
+    if analyzer is None:
+        return jsonify({'error': '스트림을 찾을 수 없습니다.'}), 404
+    
+    try:
+        result = analyzer.finish(read_pcm_chunk())
+    except Exception as e:
+        return jsonify({'error': f'분석 중 오류 발생: {str(e)}'}), 500
+    
+    return result_response({'success': True, 'filename': analyzer.wav_key, 'result': result_payload(result)})
+
+@app.route('/model')
+def model_stats():
+    """로드된 모델 정보 (버전, 로드 시간 등) 반환"""
+    return jsonify(load_audio_stack().stats())
+
+@app.route('/storage')
+def storage_stats():
+    """업로드 저장소 상태 (파일 수, 총 크기, 삭제/압축 수 등) 반환"""
+    return jsonify(upload_storage.stats())
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """
+    단계별 지연 시간 히스토그램, 요청당 세그먼트 수, 테스트 결과 대체 횟수, 대기열 길이
+
+    기본은 Prometheus 텍스트 형식이며 format=json이면 JSON으로 반환합니다.
+    """
+    if request.args.get('format') == 'json':
+        return jsonify(metrics.snapshot())
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/cache')
+def cache_stats():
+    """분석 결과 캐시 상태 (적중/미스 수 등) 반환"""
+    from inference.result_cache import get_result_cache
+    
+    cache = get_result_cache()
+    return jsonify(cache.stats() if cache is not None else {'enabled': False})
+
+def prepare_app():
+    """오디오 스택 로드 후 워밍업 실행 (백그라운드 스레드, 워밍업 분석은 서비스 지표에 기록하지 않음)"""
+    try:
+        load_audio_stack()
+        if app.config['WARMUP_ENABLED']:
+            from inference.warmup import run_warmup
+            report = run_warmup(MODEL_PATH)
+            warmup_state['warmupSec'] = report['totalSec']
+    except Exception as e:
+        # 실패하면 준비 완료로 표시하지 않음 (/ready는 오류와 함께 계속 503)
+        warmup_state['error'] = f'워밍업 중 오류 발생: {str(e)}'
+        logger.error(warmup_state['error'])
+        return
+    warmup_state['ready'] = True
+
+@app.route('/ready')
+def ready():
+    """워밍업이 끝난 뒤에만 준비 완료 (200), 그 전이나 워밍업이 실패하면 503"""
+    status = 200 if warmup_state['ready'] else 503
+    return jsonify(dict(warmup_state, audioStackLoaded=model_registry is not None)), status
+
+@app.route('/health')
+def health():
+    """프로세스 상태 (오디오 스택 로드 여부와 관계없이 바로 응답)"""
+    return jsonify({
+        'status': 'ok',
+        'importTimeSec': import_time_sec,
+        'audioStackLoaded': model_registry is not None,
+        'audioStackLoadSec': audio_stack_load_sec
+    })
+
+def start_background_tasks():
+    """
+    서버 프로세스 시작 작업 (python app.py와 wsgi.py가 호출, 여러 번 호출해도 한 번만 실행)
+
+    업로드 저장소 정리를 예약하고, PRELOAD_AUDIO_STACK이면 오디오 스택 로드와 워밍업을
+    백그라운드 스레드에서 실행합니다. 워밍업이 끝나면 /ready가 200을 반환합니다.
+    임포트만으로는 스레드를 시작하지 않으므로 프로세스 풀 작업자가 __main__을 다시 임포트해도
+    워밍업이 중복 실행되지 않습니다. 작업자를 fork하는 WSGI 서버는 fork 뒤 작업자 프로세스에서
+    호출해야 합니다 (wsgi.py 참고).
+    """
+    global _background_started
+    with _audio_stack_lock:
+        if _background_started:
+            return
+        _background_started = True
+    
+    upload_storage.cleanup_async()
+    if app.config['PRELOAD_AUDIO_STACK']:
+        threading.Thread(target=prepare_app, name='audio-stack-loader', daemon=True).start()
+    else:
+        # 지연 로드 모드에서는 워밍업 없이 바로 준비 완료 (첫 요청이 스택 로드 비용을 부담)
+        warmup_state['ready'] = True
+
+# 임포트 시간 기록 (오디오 스택은 첫 요청 때 또는 start_background_tasks에서 로드)
+import_time_sec = time.perf_counter() - _import_start
+if import_time_sec > IMPORT_TIME_BUDGET_SEC:
+    logger.warning("app 임포트 시간 %.2f초가 목표 %s초를 초과했습니다.", import_time_sec, IMPORT_TIME_BUDGET_SEC)
+
+if __name__ == '__main__':
+    # 디버그 리로더의 감시 프로세스에서는 시작 작업을 건너뜀 (실제 서버 프로세스에서만 실행)
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_tasks()
     app.run(debug=True)
@@ -1,7 +1,23 @@
 # inference 패키지 초기화
-from inference.speech_analysis import analyze_wav_file
-from inference.pitch_analysis import group_segments_by_pitch, generate_pitch_group_feedback
-from inference.segment_utils import consolidate_segments, generate_test_result
+#
+# 하위 모듈은 torch/librosa를 임포트하므로 패키지 임포트 시점에는 불러오지 않고,
+# 아래 이름에 처음 접근할 때 해당 모듈을 임포트합니다 (PEP 562).
+import os
+import importlib
+
+# numba JIT 결과를 디스크에 캐시하여 프로세스 재시작 시 다시 컴파일하지 않음 (librosa 임포트 전에 설정)
+os.environ.setdefault(
+    'NUMBA_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'numba')
+)
+
+_LAZY_ATTRIBUTES = {
+    'analyze_wav_file': 'inference.speech_analysis',
+    'group_segments_by_pitch': 'inference.pitch_analysis',
+    'generate_pitch_group_feedback': 'inference.pitch_analysis',
+    'consolidate_segments': 'inference.segment_utils',
+    'generate_test_result': 'inference.segment_utils'
+}
 
 __all__ = [
     'analyze_wav_file',
@@ -9,4 +25,15 @@ __all__ = [
     'generate_pitch_group_feedback',
     'consolidate_segments',
     'generate_test_result'
-]
\ No newline at end of file
+]
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'inference' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,236 @@
+"""
+음 단위 적응형 세그먼트 선택
+
+기본 분석은 0.2초 격자(50% 겹침)의 모든 윈도우를 특성 추출과 모델에 넘기므로, 음계의 한 음을
+길게 내면 거의 같은 세그먼트가 수십 개 생깁니다. 적응형 모드는 같은 격자 윈도우를 다음과 같이
+음 단위로 묶고 일부만 분석합니다.
+
+1. 이어진 윈도우를 음(run)으로 묶습니다. 침묵으로 끊긴 곳, 유성/무성이 바뀌는 곳, 피치가 음의
+   첫 윈도우에서 ADAPTIVE_PITCH_TOLERANCE 반음 넘게 벗어나는 곳(글리산도는 짧은 음 여러 개가 됨),
+   윈도우 RMS가 앞 윈도우보다 ADAPTIVE_ONSET_RISE_DB 넘게 커지는 곳(같은 음을 다시 낸 경우)에서
+   새 음이 시작됩니다.
+2. 음마다 처음, 끝을 포함해 고르게 ADAPTIVE_NOTE_WINDOWS개 윈도우를 분석합니다.
+3. 같은 음 안에서 이웃한 분석 윈도우의 라벨이 다르면 그 사이 윈도우를 이분 탐색으로 더 분석하여
+   라벨이 바뀌는 곳만 원래 격자 단위로 찾습니다.
+
+분석하지 않은 윈도우는 같은 음에서 가장 가까운 분석 윈도우의 라벨을 따릅니다. 결과 세그먼트는
+분석한 윈도우마다 하나이며, 시간 범위는 그 윈도우가 대표하는 격자 윈도우 전체(시작~끝)이고
+피치는 그 범위의 평균 피치입니다. SEGMENTATION_MODE=adaptive일 때 analyze_audio가 사용하며,
+스트리밍 분석과 블록 단위 분석(inference.windowed)은 격자 방식만 지원합니다.
+"""
+import os
+
+import numpy as np
+
+from inference.silence_gate import window_rms, db_to_amplitude
+
+# 상수 정의
+ADAPTIVE_PITCH_TOLERANCE = float(os.environ.get('ADAPTIVE_PITCH_TOLERANCE', 0.5))  # 같은 음으로 보는 피치 차이 (반음)
+ADAPTIVE_ONSET_RISE_DB = float(os.environ.get('ADAPTIVE_ONSET_RISE_DB', 6.0))      # 새 음 시작으로 보는 윈도우 RMS 증가 (dB)
+ADAPTIVE_NOTE_WINDOWS = int(os.environ.get('ADAPTIVE_NOTE_WINDOWS', 3))            # 음마다 처음 분석하는 윈도우 수 (처음, 끝 포함)
+CONTIGUOUS_STEP_TOLERANCE = 0.5   # 윈도우 간격이 격자 간격의 1.5배를 넘으면 침묵으로 끊긴 것으로 봄
+
+def adaptive_params():
+    """결과에 영향을 주는 적응형 분할 파라미터 (결과 캐시 키에 포함)"""
+    return [ADAPTIVE_PITCH_TOLERANCE, ADAPTIVE_ONSET_RISE_DB, ADAPTIVE_NOTE_WINDOWS]
+
+def note_runs(start_samples, pitches, rms, step_samples, pitch_tolerance=ADAPTIVE_PITCH_TOLERANCE,
+              onset_rise_db=ADAPTIVE_ONSET_RISE_DB):
+    """
+    격자 윈도우를 음 단위로 묶은 번호
+
+    Parameters:
+    -----------
+    start_samples : numpy.ndarray
+        윈도우 시작 샘플 (시간 순)
+    pitches : numpy.ndarray
+        윈도우 평균 피치 (0이면 무성)
+    rms : numpy.ndarray
+        윈도우 평균 RMS
+    step_samples : float
+        격자 간격 (샘플)
+    pitch_tolerance : float
+        같은 음으로 보는 피치 차이 (반음)
+    onset_rise_db : float
+        새 음 시작으로 보는 RMS 증가 (dB)
+
+    Returns:
+    --------
+    numpy.ndarray
+        윈도우별 음 번호 (0부터, 감소하지 않음)
+    """
+    n = len(start_samples)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    voiced = pitches > 0
+    semitones = np.where(voiced, 12 * np.log2(np.where(voiced, pitches, 1.0)), 0.0)
+
+    # 피치와 무관한 경계 (침묵 간격, 유성/무성 전환, 음량 급증)는 한 번에 계산
+    boundary = np.zeros(n, dtype=bool)
+    boundary[0] = True
+    boundary[1:] |= np.diff(start_samples) > step_samples * (1 + CONTIGUOUS_STEP_TOLERANCE)
+    boundary[1:] |= voiced[1:] != voiced[:-1]
+    boundary[1:] |= rms[1:] > rms[:-1] * db_to_amplitude(onset_rise_db)
+
+    # 피치 경계는 음의 첫 윈도우 피치를 기준으로 차례로 판정 (서서히 변하는 피치도 나눔)
+    anchor = semitones[0]
+    boundary_list = boundary.tolist()
+    for i, (is_voiced, semitone) in enumerate(zip(voiced.tolist(), semitones.tolist())):
+        if boundary_list[i]:
+            anchor = semitone
+        elif is_voiced and abs(semitone - anchor) > pitch_tolerance:
+            boundary_list[i] = True
+            anchor = semitone
+
+    return np.cumsum(boundary_list) - 1
+
+class AdaptiveSelector:
+    """
+    분석할 격자 윈도우를 차례로 고르고 분석 결과를 모으는 선택기
+
+    initial_windows()로 첫 윈도우 목록을 받아 분석한 뒤 update()에 결과를 넘기면 더 분석할
+    윈도우 목록을 돌려줍니다. 빈 목록이 나오면 segments()로 결과를 만듭니다.
+    """
+
+    def __init__(self, segments, context, step_sec, note_windows=ADAPTIVE_NOTE_WINDOWS):
+        """
+        Parameters:
+        -----------
+        segments : list
+            split_wav_to_micro_segments 결과 (시간 순)
+        context : AnalysisContext
+            세그먼트 분할 때 사용한 분석 컨텍스트 (프레임 RMS 재사용)
+        step_sec : float
+            격자 간격(초)
+        note_windows : int
+            음마다 처음 분석하는 윈도우 수
+        """
+        sr = context.sr
+        self.starts = np.array([start_time for start_time, _, _, _ in segments], dtype=np.float64)
+        self.ends = np.array([end_time for _, end_time, _, _ in segments], dtype=np.float64)
+        self.pitches = np.array([avg_pitch for _, _, _, avg_pitch in segments], dtype=np.float64)
+        start_samples = (self.starts * sr).astype(np.int64)
+        end_samples = (self.ends * sr).astype(np.int64)
+
+        rms = window_rms(context.rms, start_samples, end_samples, context.hop_length)
+        self.runs = note_runs(start_samples, self.pitches, rms, step_sec * sr)
+        self.note_windows = max(note_windows, 1)
+
+        n = len(segments)
+        self.codes = np.full((n, 4), -1, dtype=np.int64)
+        self.labeled = np.zeros(n, dtype=bool)
+        self.tried = np.zeros(n, dtype=bool)
+        self.pending = n
+
+    @property
+    def n_windows(self):
+        return len(self.runs)
+
+    @property
+    def n_notes(self):
+        return int(self.runs[-1]) + 1 if len(self.runs) else 0
+
+    def initial_windows(self):
+        """음마다 처음, 끝을 포함해 고르게 고른 윈도우 번호"""
+        if not len(self.runs):
+            return np.zeros(0, dtype=np.int64)
+        firsts = np.flatnonzero(np.diff(self.runs, prepend=-1))
+        lasts = np.append(firsts[1:], len(self.runs)) - 1
+        picks = [np.unique(np.round(np.linspace(first, last, min(last - first + 1, self.note_windows))))
+                 for first, last in zip(firsts.tolist(), lasts.tolist())]
+        return np.concatenate(picks).astype(np.int64)
+
+    def update(self, windows, rows, codes):
+        """
+        분석 결과를 반영하고 더 분석할 윈도우 번호 반환
+
+        Parameters:
+        -----------
+        windows : array-like
+            이번에 분석한 윈도우 번호
+        rows : list
+            특성을 추출한 (유효한) 윈도우 번호
+        codes : numpy.ndarray or None
+            rows와 같은 순서의 (N, 4) 라벨 코드
+
+        Returns:
+        --------
+        numpy.ndarray
+            더 분석할 윈도우 번호 (없으면 빈 배열)
+        """
+        self.tried[windows] = True
+        if codes is not None and len(rows):
+            self.codes[rows] = codes
+            self.labeled[rows] = True
+
+        next_windows = []
+        pending = 0
+
+        # 같은 음에서 라벨이 다른 이웃 분석 윈도우 사이는 가운데 윈도우를 더 분석
+        anchors = np.flatnonzero(self.labeled)
+        left, right = anchors[:-1], anchors[1:]
+        differs = ((self.runs[left] == self.runs[right]) & (right - left > 1)
+                   & np.any(self.codes[left] != self.codes[right], axis=1))
+        for a, b in zip(left[differs].tolist(), right[differs].tolist()):
+            untried = np.flatnonzero(~self.tried[a + 1:b]) + a + 1
+            if len(untried):
+                next_windows.append(untried[len(untried) // 2])
+                pending += len(untried)
+
+        # 분석한 윈도우가 모두 무효였던 음은 남은 윈도우 중 가운데를 다시 시도
+        has_label = np.zeros(self.n_notes, dtype=bool)
+        has_label[self.runs[anchors]] = True
+        untried = np.flatnonzero(~self.tried & ~has_label[self.runs])
+        if len(untried):
+            for note_windows in np.split(untried, np.flatnonzero(np.diff(self.runs[untried])) + 1):
+                next_windows.append(note_windows[len(note_windows) // 2])
+                pending += len(note_windows)
+
+        self.pending = pending
+        return np.array(sorted(next_windows), dtype=np.int64)
+
+    def segments(self):
+        """
+        분석한 윈도우별 대표 범위
+
+        Returns:
+        --------
+        tuple
+            ((윈도우 번호 + 1, 범위 시작 시간, 범위 끝 시간, 범위 평균 피치) 목록,
+             (N, 4) 라벨 코드 또는 None, 세그먼트별 대표 격자 윈도우 수 또는 None)
+        """
+        anchors = np.flatnonzero(self.labeled)
+        if not len(anchors):
+            return [], None, None
+
+        # 윈도우마다 같은 음에서 가장 가까운 분석 윈도우 (거리가 같으면 앞 윈도우)
+        windows = np.arange(self.n_windows)
+        after = np.minimum(np.searchsorted(anchors, windows, side='left'), len(anchors) - 1)
+        before = np.maximum(np.searchsorted(anchors, windows, side='right') - 1, 0)
+        left, right = anchors[before], anchors[after]
+        left_ok = (left <= windows) & (self.runs[left] == self.runs)
+        right_ok = (right >= windows) & (self.runs[right] == self.runs)
+        use_right = right_ok & (~left_ok | (right - windows < windows - left))
+        owner = np.where(use_right, right, np.where(left_ok, left, -1))
+
+        # 분석 윈도우마다 대표 범위 (소유 관계는 연속 구간)
+        owned = np.flatnonzero(owner >= 0)
+        owner = owner[owned]
+        firsts = np.flatnonzero(np.diff(owner, prepend=-1))
+        lo = owned[firsts]
+        hi = owned[np.append(firsts[1:], len(owned)) - 1]
+
+        # 범위의 유성 윈도우 평균 피치
+        voiced = self.pitches > 0
+        pitch_sums = np.concatenate([[0.0], np.cumsum(np.where(voiced, self.pitches, 0.0))])
+        voiced_counts = np.concatenate([[0], np.cumsum(voiced)])
+        counts = voiced_counts[hi + 1] - voiced_counts[lo]
+        avg_pitches = np.where(counts > 0, (pitch_sums[hi + 1] - pitch_sums[lo]) / np.maximum(counts, 1), 0.0)
+
+        selected = owner[firsts]
+        valid_segments = [(window + 1, start_time, end_time, avg_pitch)
+                          for window, start_time, end_time, avg_pitch
+                          in zip(selected.tolist(), self.starts[lo].tolist(), self.ends[hi].tolist(),
+                                 avg_pitches.tolist())]
+        return valid_segments, self.codes[selected], hi - lo + 1
@@ -0,0 +1,78 @@
+"""
+오디오 디코딩
+
+업로드된 바이트를 디스크를 거치지 않고 soundfile로 바로 디코딩합니다.
+원본 샘플링 레이트가 분석 레이트와 같으면 리샘플링을 건너뛰고, 다르면 soxr의
+중간 품질 리샘플러를 사용합니다. 결과는 float32 모노 배열입니다.
+soundfile이 읽지 못하는 형식(브라우저 WebM 등)은 임시 파일을 거쳐 librosa로 읽습니다.
+"""
+import io
+import os
+import tempfile
+
+import librosa
+import numpy as np
+import soundfile as sf
+import soxr
+
+from inference.feature_engine import SAMPLE_RATE
+
+# 상수 정의
+RESAMPLE_QUALITY = 'MQ'   # soxr 리샘플링 품질 (librosa.load 기본값은 'HQ')
+
+def to_mono(y):
+    """(샘플 수, 채널 수) 배열을 채널 평균 모노로 변환"""
+    if y.ndim > 1:
+        y = np.mean(y, axis=1, dtype=np.float32)
+    return np.ascontiguousarray(y, dtype=np.float32)
+
+def resample(y, orig_sr, target_sr=SAMPLE_RATE):
+    """샘플링 레이트가 다를 때만 리샘플링"""
+    if orig_sr == target_sr:
+        return y
+    return soxr.resample(y, orig_sr, target_sr, quality=RESAMPLE_QUALITY).astype(np.float32, copy=False)
+
+def decode_audio(data, target_sr=SAMPLE_RATE):
+    """
+    오디오 바이트 디코딩
+
+    Parameters:
+    -----------
+    data : bytes
+        오디오 파일 내용 (WAV, FLAC, OGG 등)
+    target_sr : int
+        분석 샘플링 레이트
+
+    Returns:
+    --------
+    tuple
+        (float32 모노 오디오, 샘플링 레이트)
+    """
+    try:
+        y, sr = sf.read(io.BytesIO(data), dtype='float32', always_2d=False)
+    except Exception:
+        # soundfile이 지원하지 않는 컨테이너는 임시 파일로 librosa(audioread) 사용
+        return decode_with_librosa(data, target_sr)
+
+    return resample(to_mono(y), sr, target_sr), target_sr
+
+def decode_with_librosa(data, target_sr=SAMPLE_RATE):
+    """임시 파일을 거쳐 librosa.load로 디코딩"""
+    fd, tmp_path = tempfile.mkstemp(suffix='.audio')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        y, sr = librosa.load(tmp_path, sr=target_sr)
+        return y.astype(np.float32, copy=False), sr
+    finally:
+        os.remove(tmp_path)
+
+def load_audio(path, target_sr=SAMPLE_RATE):
+    """오디오 파일 로드 (decode_audio와 같은 경로 사용)"""
+    try:
+        y, sr = sf.read(path, dtype='float32', always_2d=False)
+    except Exception:
+        y, sr = librosa.load(path, sr=target_sr)
+        return y.astype(np.float32, copy=False), sr
+
+    return resample(to_mono(y), sr, target_sr), target_sr
@@ -0,0 +1,275 @@
+"""
+녹음 일괄 분석 (명령줄)
+
+모델이 바뀔 때 보관된 녹음 전체를 다시 분석하기 위한 도구입니다. 디렉터리(하위 디렉터리
+포함)나 파일 목록의 녹음을 프로세스 풀에서 병렬로 analyze_wav_file에 넘기며, 모델은
+작업자마다 한 번만 로드합니다. 결과는 녹음 하나당 한 줄씩 JSONL 파일에 바로 추가하므로,
+중단된 뒤 다시 실행하면 현재 모델 체크섬으로 이미 처리한 녹음을 건너뛰고 이어서 진행합니다.
+Parquet 형식을 선택하면 같은 이름의 .jsonl에 진행 기록을 남기고, 끝난 뒤 현재 모델의
+결과를 Parquet 파일로 내보냅니다 (pyarrow 필요).
+
+    python -m inference.batch 녹음_디렉터리 [파일 ...] --output results.jsonl [--workers 4]
+    python -m inference.batch --file-list takes.txt --output results.parquet
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# 무거운 분석 모듈은 작업자 안에서 임포트 (작업자 초기화 전에 실행 방식을 정하기 위해)
+
+# 결과 상태
+STATUS_OK = 'ok'
+STATUS_EMPTY = 'empty'   # 유효한 세그먼트가 없는 녹음 (다시 분석해도 같음)
+STATUS_ERROR = 'error'   # 읽기 실패, 모델 없음, 예외 (다시 실행하면 재시도)
+
+# 상수 정의
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.ogg', '.mp3')
+FORMAT_JSONL = 'jsonl'
+FORMAT_PARQUET = 'parquet'
+DEFAULT_MODEL_PATH = "models/best_voice_model.pt"
+DEFAULT_WORKERS = os.cpu_count() or 1
+PROCESS_START_METHOD = 'spawn'  # torch/스레드가 있는 프로세스에서 fork는 안전하지 않음
+WORKER_FEATURE_EXECUTOR = 'serial'  # 작업자가 이미 코어마다 있으므로 세그먼트 병렬화는 끔
+DONE_STATUSES = (STATUS_OK, STATUS_EMPTY)
+EMPTY_FALLBACK_REASONS = ('no_segments', 'no_valid_segments')
+
+def collect_recordings(inputs, file_list=None):
+    """
+    분석할 녹음 경로 목록 (절대 경로, 중복 제거, 입력 순서 유지)
+
+    Parameters:
+    -----------
+    inputs : list
+        녹음 파일 또는 디렉터리 (디렉터리는 하위까지 AUDIO_EXTENSIONS 파일을 찾음)
+    file_list : str or None
+        한 줄에 경로 하나씩 적힌 목록 파일
+
+    Returns:
+    --------
+    list
+        녹음 경로 목록
+    """
+    candidates = list(inputs)
+    if file_list:
+        with open(file_list, 'r', encoding='utf-8') as f:
+            candidates += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    paths = []
+    seen = set()
+    for candidate in candidates:
+        if os.path.isdir(candidate):
+            found = []
+            for root, dirs, files in os.walk(candidate):
+                dirs.sort()
+                found += [os.path.join(root, name) for name in sorted(files)
+                          if name.lower().endswith(AUDIO_EXTENSIONS)]
+        else:
+            found = [candidate]
+        for path in found:
+            path = os.path.abspath(path)
+            if path not in seen:
+                seen.add(path)
+                paths.append(path)
+    return paths
+
+def model_checksum(model_path):
+    """체크포인트 SHA-256 (ModelRegistry의 체크섬과 같음)"""
+    digest = hashlib.sha256()
+    with open(model_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_journal(path):
+    """JSONL 진행 기록 읽기 (중단으로 잘린 마지막 줄 등 깨진 줄은 무시)"""
+    records = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return records
+
+def completed_paths(records, checksum):
+    """현재 모델 체크섬으로 처리를 마친 녹음 경로 집합"""
+    return {record['path'] for record in records
+            if record.get('modelChecksum') == checksum and record.get('status') in DONE_STATUSES}
+
+def init_worker(model_path):
+    """작업자 프로세스 초기화: 세그먼트 직렬 추출로 설정 후 모델 한 번 로드"""
+    os.environ['FEATURE_EXECUTOR'] = WORKER_FEATURE_EXECUTOR
+    from inference.model_registry import get_registry
+    get_registry(model_path).get()
+
+def analyze_recording(path, model_path=DEFAULT_MODEL_PATH):
+    """
+    녹음 하나 분석 후 진행 기록 한 줄에 해당하는 딕셔너리 반환
+
+    분석 대신 테스트 결과로 대체된 경우 그 결과는 기록하지 않고 상태와 원인만 남깁니다.
+    """
+    from inference.model_registry import get_registry
+    from inference.metrics import request_trace
+    from inference.speech_analysis import analyze_wav_file
+
+    start = time.perf_counter()
+    info = get_registry(model_path).info() or {}
+    record = {
+        "path": path,
+        "modelChecksum": info.get("checksum"),
+        "modelVersion": info.get("version"),
+        "inferenceMode": info.get("mode")
+    }
+
+    try:
+        with request_trace() as trace:
+            result = analyze_wav_file(path, model_path, use_cache=False)
+    except Exception as e:
+        record.update(status=STATUS_ERROR, error=str(e))
+    else:
+        if trace.fallback is None:
+            record.update(status=STATUS_OK, result=result)
+        elif trace.fallback in EMPTY_FALLBACK_REASONS:
+            record.update(status=STATUS_EMPTY, error=trace.fallback)
+        else:
+            record.update(status=STATUS_ERROR, error=trace.fallback)
+
+    record["elapsedSec"] = round(time.perf_counter() - start, 4)
+    record["analyzedAt"] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    return record
+
+def run_batch(paths, journal_path, model_path=DEFAULT_MODEL_PATH, workers=DEFAULT_WORKERS):
+    """
+    녹음 목록 일괄 분석 (이미 처리한 녹음은 건너뜀)
+
+    Parameters:
+    -----------
+    paths : list
+        collect_recordings 결과
+    journal_path : str
+        JSONL 진행 기록 (결과) 파일, 레코드마다 추가 후 flush
+    model_path : str
+        모델 체크포인트 경로
+    workers : int
+        작업자 프로세스 수 (1이면 현재 프로세스에서 실행)
+
+    Returns:
+    --------
+    dict
+        상태별 처리 수와 건너뛴 수, 모델 체크섬
+    """
+    checksum = model_checksum(model_path)
+    done = completed_paths(read_journal(journal_path), checksum)
+    pending = [path for path in paths if path not in done]
+    workers = max(1, min(workers, len(pending)))
+    print(f"녹음 {len(paths)}개 중 {len(paths) - len(pending)}개는 현재 모델({checksum[:12]})로 처리됨, "
+          f"{len(pending)}개 분석 (작업자 {workers}개)")
+
+    summary = {"modelChecksum": checksum, "skipped": len(paths) - len(pending),
+               STATUS_OK: 0, STATUS_EMPTY: 0, STATUS_ERROR: 0}
+    if not pending:
+        return summary
+
+    os.makedirs(os.path.dirname(os.path.abspath(journal_path)), exist_ok=True)
+    start = time.perf_counter()
+    with open(journal_path, 'a', encoding='utf-8') as journal:
+        def write(record):
+            journal.write(json.dumps(record, ensure_ascii=False) + "\n")
+            journal.flush()
+            summary[record["status"]] += 1
+            finished = summary[STATUS_OK] + summary[STATUS_EMPTY] + summary[STATUS_ERROR]
+            detail = f" ({record['error']})" if record["status"] != STATUS_OK else ""
+            print(f"[{finished}/{len(pending)}] {record['path']}: {record['status']}{detail}, {record['elapsedSec']:.2f}초")
+
+        if workers <= 1:
+            for path in pending:
+                write(analyze_recording(path, model_path))
+        else:
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context(PROCESS_START_METHOD),
+                                     initializer=init_worker, initargs=(model_path,)) as pool:
+                futures = [pool.submit(analyze_recording, path, model_path) for path in pending]
+                for future in as_completed(futures):
+                    write(future.result())
+
+    print(f"완료: 성공 {summary[STATUS_OK]}개, 세그먼트 없음 {summary[STATUS_EMPTY]}개, "
+          f"오류 {summary[STATUS_ERROR]}개, {time.perf_counter() - start:.1f}초")
+    return summary
+
+def export_parquet(journal_path, output_path, checksum):
+    """
+    진행 기록에서 현재 모델의 녹음별 최신 결과를 Parquet로 내보내기
+
+    요약 열(상태, 세그먼트 수, 전체 피드백)과 함께 전체 결과는 JSON 문자열 열로 저장합니다.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet 출력에는 pyarrow가 필요합니다 (pip install pyarrow).")
+
+    latest = {}
+    for record in read_journal(journal_path):
+        if record.get('modelChecksum') == checksum:
+            latest[record['path']] = record
+
+    rows = []
+    for record in latest.values():
+        result = record.get("result") or {}
+        rows.append({
+            "path": record["path"],
+            "status": record["status"],
+            "error": record.get("error"),
+            "modelChecksum": record["modelChecksum"],
+            "modelVersion": record.get("modelVersion"),
+            "inferenceMode": record.get("inferenceMode"),
+            "segmentCount": len(result.get("segments", [])),
+            "scaleType": result.get("scaleType"),
+            "elapsedSec": record.get("elapsedSec"),
+            "analyzedAt": record.get("analyzedAt"),
+            "result": json.dumps(result, ensure_ascii=False) if result else None
+        })
+
+    pq.write_table(pa.Table.from_pylist(rows), output_path)
+    print(f"Parquet 결과 저장: {output_path} ({len(rows)}개)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="녹음 일괄 분석")
+    parser.add_argument('inputs', nargs='*', help="녹음 파일 또는 디렉터리")
+    parser.add_argument('--file-list', help="한 줄에 경로 하나씩 적힌 목록 파일")
+    parser.add_argument('--output', required=True, help="결과 파일 (.jsonl 또는 .parquet)")
+    parser.add_argument('--format', choices=(FORMAT_JSONL, FORMAT_PARQUET),
+                        help="출력 형식 (기본: 출력 파일 확장자로 결정)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH)
+    args = parser.parse_args(argv)
+
+    output_format = args.format or (FORMAT_PARQUET if args.output.endswith('.parquet') else FORMAT_JSONL)
+    journal_path = args.output
+    if output_format == FORMAT_PARQUET:
+        journal_path = os.path.splitext(args.output)[0] + '.jsonl'
+
+    paths = collect_recordings(args.inputs, args.file_list)
+    if not paths:
+        print("분석할 녹음이 없습니다.")
+        return 1
+
+    summary = run_batch(paths, journal_path, args.model, args.workers)
+    if output_format == FORMAT_PARQUET:
+        try:
+            export_parquet(journal_path, args.output, summary["modelChecksum"])
+        except RuntimeError as e:
+            print(e)
+            return 1
+    return 1 if summary[STATUS_ERROR] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
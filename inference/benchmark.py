@@ -0,0 +1,287 @@
+"""
+분석 파이프라인 단계별 벤치마크
+
+analyze_wav_file을 이루는 단계(로드, 미세 세그먼트 분할, 특성 추출, 예측, 세그먼트 통합,
+피치 그룹화)를 각각 따로 반복 측정하고 결과를 JSON 파일로 저장합니다. 대상은
+static/uploads의 샘플 녹음과 1초 ~ 10분 길이의 합성 음계 녹음입니다. 비교 모드는
+기준 결과보다 느려진 단계가 임계값을 넘으면 실패(종료 코드 1)합니다.
+
+    python -m inference.benchmark run [--output 결과.json] [--compare 기준.json]
+    python -m inference.benchmark compare 기준.json 결과.json [--threshold 0.2]
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import platform
+import tempfile
+import statistics
+import contextlib
+
+import numpy as np
+import soundfile as sf
+
+from inference.feature_engine import SAMPLE_RATE
+from inference.audio_io import load_audio
+from inference.frame_cache import AnalysisContext
+from inference.model_registry import get_registry
+from inference.speech_analysis import (
+    split_wav_to_micro_segments, extract_segment_features, build_segment_result, FEATURE_MODE
+)
+from inference.speech_analysis_model import predict_label_codes, LABEL_NAMES, HEAD_NAMES
+from inference.parallel_features import FEATURE_EXECUTOR
+from inference.segment_utils import consolidate_segments
+from inference.pitch_analysis import group_segments_by_pitch
+from inference.warmup import synthetic_scale
+
+# 상수 정의
+BENCHMARK_SCHEMA_VERSION = 1
+STAGES = ('load', 'split', 'extract_features', 'predict', 'consolidate', 'group_by_pitch')
+SYNTHETIC_DURATIONS_SEC = (1.0, 10.0, 60.0, 600.0)   # 1초 ~ 10분
+DEFAULT_SAMPLE_GLOB = os.path.join('static', 'uploads', '*.wav')
+DEFAULT_OUTPUT = os.path.join('cache', 'benchmarks', 'latest.json')
+DEFAULT_REPEATS = 3
+MAX_REPEAT_DURATION_SEC = 60.0   # 이보다 긴 녹음은 한 번만 측정 (10분 녹음 반복은 너무 오래 걸림)
+REGRESSION_THRESHOLD = 0.2       # 기준 대비 중앙값이 20% 넘게 느려지면 회귀
+MIN_REGRESSION_SEC = 0.005       # 이보다 작은 차이는 측정 잡음으로 보고 무시
+
+@contextlib.contextmanager
+def quiet():
+    """단계 실행 중 파이프라인의 진행 출력 숨김 (출력 비용이 측정에 섞이지 않도록)"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+def timed(func, *args, **kwargs):
+    """함수 실행 결과와 소요 시간(초)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def run_stages(path, model):
+    """
+    녹음 하나에 대해 모든 단계를 순서대로 한 번 실행
+
+    각 단계는 앞 단계의 결과를 입력으로 받지만 시간은 단계별로 따로 잽니다.
+
+    Returns:
+    --------
+    tuple
+        (단계별 소요 시간 딕셔너리, 세그먼트 수)
+    """
+    timings = {}
+    (y, sr), timings['load'] = timed(load_audio, path, SAMPLE_RATE)
+
+    context = AnalysisContext(y, sr)
+    segments, timings['split'] = timed(split_wav_to_micro_segments, y, sr, context=context)
+
+    (valid_segments, features), timings['extract_features'] = timed(
+        extract_segment_features, y, sr, segments, FEATURE_MODE, context)
+
+    segment_results = []
+    label_codes = None
+    if features is not None:
+        label_codes, timings['predict'] = timed(predict_label_codes, model, features)
+        labels = {key: LABEL_NAMES[label_codes[:, i]].tolist() for i, key in enumerate(HEAD_NAMES)}
+        for row, (segment_idx, start_time, end_time, avg_pitch) in enumerate(valid_segments):
+            predictions = {key: str(values[row]) for key, values in labels.items()}
+            segment_results.append(build_segment_result(segment_idx, start_time, end_time, avg_pitch, predictions))
+    else:
+        timings['predict'] = 0.0
+
+    _, timings['consolidate'] = timed(consolidate_segments, segment_results, label_codes)
+    _, timings['group_by_pitch'] = timed(group_segments_by_pitch, segment_results, label_codes)
+    return timings, len(segment_results)
+
+def benchmark_recording(path, duration, model, repeats):
+    """
+    녹음 하나의 단계별 측정 결과
+
+    Returns:
+    --------
+    dict
+        길이, 세그먼트 수, 단계별 (최소, 중앙값, 전체 측정값)
+    """
+    runs = {stage: [] for stage in STAGES}
+    n_segments = 0
+    for _ in range(repeats):
+        with quiet():
+            timings, n_segments = run_stages(path, model)
+        for stage in STAGES:
+            runs[stage].append(timings[stage])
+
+    return {
+        "durationSec": round(duration, 3),
+        "segments": n_segments,
+        "repeats": repeats,
+        "stages": {
+            stage: {"minSec": min(values), "medianSec": statistics.median(values), "runs": values}
+            for stage, values in runs.items()
+        },
+        "totalMedianSec": sum(statistics.median(values) for values in runs.values())
+    }
+
+def environment_info(model_info):
+    """측정 환경 (결과 비교 시 참고용)"""
+    import librosa
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpuCount": os.cpu_count(),
+        "numpy": np.__version__,
+        "librosa": librosa.__version__,
+        "featureMode": FEATURE_MODE,
+        "featureExecutor": FEATURE_EXECUTOR,
+        "inferenceMode": model_info["mode"],
+        "modelVersion": model_info["version"]
+    }
+
+def run_benchmark(sample_paths, durations=SYNTHETIC_DURATIONS_SEC, repeats=DEFAULT_REPEATS,
+                  model_path="models/best_voice_model.pt"):
+    """
+    샘플 녹음과 합성 녹음 전체 벤치마크
+
+    Parameters:
+    -----------
+    sample_paths : list
+        실제 녹음 파일 경로 (읽을 수 없는 파일은 건너뜀)
+    durations : tuple
+        합성 녹음 길이(초)
+    repeats : int
+        단계별 반복 횟수 (MAX_REPEAT_DURATION_SEC보다 긴 녹음은 1회)
+    model_path : str
+        모델 체크포인트 경로
+
+    Returns:
+    --------
+    dict
+        JSON으로 저장할 벤치마크 결과
+    """
+    registry = get_registry(model_path)
+    model, model_info = registry.snapshot()
+    if model is None:
+        raise RuntimeError(f"모델을 로드할 수 없습니다: {registry.stats()['lastError']}")
+
+    recordings = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        synthetic = []
+        for duration in durations:
+            path = os.path.join(tmp_dir, f"synthetic_{duration:g}s.wav")
+            sf.write(path, synthetic_scale(duration), SAMPLE_RATE)
+            synthetic.append(path)
+
+        # JIT 컴파일, 작업자 풀 생성 등 첫 실행 비용은 측정에서 제외
+        if synthetic:
+            with quiet():
+                run_stages(synthetic[0], model)
+
+        for path in list(sample_paths) + synthetic:
+            name = os.path.splitext(os.path.basename(path))[0]
+            try:
+                with quiet():
+                    y, sr = load_audio(path, SAMPLE_RATE)
+            except Exception as e:
+                print(f"{path}: 읽을 수 없어 건너뜀 ({str(e) or type(e).__name__})")
+                continue
+            duration = len(y) / sr
+            n_repeats = repeats if duration <= MAX_REPEAT_DURATION_SEC else 1
+            recordings[name] = benchmark_recording(path, duration, model, n_repeats)
+            stages = ", ".join(f"{stage} {recordings[name]['stages'][stage]['medianSec']:.3f}" for stage in STAGES)
+            print(f"{name} ({recordings[name]['durationSec']:.1f}초, 세그먼트 {recordings[name]['segments']}개): {stages}")
+
+    return {
+        "schemaVersion": BENCHMARK_SCHEMA_VERSION,
+        "createdAt": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "environment": environment_info(model_info),
+        "recordings": recordings
+    }
+
+def compare_results(baseline, current, threshold=REGRESSION_THRESHOLD, min_regression_sec=MIN_REGRESSION_SEC):
+    """
+    두 벤치마크 결과의 단계별 중앙값 비교
+
+    Parameters:
+    -----------
+    baseline, current : dict
+        run_benchmark 결과
+    threshold : float
+        회귀로 볼 상대 증가율 (0.2 = 20% 느려짐)
+    min_regression_sec : float
+        회귀로 볼 최소 절대 증가 시간(초)
+
+    Returns:
+    --------
+    list
+        회귀한 (녹음, 단계, 기준 초, 현재 초, 비율) 목록
+    """
+    regressions = []
+    for name, recording in current["recordings"].items():
+        base_recording = baseline["recordings"].get(name)
+        if base_recording is None:
+            continue
+        for stage, stats in recording["stages"].items():
+            base_stats = base_recording["stages"].get(stage)
+            if base_stats is None:
+                continue
+            base_sec, current_sec = base_stats["medianSec"], stats["medianSec"]
+            ratio = current_sec / base_sec if base_sec > 0 else float('inf')
+            regressed = ratio > 1 + threshold and current_sec - base_sec > min_regression_sec
+            marker = "회귀" if regressed else ""
+            print(f"{name:>24} {stage:>16}: {base_sec:8.4f} -> {current_sec:8.4f}초 (x{ratio:.2f}) {marker}")
+            if regressed:
+                regressions.append((name, stage, base_sec, current_sec, ratio))
+    return regressions
+
+def load_results(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_results(results, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"벤치마크 결과 저장: {path}")
+
+def report_regressions(regressions, threshold):
+    """회귀 요약 출력 후 종료 코드 반환"""
+    if regressions:
+        print(f"{len(regressions)}개 단계가 기준보다 {threshold:.0%} 넘게 느려졌습니다.")
+        return 1
+    print("회귀 없음")
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="분석 파이프라인 단계별 벤치마크")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="벤치마크 실행")
+    run_parser.add_argument('samples', nargs='*', help="녹음 파일 (기본: static/uploads/*.wav)")
+    run_parser.add_argument('--durations', type=float, nargs='*', default=list(SYNTHETIC_DURATIONS_SEC),
+                            help="합성 녹음 길이(초)")
+    run_parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    run_parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    run_parser.add_argument('--compare', help="비교할 기준 결과 파일")
+    run_parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+
+    compare_parser = subparsers.add_parser('compare', help="두 결과 파일 비교")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        sample_paths = args.samples or sorted(glob.glob(DEFAULT_SAMPLE_GLOB))
+        results = run_benchmark(sample_paths, tuple(args.durations), args.repeats)
+        save_results(results, args.output)
+        if args.compare:
+            regressions = compare_results(load_results(args.compare), results, args.threshold)
+            return report_regressions(regressions, args.threshold)
+        return 0
+
+    regressions = compare_results(load_results(args.baseline), load_results(args.current), args.threshold)
+    return report_regressions(regressions, args.threshold)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""
+단일 스펙트럼 기반 특성 추출 엔진
+
+세그먼트마다 STFT를 한 번만 계산하고, 모든 스펙트럴 특성(MFCC, 멜 스펙트로그램,
+센트로이드, 피치, 롤오프, 대비, 스펙트럴 플럭스)을 그 스펙트로그램에서 유도합니다.
+멜 필터뱅크, DCT 행렬, 대비 대역 정보는 한 번만 계산하여 캐시합니다.
+결과는 librosa 함수를 각각 호출하던 기존 extract_features와 (허용 오차 내에서) 동일합니다.
+"""
+from functools import lru_cache
+
+import librosa
+import numpy as np
+import scipy.fft
+
+# 상수 정의 (librosa 기본값과 일치)
+SAMPLE_RATE = 22050
+N_MFCC = 13
+N_MELS = 128
+N_FFT = 2048
+HOP_LENGTH = 512
+AMIN = 1e-10                 # power_to_db 최소값
+TOP_DB = 80.0                # power_to_db 동적 범위
+ZCR_THRESHOLD = 1e-10        # 제로 크로싱 판정 임계값
+ROLL_PERCENT = 0.85          # 스펙트럴 롤오프 비율
+CONTRAST_FMIN = 200.0        # 스펙트럴 대비 최저 주파수
+CONTRAST_N_BANDS = 6         # 스펙트럴 대비 대역 수
+CONTRAST_QUANTILE = 0.02     # 스펙트럴 대비 분위수
+ONSET_LAG = 1                # 스펙트럴 플럭스 시간 지연(프레임)
+
+@lru_cache(maxsize=8)
+def mel_basis(sr=SAMPLE_RATE, n_fft=N_FFT, n_mels=N_MELS):
+    """멜 필터뱅크 행렬 (n_mels, 1 + n_fft/2)"""
+    return librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels)
+
+@lru_cache(maxsize=8)
+def dct_matrix(n_mfcc=N_MFCC, n_mels=N_MELS):
+    """직교 정규화된 DCT-II 행렬 (n_mfcc, n_mels)"""
+    return scipy.fft.dct(np.eye(n_mels), type=2, norm='ortho', axis=0)[:n_mfcc]
+
+@lru_cache(maxsize=8)
+def fft_frequencies(sr=SAMPLE_RATE, n_fft=N_FFT):
+    """FFT 빈 중심 주파수"""
+    return librosa.fft_frequencies(sr=sr, n_fft=n_fft)
+
+@lru_cache(maxsize=8)
+def contrast_bands(sr=SAMPLE_RATE, n_fft=N_FFT, fmin=CONTRAST_FMIN, n_bands=CONTRAST_N_BANDS,
+                   quantile=CONTRAST_QUANTILE):
+    """
+    스펙트럴 대비 대역 정보 (librosa.feature.spectral_contrast와 동일한 대역 분할)
+
+    Returns:
+    --------
+    list
+        대역별 (주파수 빈 인덱스 배열, 분위 빈 개수) 튜플 목록
+    """
+    freq = fft_frequencies(sr, n_fft)
+    octa = np.zeros(n_bands + 2)
+    octa[1:] = fmin * (2.0 ** np.arange(0, n_bands + 1))
+
+    bands = []
+    for k, (f_low, f_high) in enumerate(zip(octa[:-1], octa[1:])):
+        current_band = np.logical_and(freq >= f_low, freq <= f_high)
+        idx = np.flatnonzero(current_band)
+
+        if k > 0:
+            current_band[idx[0] - 1] = True
+        if k == n_bands:
+            current_band[idx[-1] + 1:] = True
+
+        rows = np.flatnonzero(current_band)
+        n_quantile = int(max(np.rint(quantile * len(rows)), 1))
+        if k < n_bands:
+            rows = rows[:-1]
+        bands.append((rows, n_quantile))
+
+    return bands
+
+def power_to_db(S, top_db=TOP_DB):
+    """librosa.power_to_db(S, ref=1.0)와 동일한 dB 변환"""
+    log_spec = 10.0 * np.log10(np.maximum(AMIN, S))
+    if top_db is not None:
+        log_spec = np.maximum(log_spec, log_spec.max() - top_db)
+    return log_spec
+
+def magnitude_spectrogram(audio, n_fft=N_FFT, hop_length=HOP_LENGTH):
+    """중심 정렬된 STFT 크기 스펙트로그램 (1 + n_fft/2, 프레임 수)"""
+    return np.abs(librosa.stft(audio, n_fft=n_fft, hop_length=hop_length))
+
+def frame_rms(audio, frame_length=N_FFT, hop_length=HOP_LENGTH):
+    """프레임별 RMS (librosa.feature.rms(y=...)와 동일, 누적합으로 계산)"""
+    padded = np.pad(audio, frame_length // 2, mode='constant')
+    n_frames = 1 + (len(padded) - frame_length) // hop_length
+    cumulative = np.concatenate([[0.0], np.cumsum(np.square(padded, dtype=np.float64))])
+    starts = np.arange(n_frames) * hop_length
+    power = (cumulative[starts + frame_length] - cumulative[starts]) / frame_length
+    return np.sqrt(np.maximum(power, 0.0))
+
+def frame_zero_crossing_rate(audio, frame_length=N_FFT, hop_length=HOP_LENGTH):
+    """프레임별 제로 크로싱 레이트 (librosa.feature.zero_crossing_rate와 동일)"""
+    padded = np.pad(audio, frame_length // 2, mode='edge')
+    clipped = np.where(np.abs(padded) <= ZCR_THRESHOLD, 0.0, padded)
+    negative = np.signbit(clipped)
+    crossings = negative[1:] != negative[:-1]
+
+    n_frames = 1 + (len(padded) - frame_length) // hop_length
+    cumulative = np.concatenate([[0], np.cumsum(crossings)])
+    starts = np.arange(n_frames) * hop_length
+    # 프레임 안의 인접 샘플 쌍 (frame_length - 1개)의 부호 변화 수
+    counts = cumulative[starts + frame_length - 1] - cumulative[starts]
+    return counts / frame_length
+
+def spectral_centroid(S, sr=SAMPLE_RATE):
+    """프레임별 스펙트럴 센트로이드"""
+    n_fft = 2 * (S.shape[0] - 1)
+    norm = np.sum(S, axis=0)
+    norm = np.where(norm < np.finfo(S.dtype).tiny, 1.0, norm)
+    return fft_frequencies(sr, n_fft) @ S / norm
+
+def spectral_rolloff(S, sr=SAMPLE_RATE, roll_percent=ROLL_PERCENT):
+    """프레임별 스펙트럴 롤오프"""
+    n_fft = 2 * (S.shape[0] - 1)
+    total_energy = np.cumsum(S, axis=0)
+    threshold = roll_percent * total_energy[-1]
+    first_bin = np.argmax(total_energy >= threshold, axis=0)
+    return fft_frequencies(sr, n_fft)[first_bin]
+
+def spectral_contrast(S, sr=SAMPLE_RATE):
+    """프레임별 스펙트럴 대비 (n_bands + 1, 프레임 수)"""
+    n_fft = 2 * (S.shape[0] - 1)
+    bands = contrast_bands(sr, n_fft)
+
+    valley = np.zeros((len(bands), S.shape[1]))
+    peak = np.zeros_like(valley)
+    for k, (rows, n_quantile) in enumerate(bands):
+        sorted_band = np.sort(S[rows], axis=0)
+        valley[k] = np.mean(sorted_band[:n_quantile], axis=0)
+        peak[k] = np.mean(sorted_band[-n_quantile:], axis=0)
+
+    return power_to_db(peak) - power_to_db(valley)
+
+def onset_envelope(log_mel, n_fft=N_FFT, hop_length=HOP_LENGTH, lag=ONSET_LAG):
+    """로그 멜 스펙트로그램에서 온셋 강도 (librosa.onset.onset_strength와 동일)"""
+    n_frames = log_mel.shape[1]
+    flux = np.mean(np.maximum(0.0, log_mel[:, lag:] - log_mel[:, :-lag]), axis=0)
+
+    # 지연 및 프레임 중심 보정
+    pad_width = lag + n_fft // (2 * hop_length)
+    return np.concatenate([np.zeros(pad_width), flux])[:n_frames]
+
+def pitch_track(S, sr=SAMPLE_RATE, fmin=150.0, fmax=4000.0):
+    """크기 스펙트로그램에서 피치 추적 (librosa.piptrack)"""
+    return librosa.piptrack(S=S, sr=sr, fmin=fmin, fmax=fmax)
+
+def compute_segment_features(audio, sr=SAMPLE_RATE, pitch_mean=None):
+    """
+    세그먼트 하나의 특성 벡터 계산 (STFT 1회)
+
+    Parameters:
+    -----------
+    audio : numpy.ndarray
+        세그먼트 오디오 데이터 (최소 길이 패딩 완료)
+    sr : int
+        샘플링 레이트
+    pitch_mean : float or None
+        녹음 전체 피치 추적에서 미리 계산한 피치 평균 (None이면 세그먼트에서 추적)
+
+    Returns:
+    --------
+    numpy.ndarray
+        특성 벡터 (MFCC 13 + 로그 멜 128 + 기타 11)
+    """
+    # 스펙트로그램은 세그먼트당 한 번만 계산
+    S = magnitude_spectrogram(audio)
+    n_fft = 2 * (S.shape[0] - 1)
+
+    # 멜 스펙트로그램 / MFCC / 스펙트럴 플럭스는 같은 로그 멜에서 유도
+    log_mel = power_to_db(mel_basis(sr, n_fft) @ np.square(S))
+    log_mel_mean = np.mean(log_mel, axis=1)
+    mfccs = dct_matrix(N_MFCC, log_mel.shape[0]) @ log_mel_mean
+    spec_flux = np.mean(onset_envelope(log_mel, n_fft))
+
+    # 시간 영역 특성
+    zero_crossing = np.mean(frame_zero_crossing_rate(audio))
+    rms = frame_rms(audio)
+    rms_mean = np.mean(rms)
+    rms_var = np.var(rms)
+
+    # 스펙트럴 특성
+    spectral_centroid_mean = np.mean(spectral_centroid(S, sr))
+    if pitch_mean is None:
+        pitches, magnitudes = pitch_track(S, sr)
+        pitch_mean = np.mean(pitches[magnitudes > 0]) if np.any(magnitudes > 0) else 0
+    rolloff_mean = np.mean(spectral_rolloff(S, sr))
+    contrast_mean = np.mean(spectral_contrast(S, sr))
+
+    # 시간적 특성 (미세 세그먼트 시작/중간/끝 RMS)
+    n_frames = len(rms)
+    if n_frames >= 3:
+        rms_start = np.mean(rms[:n_frames//3])
+        rms_middle = np.mean(rms[n_frames//3:(2*n_frames)//3])
+        rms_end = np.mean(rms[(2*n_frames)//3:])
+    else:
+        rms_start = rms_middle = rms_end = rms_mean
+
+    return np.concatenate([
+        mfccs,
+        log_mel_mean,
+        [zero_crossing, spectral_centroid_mean, pitch_mean,
+         rms_mean, rms_var, spec_flux, rolloff_mean, contrast_mean,
+         rms_start, rms_middle, rms_end]
+    ])
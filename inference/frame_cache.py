@@ -0,0 +1,344 @@
+"""
+녹음 전체에 대한 프레임 특성 캐시
+
+겹치는 미세 세그먼트마다 특성을 다시 계산하지 않고, 녹음 전체를 홉 단위 격자에서
+한 번만 프레임 분석합니다. 세그먼트 특성(평균, 분산, 시작/중간/끝 RMS)은 프레임
+누적합의 구간 차이로 계산하므로 세그먼트당 비용이 O(1)입니다.
+
+세그먼트 경계가 홉 격자에 맞춰지고 dB 변환의 동적 범위가 녹음 전체 기준으로
+계산되므로, 세그먼트별 추출(extract_features)과 값이 약간 다를 수 있습니다.
+"""
+from functools import lru_cache
+
+import librosa
+import numpy as np
+
+from inference.feature_engine import (
+    SAMPLE_RATE, N_FFT, HOP_LENGTH, N_MFCC,
+    mel_basis, dct_matrix, power_to_db, frame_rms, frame_zero_crossing_rate,
+    spectral_centroid, spectral_rolloff, contrast_bands, fft_frequencies, pitch_track
+)
+
+# 상수 정의
+FRAME_BLOCK = 1024  # 한 번에 STFT를 계산할 프레임 수 (메모리 상한)
+ONSET_DELAY = 1 + N_FFT // (2 * HOP_LENGTH)  # 온셋 강도의 지연 + 프레임 중심 보정
+
+# 피치 범위 (Hz)
+SEGMENT_PITCH_FMIN = 80.0     # 세그먼트 대표 피치 (avg_pitch)
+SEGMENT_PITCH_FMAX = 1200.0
+FEATURE_PITCH_FMIN = 150.0    # 특성 벡터의 pitch_mean (librosa.piptrack 기본값)
+FEATURE_PITCH_FMAX = 4000.0
+
+def frame_count(n_samples, hop_length=HOP_LENGTH):
+    """중심 정렬 프레임 개수"""
+    return 1 + n_samples // hop_length
+
+def frame_ranges(start_samples, end_samples, n_frames, hop_length=HOP_LENGTH):
+    """
+    세그먼트 샘플 구간을 홉 격자 프레임 구간으로 변환
+
+    세그먼트를 단독으로 분석할 때와 같은 프레임 수(1 + 길이 // 홉)를 사용합니다.
+
+    Returns:
+    --------
+    tuple
+        (시작 프레임 배열, 끝 프레임 배열) - 끝은 포함하지 않음
+    """
+    start_samples = np.asarray(start_samples, dtype=np.int64)
+    end_samples = np.asarray(end_samples, dtype=np.int64)
+
+    f0 = np.clip(np.rint(start_samples / hop_length).astype(np.int64), 0, n_frames - 1)
+    n = 1 + (end_samples - start_samples) // hop_length
+    f1 = np.clip(f0 + n, f0 + 1, n_frames)
+    return f0, f1
+
+def frame_runs(frame_mask):
+    """불리언 프레임 마스크에서 연속 구간 [(시작, 끝), ...] 추출"""
+    padded = np.concatenate([[False], frame_mask, [False]])
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return list(zip(edges[::2], edges[1::2]))
+
+def spectrogram_blocks(y, n_fft=N_FFT, hop_length=HOP_LENGTH, block_frames=FRAME_BLOCK, frame_mask=None):
+    """
+    중심 정렬 STFT와 동일한 크기 스펙트로그램을 프레임 블록 단위로 생성
+
+    frame_mask가 주어지면 True인 프레임 구간만 계산합니다 (침묵 구간 생략).
+
+    Yields:
+    -------
+    tuple
+        (블록 시작 프레임, 크기 스펙트로그램 블록)
+    """
+    n_frames = frame_count(len(y), hop_length)
+    padded = np.pad(y, n_fft // 2, mode='constant')
+    runs = [(0, n_frames)] if frame_mask is None else frame_runs(frame_mask[:n_frames])
+
+    for run_start, run_end in runs:
+        for f0 in range(run_start, run_end, block_frames):
+            f1 = min(f0 + block_frames, run_end)
+            block = padded[f0 * hop_length:(f1 - 1) * hop_length + n_fft]
+            yield f0, np.abs(librosa.stft(block, n_fft=n_fft, hop_length=hop_length, center=False))
+
+@lru_cache(maxsize=8)
+def pitch_bin_masks(sr=SAMPLE_RATE, n_fft=N_FFT):
+    """세그먼트 피치 범위와 특성 피치 범위의 주파수 빈 마스크"""
+    freqs = fft_frequencies(sr, n_fft)
+    segment_bins = (SEGMENT_PITCH_FMIN <= freqs) & (freqs < SEGMENT_PITCH_FMAX)
+    feature_bins = (FEATURE_PITCH_FMIN <= freqs) & (freqs < FEATURE_PITCH_FMAX)
+    return segment_bins, feature_bins
+
+def pitch_columns(S, sr=SAMPLE_RATE):
+    """
+    스펙트로그램 프레임별 피치 열 계산
+
+    piptrack을 두 범위의 합집합에 대해 한 번만 실행하고, 주파수 빈 마스크로
+    세그먼트 피치(최대 크기 빈의 피치)와 특성 피치(유효 피치 합/개수)를 나눕니다.
+    piptrack은 프레임마다 독립적이므로 블록 단위로 나누어 계산해도 결과가 같습니다.
+
+    Returns:
+    --------
+    numpy.ndarray
+        (프레임 수, 4) - (세그먼트 피치, 유효 여부, 특성 피치 합, 특성 피치 개수)
+    """
+    segment_bins, feature_bins = pitch_bin_masks(sr, 2 * (S.shape[0] - 1))
+    pitches, magnitudes = pitch_track(S, sr, fmin=SEGMENT_PITCH_FMIN, fmax=FEATURE_PITCH_FMAX)
+
+    # 세그먼트 피치: 80~1200Hz 빈 중 크기가 가장 큰 빈의 피치
+    segment_mags = np.where(segment_bins[:, np.newaxis], magnitudes, 0.0)
+    peak_bins = np.argmax(segment_mags, axis=0)
+    segment_pitch = pitches[peak_bins, np.arange(S.shape[1])] * (segment_mags.max(axis=0) > 0)
+    segment_voiced = segment_pitch > 0
+
+    # 특성 피치: 150~4000Hz 빈 중 크기가 양수인 모든 피치
+    feature_voiced = feature_bins[:, np.newaxis] & (magnitudes > 0)
+    feature_sum = np.sum(np.where(feature_voiced, pitches, 0.0), axis=0)
+    feature_count = np.sum(feature_voiced, axis=0)
+
+    return np.column_stack([segment_pitch, segment_voiced, feature_sum, feature_count])
+
+class PitchTrack:
+    """녹음 전체에 대한 피치 추적 결과 (세그먼트 피치와 특성 피치를 함께 제공)"""
+
+    def __init__(self, n_frames, sr=SAMPLE_RATE, n_fft=N_FFT, hop_length=HOP_LENGTH):
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_frames = n_frames
+
+        # 프레임별 (세그먼트 피치, 유효 여부, 특성 피치 합, 특성 피치 개수) - 계산하지 않은 프레임은 0
+        self._columns = np.zeros((n_frames, 4))
+        self._cumulative = None
+
+    @classmethod
+    def from_audio(cls, y, sr=SAMPLE_RATE, n_fft=N_FFT, hop_length=HOP_LENGTH, frame_mask=None):
+        """오디오 전체 (또는 frame_mask가 True인 프레임)에서 피치 추적"""
+        track = cls(frame_count(len(y), hop_length), sr, n_fft, hop_length)
+        for f0, S in spectrogram_blocks(y, n_fft, hop_length, frame_mask=frame_mask):
+            track.add_block(f0, S)
+        return track.finalize()
+
+    def add_block(self, f0, S):
+        """스펙트로그램 블록의 프레임별 피치 추가"""
+        self._columns[f0:f0 + S.shape[1]] = pitch_columns(S, self.sr)
+
+    def finalize(self):
+        """프레임별 값을 누적합으로 변환"""
+        self._cumulative = np.vstack([np.zeros((1, 4)), np.cumsum(self._columns, axis=0)])
+        self._columns = None
+        return self
+
+    def _range_totals(self, start_samples, end_samples, columns):
+        f0, f1 = frame_ranges(start_samples, end_samples, self.n_frames, self.hop_length)
+        return self._cumulative[f1][:, columns] - self._cumulative[f0][:, columns]
+
+    def segment_pitches(self, start_samples, end_samples):
+        """세그먼트별 평균 피치 (유효 피치가 없으면 0)"""
+        totals = self._range_totals(start_samples, end_samples, [0, 1])
+        return np.divide(totals[:, 0], totals[:, 1], out=np.zeros(len(totals)), where=totals[:, 1] > 0)
+
+    def feature_pitch_means(self, start_samples, end_samples):
+        """세그먼트별 특성 벡터용 pitch_mean (유효 피치가 없으면 0)"""
+        totals = self._range_totals(start_samples, end_samples, [2, 3])
+        return np.divide(totals[:, 0], totals[:, 1], out=np.zeros(len(totals)), where=totals[:, 1] > 0)
+
+class RecordingFrames:
+    """녹음 전체의 프레임 특성과 누적합을 보관하는 캐시"""
+
+    def __init__(self, y, sr=SAMPLE_RATE, n_fft=N_FFT, hop_length=HOP_LENGTH, block_frames=FRAME_BLOCK, pitch=None):
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_samples = len(y)
+
+        # 시간 영역 특성
+        rms = frame_rms(y, n_fft, hop_length)
+        zcr = frame_zero_crossing_rate(y, n_fft, hop_length)
+        self.n_frames = len(rms)
+
+        # 스펙트럴 특성 (프레임 블록 단위로 STFT 계산, 피치가 없으면 같은 패스에서 추적)
+        self.pitch = pitch
+        track = PitchTrack(self.n_frames, sr, n_fft, hop_length) if pitch is None else None
+        mel_power, centroid, rolloff, peak, valley = self._spectral_frames(y, block_frames, track)
+        if track is not None:
+            self.pitch = track.finalize()
+
+        # dB 변환과 온셋 강도는 녹음 전체 기준
+        log_mel = power_to_db(mel_power)
+        contrast = np.mean(power_to_db(peak) - power_to_db(valley), axis=0)
+        onset = self._onset_envelope(log_mel)
+
+        # 프레임별 스칼라 특성 열 구성 후 누적합 계산
+        columns = np.vstack([
+            log_mel,
+            zcr, centroid, rolloff, contrast, onset,
+            rms, np.square(rms)
+        ]).T
+        self._cumulative = np.vstack([np.zeros((1, columns.shape[1])), np.cumsum(columns, axis=0)])
+        self.n_mels = log_mel.shape[0]
+
+    def _spectral_frames(self, y, block_frames, track=None):
+        """프레임별 스펙트럴 특성 계산"""
+        basis = mel_basis(self.sr, self.n_fft)
+        bands = contrast_bands(self.sr, self.n_fft)
+
+        mel_power, centroid, rolloff, peak, valley = [], [], [], [], []
+        for f0, S in spectrogram_blocks(y, self.n_fft, self.hop_length, block_frames):
+            mel_power.append(basis @ np.square(S))
+            centroid.append(spectral_centroid(S, self.sr))
+            rolloff.append(spectral_rolloff(S, self.sr))
+
+            block_peak = np.zeros((len(bands), S.shape[1]))
+            block_valley = np.zeros_like(block_peak)
+            for k, (rows, n_quantile) in enumerate(bands):
+                sorted_band = np.sort(S[rows], axis=0)
+                block_valley[k] = np.mean(sorted_band[:n_quantile], axis=0)
+                block_peak[k] = np.mean(sorted_band[-n_quantile:], axis=0)
+            peak.append(block_peak)
+            valley.append(block_valley)
+
+            if track is not None:
+                track.add_block(f0, S)
+
+        return (np.hstack(mel_power), np.concatenate(centroid), np.concatenate(rolloff),
+                np.hstack(peak), np.hstack(valley))
+
+    def _onset_envelope(self, log_mel):
+        """프레임 k와 k+1 사이의 스펙트럴 플럭스 (마지막 프레임은 0)"""
+        flux = np.mean(np.maximum(0.0, log_mel[:, 1:] - log_mel[:, :-1]), axis=0)
+        return np.concatenate([flux, [0.0]])
+
+    def frame_ranges(self, start_samples, end_samples):
+        """세그먼트 샘플 구간을 이 캐시의 프레임 구간으로 변환"""
+        return frame_ranges(start_samples, end_samples, self.n_frames, self.hop_length)
+
+    def _range_mean(self, f0, f1, columns):
+        """프레임 구간 평균 (누적합 차이)"""
+        total = self._cumulative[f1][:, columns] - self._cumulative[f0][:, columns]
+        return total / np.maximum(f1 - f0, 1)[:, np.newaxis]
+
+    def segment_features(self, start_samples, end_samples):
+        """
+        세그먼트들의 특성 행렬 계산 (세그먼트당 O(1))
+
+        Parameters:
+        -----------
+        start_samples : array-like
+            세그먼트 시작 샘플 인덱스
+        end_samples : array-like
+            세그먼트 끝 샘플 인덱스
+
+        Returns:
+        --------
+        numpy.ndarray
+            (N, 특성 차원) 특성 행렬 (extract_features와 같은 순서)
+        """
+        f0, f1 = self.frame_ranges(start_samples, end_samples)
+        n_mels = self.n_mels
+
+        # 열 인덱스
+        mel_cols = np.arange(n_mels)
+        zcr_col, centroid_col, rolloff_col, contrast_col, onset_col, rms_col, rms_sq_col = n_mels + np.arange(7)
+
+        log_mel_mean = self._range_mean(f0, f1, mel_cols)
+        mfccs = log_mel_mean @ dct_matrix(N_MFCC, n_mels).T
+
+        scalars = self._range_mean(f0, f1, [zcr_col, centroid_col, rolloff_col, contrast_col,
+                                            rms_col, rms_sq_col])
+        zero_crossing, centroid, rolloff, contrast, rms_mean, rms_sq_mean = scalars.T
+        rms_var = np.maximum(rms_sq_mean - np.square(rms_mean), 0.0)
+
+        # 스펙트럴 플럭스: 단독 세그먼트의 온셋 강도처럼 앞쪽 지연 보정 프레임(3개)은 0으로 간주
+        n = f1 - f0
+        onset_end = f0 + np.maximum(n - ONSET_DELAY, 0)
+        spec_flux = (self._cumulative[onset_end, onset_col] - self._cumulative[f0, onset_col]) / n
+
+        # 피치 평균 (공유 피치 추적 결과)
+        pitch_mean = self.pitch.feature_pitch_means(start_samples, end_samples)
+
+        # 시작/중간/끝 RMS (프레임이 3개 미만이면 전체 평균)
+        third, two_thirds = f0 + n // 3, f0 + (2 * n) // 3
+        rms_start = self._range_mean(f0, third, [rms_col])[:, 0]
+        rms_middle = self._range_mean(third, two_thirds, [rms_col])[:, 0]
+        rms_end = self._range_mean(two_thirds, f1, [rms_col])[:, 0]
+        short = n < 3
+        rms_start[short] = rms_middle[short] = rms_end[short] = rms_mean[short]
+
+        return np.column_stack([
+            mfccs,
+            log_mel_mean,
+            zero_crossing, centroid, pitch_mean,
+            rms_mean, rms_var, spec_flux, rolloff, contrast,
+            rms_start, rms_middle, rms_end
+        ])
+
+class AnalysisContext:
+    """
+    녹음 한 건의 분석 중 공유되는 중간 결과
+
+    피치 추적과 프레임 특성 캐시를 처음 필요할 때 한 번만 계산하여
+    세그먼트 분할과 특성 추출 단계가 함께 사용합니다.
+    """
+
+    def __init__(self, y, sr=SAMPLE_RATE):
+        self.y = y
+        self.sr = sr
+        self.hop_length = HOP_LENGTH
+        self.n_frames = frame_count(len(y), HOP_LENGTH)
+        self._rms = None
+        self._frame_mask = None
+        self._pitch = None
+        self._frames = None
+
+    @property
+    def rms(self):
+        """녹음 전체 프레임별 RMS"""
+        if self._rms is None:
+            self._rms = frame_rms(self.y, N_FFT, self.hop_length)
+        return self._rms
+
+    def restrict_to(self, start_samples, end_samples):
+        """
+        이후 피치 추적을 주어진 세그먼트들이 덮는 프레임으로 제한 (침묵 구간 생략)
+
+        이미 피치를 추적한 경우에는 영향이 없습니다.
+        """
+        f0, f1 = frame_ranges(start_samples, end_samples, self.n_frames, self.hop_length)
+        coverage = np.zeros(self.n_frames + 1, dtype=np.int64)
+        np.add.at(coverage, f0, 1)
+        np.add.at(coverage, f1, -1)
+        self._frame_mask = np.cumsum(coverage[:-1]) > 0
+
+    @property
+    def pitch(self):
+        """녹음 전체 피치 추적 결과"""
+        if self._pitch is None:
+            self._pitch = PitchTrack.from_audio(self.y, self.sr, frame_mask=self._frame_mask)
+        return self._pitch
+
+    @property
+    def frames(self):
+        """녹음 전체 프레임 특성 캐시 (피치는 이미 계산된 결과를 재사용)"""
+        if self._frames is None:
+            self._frames = RecordingFrames(self.y, self.sr, pitch=self._pitch)
+            self._pitch = self._frames.pitch
+        return self._frames
@@ -0,0 +1,222 @@
+"""
+분석 단계별 타이밍 스팬과 지표
+
+분석 단계마다 span()으로 소요 시간을 재어 단계별 지연 시간 히스토그램에 기록하고,
+요청 추적(request_trace)이 진행 중이면 그 요청의 단계별 시간에도 더합니다.
+요청당 세그먼트 수와 generate_test_result로 대체된 횟수(원인별)도 함께 모으며,
+/metrics 엔드포인트가 Prometheus 텍스트 형식 또는 JSON으로 내보냅니다.
+request_trace(record=False) 안에서 실행한 분석(예: 워밍업)은 전역 지표에 기록하지 않습니다.
+
+이 모듈은 표준 라이브러리만 사용하므로 오디오 스택을 로드하지 않고 임포트할 수 있습니다.
+"""
+import time
+import bisect
+import logging
+import threading
+import contextlib
+import contextvars
+
+# 상수 정의
+METRIC_PREFIX = 'voice_analysis'
+LATENCY_BUCKETS_SEC = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SEGMENT_COUNT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+logger = logging.getLogger(__name__)
+
+class Histogram:
+    """누적 버킷 히스토그램 (Prometheus 방식, 버킷 상한 이하인 관측값 수)"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """(상한, 누적 개수) 목록 (마지막 상한은 '+Inf')"""
+        bounds = [f"{bound:g}" for bound in self.buckets] + ['+Inf']
+        totals = []
+        running = 0
+        for count in self.counts:
+            running += count
+            totals.append(running)
+        return list(zip(bounds, totals))
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "buckets": dict(self.cumulative())
+        }
+
+class RequestTrace:
+    """요청 하나의 단계별 소요 시간"""
+
+    def __init__(self, record=True):
+        self.start = time.perf_counter()
+        self.record = record  # False면 전역 지표에 기록하지 않음 (요청 추적에만 기록)
+        self.stages = {}
+        self.fallback = None  # generate_test_result로 대체된 경우 그 원인
+
+    def add(self, stage, elapsed):
+        self.stages[stage] = self.stages.get(stage, 0.0) + elapsed
+
+    def to_dict(self):
+        """JSON 응답용 딕셔너리 (초 단위)"""
+        return {
+            "stages": {stage: round(elapsed, 6) for stage, elapsed in self.stages.items()},
+            "totalSec": round(time.perf_counter() - self.start, 6)
+        }
+
+class Metrics:
+    """프로세스 전역 분석 지표 저장소"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stage_latency = {}   # 단계 이름 -> Histogram
+        self._segments = Histogram(SEGMENT_COUNT_BUCKETS)
+        self._fallbacks = {}       # 원인 -> 횟수
+        self._gauges = {}          # 이름 -> (설명, 현재 값을 반환하는 함수)
+
+    def observe_stage(self, stage, elapsed):
+        with self._lock:
+            histogram = self._stage_latency.get(stage)
+            if histogram is None:
+                histogram = self._stage_latency[stage] = Histogram(LATENCY_BUCKETS_SEC)
+            histogram.observe(elapsed)
+
+    def observe_segments(self, n_segments):
+        with self._lock:
+            self._segments.observe(n_segments)
+
+    def count_fallback(self, reason):
+        with self._lock:
+            self._fallbacks[reason] = self._fallbacks.get(reason, 0) + 1
+
+    def reset(self):
+        """관측값 초기화 (게이지 등록은 유지)"""
+        with self._lock:
+            self._stage_latency.clear()
+            self._segments = Histogram(SEGMENT_COUNT_BUCKETS)
+            self._fallbacks.clear()
+
+    def register_gauge(self, name, help_text, func):
+        """요청 시점에 값을 읽는 게이지 등록 (예: 작업 대기열 길이)"""
+        with self._lock:
+            self._gauges[name] = (help_text, func)
+
+    def _gauge_values(self):
+        with self._lock:
+            gauges = dict(self._gauges)
+        values = {}
+        for name, (help_text, func) in gauges.items():
+            try:
+                values[name] = (help_text, float(func()))
+            except Exception as e:
+                logger.warning("게이지 '%s' 값을 읽을 수 없습니다: %s", name, e)
+        return values
+
+    def snapshot(self):
+        """현재 지표 (JSON 응답용)"""
+        gauges = self._gauge_values()
+        with self._lock:
+            return {
+                "stageLatencySec": {stage: histogram.to_dict() for stage, histogram in self._stage_latency.items()},
+                "segmentsPerRequest": self._segments.to_dict(),
+                "fallbacks": dict(self._fallbacks),
+                "gauges": {name: value for name, (_, value) in gauges.items()}
+            }
+
+    def render_prometheus(self):
+        """Prometheus 텍스트 형식 (0.0.4)"""
+        gauges = self._gauge_values()
+        lines = []
+        with self._lock:
+            name = f"{METRIC_PREFIX}_stage_duration_seconds"
+            lines += [f"# HELP {name} 분석 단계별 소요 시간", f"# TYPE {name} histogram"]
+            for stage, histogram in sorted(self._stage_latency.items()):
+                lines += _histogram_lines(name, histogram, f'stage="{stage}"')
+
+            name = f"{METRIC_PREFIX}_segments_per_request"
+            lines += [f"# HELP {name} 요청당 분석한 미세 세그먼트 수", f"# TYPE {name} histogram"]
+            lines += _histogram_lines(name, self._segments)
+
+            name = f"{METRIC_PREFIX}_fallback_total"
+            lines += [f"# HELP {name} generate_test_result로 대체된 분석 수", f"# TYPE {name} counter"]
+            for reason, count in sorted(self._fallbacks.items()):
+                lines.append(f'{name}{{reason="{reason}"}} {count}')
+
+        for gauge, (help_text, value) in sorted(gauges.items()):
+            name = f"{METRIC_PREFIX}_{gauge}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value:g}"]
+        return "\n".join(lines) + "\n"
+
+def _histogram_lines(name, histogram, labels=''):
+    """히스토그램 하나의 Prometheus 행 목록"""
+    prefix = f"{labels}," if labels else ''
+    lines = [f'{name}_bucket{{{prefix}le="{bound}"}} {count}' for bound, count in histogram.cumulative()]
+    suffix = f"{{{labels}}}" if labels else ''
+    lines += [f"{name}_sum{suffix} {histogram.sum:g}", f"{name}_count{suffix} {histogram.count}"]
+    return lines
+
+# 프로세스 전역 지표와 현재 요청 추적 (스레드마다 독립)
+metrics = Metrics()
+_current_trace = contextvars.ContextVar('analysis_trace', default=None)
+
+@contextlib.contextmanager
+def span(stage):
+    """
+    분석 단계 하나의 소요 시간 측정
+
+    단계별 히스토그램에 기록하고, 진행 중인 요청 추적이 있으면 그 요청에도 더합니다.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        trace = _current_trace.get()
+        if trace is None or trace.record:
+            metrics.observe_stage(stage, elapsed)
+        if trace is not None:
+            trace.add(stage, elapsed)
+        logger.debug("단계 '%s' %.4f초", stage, elapsed)
+
+@contextlib.contextmanager
+def request_trace(record=True):
+    """
+    이 블록 안에서 실행된 span을 모으는 요청 추적 (RequestTrace 반환)
+
+    바깥 추적 안에서 열리면 대체 원인(fallback)을 바깥 추적에도 전달합니다.
+    record가 False이거나 바깥 추적이 기록하지 않는 추적이면 전역 지표에 기록하지 않습니다.
+    """
+    parent = _current_trace.get()
+    trace = RequestTrace(record and (parent is None or parent.record))
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        if parent is not None and trace.fallback is not None:
+            parent.fallback = trace.fallback
+
+def record_segments(n_segments):
+    """요청 하나에서 분석한 세그먼트 수 기록"""
+    trace = _current_trace.get()
+    if trace is None or trace.record:
+        metrics.observe_segments(n_segments)
+
+def record_fallback(reason):
+    """분석 대신 generate_test_result 결과를 반환한 원인 기록"""
+    trace = _current_trace.get()
+    if trace is None or trace.record:
+        metrics.count_fallback(reason)
+    if trace is not None:
+        trace.fallback = reason
+    logger.warning("분석 결과 대신 테스트 결과를 반환합니다 (원인: %s)", reason)
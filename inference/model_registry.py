@@ -0,0 +1,262 @@
+"""
+프로세스 단위 모델 레지스트리
+
+모델을 요청마다 새로 만들지 않고 프로세스당 한 번만 로드하여 재사용합니다.
+체크포인트 파일이 바뀌면 (mtime/크기 변경 후 체크섬 확인) 새 모델을 로드하여
+원자적으로 교체하므로 서버를 재시작할 필요가 없습니다.
+"""
+import os
+import io
+import time
+import hashlib
+import logging
+import threading
+
+import numpy as np
+
+from inference.speech_analysis_model import HEAD_NAMES
+from inference.numpy_model import NumpyVoiceModel, load_numpy_model
+
+# 추론 방식
+INFERENCE_MODE_FLOAT = 'float'          # 학습된 float 모델 그대로 사용
+INFERENCE_MODE_OPTIMIZED = 'optimized'  # int8 동적 양자화 + TorchScript (CPU)
+INFERENCE_MODE_NUMPY = 'numpy'          # .npz 가중치 + NumPy 행렬 곱 (torch 임포트 없음)
+
+# 상수 정의 (환경 변수로 조정 가능)
+INFERENCE_MODE = os.environ.get('INFERENCE_MODE', INFERENCE_MODE_FLOAT)
+DEFAULT_MODEL_PATH = "models/best_voice_model.pt"
+RELOAD_CHECK_INTERVAL = 2.0  # 파일 변경 확인 주기(초)
+FIRST_LAYER_KEY = "shared_layers.0.weight"
+
+logger = logging.getLogger(__name__)
+
+def select_device():
+    """사용 가능한 디바이스 선택 (mps > cuda > cpu)"""
+    import torch  # torch 백엔드를 사용할 때만 임포트
+    return torch.device('mps' if torch.backends.mps.is_available() else 'cuda' if torch.cuda.is_available() else 'cpu')
+
+class ModelRegistry:
+    """체크포인트 하나에 대한 모델 로드/검증/핫 리로드 관리"""
+
+    def __init__(self, model_path=DEFAULT_MODEL_PATH, device=None, check_interval=RELOAD_CHECK_INTERVAL,
+                 inference_mode=INFERENCE_MODE):
+        self.model_path = model_path
+        self.check_interval = check_interval
+        self.inference_mode = inference_mode
+        if device is None:
+            device = 'cpu' if inference_mode == INFERENCE_MODE_NUMPY else select_device()
+        self.device = device
+
+        self._lock = threading.Lock()
+        self._model = None
+        self._info = None           # 현재 모델 정보 (체크섬, 입력 크기 등)
+        self._file_signature = None  # (mtime, size)
+        self._last_check = 0.0
+
+        self._load_count = 0
+        self._reload_count = 0
+        self._last_error = None
+        self._reload_listeners = []
+
+    def get(self):
+        """
+        현재 모델 반환 (필요하면 로드 또는 리로드)
+
+        Returns:
+        --------
+        VoiceAnalysisModel, NumpyVoiceModel or None
+            eval 모드의 모델 (로드할 수 없으면 None)
+        """
+        now = time.monotonic()
+        if self._model is None or now - self._last_check >= self.check_interval:
+            self._check_for_update(now)
+        return self._model
+
+    def snapshot(self):
+        """현재 모델과 그 모델의 정보를 함께 반환 (교체 도중에도 서로 일치)"""
+        self.get()
+        with self._lock:
+            return self._model, self._info
+
+    def info(self):
+        """현재 로드된 모델 정보 반환 (없으면 None)"""
+        self.get()
+        return self._info
+
+    def add_reload_listener(self, callback):
+        """모델이 새 체크포인트로 교체될 때 호출할 함수 등록 (새 모델 정보를 인자로 전달)"""
+        with self._lock:
+            if callback not in self._reload_listeners:
+                self._reload_listeners.append(callback)
+
+    def stats(self):
+        """레지스트리 상태 (로드 시간, 모델 버전 등) 반환"""
+        info = self._info or {}
+        return {
+            "modelPath": self.model_path,
+            "device": str(self.device),
+            "loaded": self._model is not None,
+            "version": info.get("version"),
+            "checksum": info.get("checksum"),
+            "inputSize": info.get("input_size"),
+            "inferenceMode": info.get("mode"),
+            "loadTimeSec": info.get("load_time_sec"),
+            "loadedAt": info.get("loaded_at"),
+            "loadCount": self._load_count,
+            "reloadCount": self._reload_count,
+            "lastError": self._last_error
+        }
+
+    def _check_for_update(self, now):
+        """파일 변경 여부를 확인하고 바뀐 경우 새 모델 로드"""
+        reloaded_info = None
+        with self._lock:
+            # 다른 스레드가 이미 확인한 경우
+            if self._model is not None and now - self._last_check < self.check_interval:
+                return
+            self._last_check = now
+
+            try:
+                stat = os.stat(self.model_path)
+            except OSError:
+                if self._model is None:
+                    self._last_error = f"모델 파일 '{self.model_path}'이 존재하지 않습니다."
+                return
+
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if signature == self._file_signature:
+                return
+
+            try:
+                with open(self.model_path, 'rb') as f:
+                    data = f.read()
+                checksum = hashlib.sha256(data).hexdigest()
+
+                # mtime만 바뀌고 내용이 같으면 그대로 사용
+                if self._info is not None and checksum == self._info["checksum"]:
+                    self._file_signature = signature
+                    return
+
+                model, info = self._load_from_bytes(data, checksum)
+            except Exception as e:
+                self._last_error = f"모델 로드 중 오류 발생: {e}"
+                logger.error(self._last_error)
+                # 기존 모델이 있으면 계속 사용 (다음 확인 때 재시도)
+                return
+
+            is_reload = self._model is not None
+
+            # 원자적 교체
+            self._model, self._info = model, info
+            self._file_signature = signature
+            self._last_error = None
+            self._load_count += 1
+            if is_reload:
+                self._reload_count += 1
+
+            action = "리로드" if is_reload else "로드"
+            logger.info("모델 '%s' %s 완료 (버전: %s, 입력 크기: %d, 방식: %s, %.3f초)", self.model_path, action,
+                        info['version'], info['input_size'], info['mode'], info['load_time_sec'])
+            if is_reload:
+                reloaded_info = info
+                listeners = list(self._reload_listeners)
+
+        # 리스너는 잠금 밖에서 호출 (리스너가 get()을 다시 호출해도 교착되지 않도록)
+        if reloaded_info is not None:
+            for callback in listeners:
+                try:
+                    callback(reloaded_info)
+                except Exception as e:
+                    logger.error("모델 교체 리스너 실행 중 오류 발생: %s", e)
+
+    def _load_from_bytes(self, data, checksum):
+        """체크포인트 바이트에서 모델 생성 및 검증"""
+        start = time.perf_counter()
+
+        if self.inference_mode == INFERENCE_MODE_NUMPY:
+            model = load_numpy_model(self.model_path, data, checksum)
+            input_size = model.input_size
+            self._validate(model, input_size, self.device)
+            mode = INFERENCE_MODE_NUMPY
+        else:
+            model, input_size, mode = self._load_torch_model(data)
+
+        info = {
+            "checksum": checksum,
+            "version": checksum[:12],
+            "input_size": int(input_size),
+            "mode": mode,
+            "load_time_sec": time.perf_counter() - start,
+            "loaded_at": time.time()
+        }
+        return model, info
+
+    def _load_torch_model(self, data):
+        """torch 모델 생성 및 검증 (최적화 모드면 최적화 사본 반환)"""
+        import torch
+        from inference.torch_model import VoiceAnalysisModel
+
+        state_dict = torch.load(io.BytesIO(data), map_location=self.device)
+        if not isinstance(state_dict, dict) or FIRST_LAYER_KEY not in state_dict:
+            raise ValueError(f"체크포인트에 '{FIRST_LAYER_KEY}'가 없습니다.")
+
+        # 입력/은닉 크기는 체크포인트의 Linear 가중치 형태에서 결정
+        hidden_size1, input_size = state_dict[FIRST_LAYER_KEY].shape
+        hidden_size2 = state_dict["shared_layers.3.weight"].shape[0]
+        hidden_size3 = state_dict["shared_layers.6.weight"].shape[0]
+
+        model = VoiceAnalysisModel(
+            input_size=input_size,
+            hidden_size1=hidden_size1,
+            hidden_size2=hidden_size2,
+            hidden_size3=hidden_size3
+        ).to(self.device)
+        model.load_state_dict(state_dict)
+        model.eval()
+
+        self._validate(model, input_size, self.device)
+
+        # 최적화 추론 모드: int8 양자화 + TorchScript 사본으로 서비스 (실패하면 float 모델 사용)
+        # 라벨 일치율 확인은 로드 때 실행하지 않음 (python -m inference.optimized_model로 직접 확인)
+        mode = INFERENCE_MODE_FLOAT
+        if self.inference_mode == INFERENCE_MODE_OPTIMIZED:
+            from inference.optimized_model import optimize_model
+            try:
+                optimized = optimize_model(model, input_size)
+                self._validate(optimized, input_size, torch.device('cpu'))
+                model, mode = optimized, INFERENCE_MODE_OPTIMIZED
+            except Exception as e:
+                logger.warning("최적화 모델 생성 실패, float 모델을 사용합니다: %s", e)
+
+        return model, input_size, mode
+
+    @staticmethod
+    def _validate(model, input_size, device):
+        """더미 입력으로 헤드별 출력 형태 검증"""
+        if isinstance(model, NumpyVoiceModel):
+            outputs = model(np.zeros((1, input_size), dtype=np.float32))
+        else:
+            import torch
+            with torch.no_grad():
+                outputs = model(torch.zeros(1, input_size, device=device))
+        for key in HEAD_NAMES:
+            if tuple(outputs[key].shape) != (1, 6):
+                raise ValueError(f"'{key}' 헤드 출력 형태가 잘못되었습니다: {tuple(outputs[key].shape)}")
+
+# 모델 경로별 레지스트리 (프로세스 전역)
+_registries = {}
+_registries_lock = threading.Lock()
+
+def get_registry(model_path=DEFAULT_MODEL_PATH):
+    """모델 경로에 대한 프로세스 전역 레지스트리 반환"""
+    key = os.path.abspath(model_path)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = ModelRegistry(model_path)
+            _registries[key] = registry
+        return registry
+
+def get_model(model_path=DEFAULT_MODEL_PATH):
+    """모델 경로에 대한 공유 모델 반환 (로드할 수 없으면 None)"""
+    return get_registry(model_path).get()
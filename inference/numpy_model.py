@@ -0,0 +1,208 @@
+"""
+NumPy 추론 백엔드
+
+서비스에 필요한 것은 순전파(Linear+ReLU 3층과 Linear 헤드 4개)뿐이므로, 체크포인트를
+한 번 .npz 가중치 파일로 변환해 두고 NumPy 행렬 곱으로 추론합니다. 이 경로는 torch를
+임포트하지 않으므로 작업자의 메모리 사용량과 시작 시간이 줄어듭니다.
+
+연산은 torch Linear와 같은 float32, 같은 순서(x @ W.T + b 후 ReLU)로 수행하며,
+4개 헤드는 가중치를 이어 붙인 행렬 곱 한 번으로 계산합니다.
+
+변환과 라벨 일치 확인:
+    python -m inference.numpy_model convert [체크포인트 경로]
+    python -m inference.numpy_model check [오디오 파일 ...]
+"""
+import io
+import os
+import sys
+import glob
+import hashlib
+import logging
+
+import numpy as np
+
+from inference.speech_analysis_model import HEAD_NAMES
+
+# 상수 정의
+SHARED_LAYERS = ('shared_layers.0', 'shared_layers.3', 'shared_layers.6')  # Linear 레이어 (사이의 ReLU/Dropout 제외)
+HEAD_LAYERS = tuple(f"{head}_head" for head in HEAD_NAMES)
+SOURCE_CHECKSUM_KEY = 'source_checksum'   # 변환에 사용한 체크포인트 SHA-256
+NPZ_SUFFIX = '.npz'
+DEFAULT_SAMPLE_GLOB = os.path.join('static', 'uploads', '*.wav')
+
+logger = logging.getLogger(__name__)
+
+def npz_path_for(model_path):
+    """체크포인트에 대응하는 .npz 가중치 파일 경로"""
+    return os.path.splitext(model_path)[0] + NPZ_SUFFIX
+
+class NumpyVoiceModel:
+    """VoiceAnalysisModel 순전파의 NumPy 구현 (eval 모드와 동일, Dropout 없음)"""
+
+    def __init__(self, weights):
+        self.shared = [
+            (np.asarray(weights[f"{name}.weight"], dtype=np.float32).T,
+             np.asarray(weights[f"{name}.bias"], dtype=np.float32))
+            for name in SHARED_LAYERS
+        ]
+        # 헤드 가중치를 (hidden, 4 * 6)으로 이어 붙여 한 번에 계산
+        self.heads_weight = np.concatenate(
+            [np.asarray(weights[f"{name}.weight"], dtype=np.float32) for name in HEAD_LAYERS]).T
+        self.heads_bias = np.concatenate(
+            [np.asarray(weights[f"{name}.bias"], dtype=np.float32) for name in HEAD_LAYERS])
+        self.input_size = self.shared[0][0].shape[0]
+
+    def logits(self, features):
+        """(N, F) 특성 행렬 -> (N, 4, 6) 헤드별 출력"""
+        x = np.asarray(features, dtype=np.float32)
+        for weight, bias in self.shared:
+            x = np.maximum(x @ weight + bias, 0.0)
+        out = x @ self.heads_weight + self.heads_bias
+        return out.reshape(len(out), len(HEAD_NAMES), -1)
+
+    def __call__(self, features):
+        """torch 모델과 같은 형식의 헤드 이름별 (N, 6) 출력"""
+        out = self.logits(features)
+        return {head: out[:, k] for k, head in enumerate(HEAD_NAMES)}
+
+    def predict_label_codes(self, features):
+        """
+        라벨 코드 예측 (decode_label_codes와 같은 규칙)
+
+        Returns:
+        --------
+        numpy.ndarray
+            (N, 4) 라벨 코드 배열 (HEAD_NAMES 순서, 값은 LABEL_NAMES 인덱스)
+        """
+        out = self.logits(features)
+        idx = out.reshape(len(out), len(HEAD_NAMES), 2, 3).argmax(axis=3)
+        return (idx[..., 0] * 3 + idx[..., 1]).astype(np.int64)
+
+def checkpoint_weights(data):
+    """체크포인트 바이트에서 필요한 가중치만 float32 배열로 추출 (torch 필요)"""
+    import torch  # 변환할 때만 임포트
+
+    state_dict = torch.load(io.BytesIO(data), map_location='cpu')
+    weights = {}
+    for name in SHARED_LAYERS + HEAD_LAYERS:
+        for kind in ('weight', 'bias'):
+            key = f"{name}.{kind}"
+            if key not in state_dict:
+                raise ValueError(f"체크포인트에 '{key}'가 없습니다.")
+            weights[key] = state_dict[key].detach().cpu().numpy().astype(np.float32)
+    return weights
+
+def convert_checkpoint(data, checksum, npz_path):
+    """
+    체크포인트를 .npz 가중치 파일로 변환
+
+    Parameters:
+    -----------
+    data : bytes
+        체크포인트 파일 내용
+    checksum : str
+        체크포인트 SHA-256 (파일에 함께 기록하여 오래된 변환 결과를 감지)
+    npz_path : str
+        저장 경로
+
+    Returns:
+    --------
+    dict
+        레이어 이름별 가중치 배열
+    """
+    weights = checkpoint_weights(data)
+    tmp_path = f"{npz_path}.tmp{NPZ_SUFFIX}"
+    np.savez(tmp_path, **weights, **{SOURCE_CHECKSUM_KEY: np.array(checksum)})
+    os.replace(tmp_path, npz_path)
+    logger.info("체크포인트를 NumPy 가중치로 변환했습니다: %s", npz_path)
+    return weights
+
+def read_npz(npz_path, checksum):
+    """체크섬이 일치하는 .npz 가중치 읽기 (없거나 오래되었으면 None)"""
+    try:
+        with np.load(npz_path) as npz:
+            if str(npz[SOURCE_CHECKSUM_KEY]) != checksum:
+                return None
+            return {key: npz[key] for key in npz.files if key != SOURCE_CHECKSUM_KEY}
+    except (OSError, KeyError, ValueError):
+        return None
+
+def load_numpy_model(model_path, data, checksum):
+    """
+    체크포인트에 대응하는 NumPy 모델 로드
+
+    변환된 .npz가 있고 체크포인트 체크섬이 같으면 torch 없이 바로 읽고, 없거나
+    체크포인트가 바뀌었으면 한 번 변환하여 저장합니다.
+
+    Returns:
+    --------
+    NumpyVoiceModel
+    """
+    npz_path = npz_path_for(model_path)
+    weights = read_npz(npz_path, checksum)
+    if weights is None:
+        weights = convert_checkpoint(data, checksum, npz_path)
+    return NumpyVoiceModel(weights)
+
+def check_labels(paths, model_path="models/best_voice_model.pt"):
+    """
+    샘플 녹음에서 NumPy 모델 라벨이 float torch 모델과 모두 같은지 확인
+
+    Returns:
+    --------
+    bool
+        모든 세그먼트의 라벨이 일치하면 True
+    """
+    import torch
+    from inference.model_registry import ModelRegistry, INFERENCE_MODE_FLOAT
+    from inference.optimized_model import label_agreement, recording_features
+
+    registry = ModelRegistry(model_path, device=torch.device('cpu'), inference_mode=INFERENCE_MODE_FLOAT)
+    torch_model, _ = registry.snapshot()
+    if torch_model is None:
+        print(f"모델을 로드할 수 없습니다: {registry.stats()['lastError']}")
+        return False
+    with open(model_path, 'rb') as f:
+        data = f.read()
+    numpy_model = load_numpy_model(model_path, data, hashlib.sha256(data).hexdigest())
+
+    checked = 0
+    passed = True
+    for path in paths:
+        try:
+            features = recording_features(path)
+        except Exception as e:
+            print(f"{path}: 읽을 수 없어 건너뜀 ({e})")
+            continue
+        if features is None:
+            print(f"{path}: 유효한 세그먼트 없음")
+            continue
+
+        report = label_agreement(torch_model, numpy_model, features)
+        with torch.no_grad():
+            reference = torch_model(torch.from_numpy(features.astype(np.float32)))
+        candidate = numpy_model(features)
+        max_diff = max(float(np.max(np.abs(reference[head].numpy() - candidate[head]))) for head in HEAD_NAMES)
+        checked += 1
+        passed = passed and report['all'] == 1.0
+        print(f"{path}: 세그먼트 {report['segments']}개, 라벨 일치율 {report['all']:.4f}, 최대 출력 차이 {max_diff:.2e}")
+
+    if checked == 0:
+        print("확인할 수 있는 녹음이 없습니다.")
+        return False
+    print(f"라벨 일치 확인 {'통과' if passed else '실패'}")
+    return passed
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else 'convert'
+    if command == 'convert':
+        checkpoint_path = sys.argv[2] if len(sys.argv) > 2 else "models/best_voice_model.pt"
+        with open(checkpoint_path, 'rb') as f:
+            checkpoint = f.read()
+        convert_checkpoint(checkpoint, hashlib.sha256(checkpoint).hexdigest(), npz_path_for(checkpoint_path))
+    elif command == 'check':
+        sample_paths = sys.argv[2:] or sorted(glob.glob(DEFAULT_SAMPLE_GLOB))
+        sys.exit(0 if check_labels(sample_paths) else 1)
+    else:
+        print("사용법: python -m inference.numpy_model [convert [체크포인트] | check [오디오 파일 ...]]")
+        sys.exit(2)
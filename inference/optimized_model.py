@@ -0,0 +1,165 @@
+"""
+CPU 추론 최적화 모델
+
+VoiceAnalysisModel의 Linear 레이어(shared_layers와 4개 헤드)를 동적 int8 양자화한 뒤
+TorchScript로 추적하고 고정(freeze)한 사본을 만듭니다. 여러 요청이 동시에 실행될 때
+코어를 과다 점유하지 않도록 intra-op 스레드 수를 명시적으로 설정합니다.
+
+입력 특성은 정규화되지 않아(MFCC, Hz 단위 센트로이드/롤오프 등) 값의 범위가 매우
+넓으므로, 텐서 단위 스케일로 입력을 양자화하면 작은 특성이 사라집니다. 따라서 원시
+특성을 받는 첫 번째 Linear는 float로 둡니다.
+
+양자화된 모델의 라벨이 float 모델과 일치하는지 샘플 녹음으로 확인하려면:
+    python -m inference.optimized_model [오디오 파일 ...]
+
+이 확인은 헤드마다 일치율이 MIN_LABEL_AGREEMENT 이상이어야 통과합니다. ModelRegistry는
+INFERENCE_MODE=optimized로 로드할 때 이 확인을 실행하지 않으므로, 체크포인트를 바꾼 뒤에는
+최적화 모드를 켜기 전에 직접 실행해야 합니다.
+"""
+import os
+import sys
+import copy
+import glob
+import warnings
+
+import numpy as np
+import torch
+
+from inference.speech_analysis_model import HEAD_NAMES, predict_label_codes
+
+# 상수 정의 (환경 변수로 조정 가능)
+INFERENCE_THREADS = int(os.environ.get('INFERENCE_THREADS', 1))  # 요청당 작은 MLP이므로 기본 1
+TRACE_BATCH_SIZE = 8
+MIN_LABEL_AGREEMENT = 0.97   # 정확도 확인 통과 기준 (float 모델 대비 헤드별 라벨 일치율의 최솟값)
+
+# int8로 양자화할 Linear 레이어 (첫 번째 shared Linear는 원시 특성을 받으므로 제외)
+QUANTIZED_LAYERS = {
+    'shared_layers.3', 'shared_layers.6',
+    'vocal_cord_head', 'contact_head', 'larynx_head', 'strength_head'
+}
+DEFAULT_SAMPLE_GLOB = os.path.join('static', 'uploads', '*.wav')
+
+def configure_threads(num_threads=INFERENCE_THREADS):
+    """torch intra-op 스레드 수 설정"""
+    if num_threads > 0 and torch.get_num_threads() != num_threads:
+        torch.set_num_threads(num_threads)
+
+def optimize_model(model, input_size, num_threads=INFERENCE_THREADS):
+    """
+    float 모델에서 int8 동적 양자화 + TorchScript 고정 모델 생성
+
+    Parameters:
+    -----------
+    model : VoiceAnalysisModel
+        eval 모드의 float 모델 (원본은 변경하지 않음)
+    input_size : int
+        입력 특성 차원
+    num_threads : int
+        intra-op 스레드 수
+
+    Returns:
+    --------
+    torch.jit.ScriptModule
+        CPU에서 실행되는 최적화 모델 (출력 형식은 원본과 동일한 딕셔너리)
+    """
+    configure_threads(num_threads)
+    cpu_model = copy.deepcopy(model).cpu().eval()
+
+    with warnings.catch_warnings():
+        # torch.ao.quantization 사용 중단 예정 경고는 무시
+        warnings.simplefilter('ignore')
+        quantized = torch.ao.quantization.quantize_dynamic(cpu_model, QUANTIZED_LAYERS, dtype=torch.qint8)
+        example = torch.zeros(TRACE_BATCH_SIZE, input_size)
+        with torch.no_grad():
+            traced = torch.jit.trace(quantized, example, strict=False)
+        optimized = torch.jit.freeze(traced.eval())
+
+    return optimized
+
+def label_agreement(reference_model, candidate_model, features):
+    """
+    두 모델의 라벨 일치율 계산
+
+    Returns:
+    --------
+    dict
+        헤드별 일치율, 전체 일치율, 세그먼트 수
+    """
+    reference = predict_label_codes(reference_model, features)
+    candidate = predict_label_codes(candidate_model, features)
+    matches = reference == candidate
+    report = {head: float(np.mean(matches[:, k])) if len(matches) else 1.0
+              for k, head in enumerate(HEAD_NAMES)}
+    report['all'] = float(np.mean(matches)) if matches.size else 1.0
+    report['segments'] = int(len(matches))
+    return report
+
+def recording_features(path):
+    """녹음 파일의 미세 세그먼트 특성 행렬 (분석 파이프라인과 동일한 경로)"""
+    from inference.audio_io import load_audio
+    from inference.frame_cache import AnalysisContext
+    from inference.speech_analysis import SAMPLE_RATE, split_wav_to_micro_segments, extract_segment_features
+
+    y, sr = load_audio(path, SAMPLE_RATE)
+    context = AnalysisContext(y, sr)
+    segments = split_wav_to_micro_segments(y, sr, context=context)
+    if not segments:
+        return None
+    _, features = extract_segment_features(y, sr, segments, context=context)
+    return features
+
+def check_accuracy(paths, model_path="models/best_voice_model.pt"):
+    """
+    샘플 녹음에서 최적화 모델 라벨이 float 모델과 일치하는지 확인
+
+    Returns:
+    --------
+    bool
+        모든 헤드의 라벨 일치율이 MIN_LABEL_AGREEMENT 이상이면 True
+    """
+    from inference.model_registry import ModelRegistry, INFERENCE_MODE_FLOAT
+
+    registry = ModelRegistry(model_path, device=torch.device('cpu'), inference_mode=INFERENCE_MODE_FLOAT)
+    float_model, info = registry.snapshot()
+    if float_model is None:
+        print(f"모델을 로드할 수 없습니다: {registry.stats()['lastError']}")
+        return False
+    optimized = optimize_model(float_model, info['input_size'])
+
+    head_matched = dict.fromkeys(HEAD_NAMES, 0.0)
+    total = 0
+    for path in paths:
+        try:
+            features = recording_features(path)
+        except Exception as e:
+            print(f"{path}: 읽을 수 없어 건너뜀 ({e})")
+            continue
+        if features is None:
+            print(f"{path}: 유효한 세그먼트 없음")
+            continue
+
+        report = label_agreement(float_model, optimized, features)
+        for head in HEAD_NAMES:
+            head_matched[head] += report[head] * report['segments']
+        total += report['segments']
+        heads = ", ".join(f"{head} {report[head]:.3f}" for head in HEAD_NAMES)
+        print(f"{path}: 세그먼트 {report['segments']}개, 일치율 {report['all']:.4f} ({heads})")
+
+    if total == 0:
+        print("확인할 수 있는 녹음이 없습니다.")
+        return False
+
+    # 헤드마다 기준을 적용 (전체 일치율은 한 헤드의 불일치를 다른 헤드가 가릴 수 있음)
+    agreements = {head: head_matched[head] / total for head in HEAD_NAMES}
+    worst_head = min(agreements, key=agreements.get)
+    overall = sum(agreements.values()) / len(agreements)
+    passed = agreements[worst_head] >= MIN_LABEL_AGREEMENT
+    heads = ", ".join(f"{head} {agreements[head]:.4f}" for head in HEAD_NAMES)
+    print(f"전체 라벨 일치율 {overall:.4f} ({heads})")
+    print(f"최소 헤드 일치율 {agreements[worst_head]:.4f} ({worst_head}, 기준 {MIN_LABEL_AGREEMENT}) - "
+          f"{'통과' if passed else '실패'}")
+    return passed
+
+if __name__ == '__main__':
+    sample_paths = sys.argv[1:] or sorted(glob.glob(DEFAULT_SAMPLE_GLOB))
+    sys.exit(0 if check_accuracy(sample_paths) else 1)
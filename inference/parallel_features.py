@@ -0,0 +1,197 @@
+"""
+미세 세그먼트 특성 추출 병렬 실행기
+
+세그먼트 목록을 연속된 샤드로 나누어 스레드 또는 프로세스 풀에서 특성을 추출합니다.
+프로세스 풀에서는 오디오 배열을 공유 메모리에 한 번만 복사하고 작업자는 이름으로
+연결하므로 샤드마다 오디오를 피클링하지 않습니다. 결과는 항상 세그먼트 순서대로
+모으므로 segmentIndex 번호는 실행 방식과 관계없이 동일합니다.
+세그먼트가 적은 짧은 녹음은 풀 오버헤드가 더 크므로 직렬로 처리합니다.
+
+기본 실행 방식은 직렬입니다. 요청 간 병렬화는 이미 분석 작업자(ANALYSIS_WORKERS)가 맡으므로
+스레드/프로세스 풀은 FEATURE_EXECUTOR로 명시한 경우에만 사용합니다. 프로세스 작업자는 이 모듈의
+함수만 실행하며, 작업자 안에서는 풀을 다시 만들지 않습니다. spawn은 부모의 __main__ 모듈을
+다시 임포트하므로, 실행 스크립트는 임포트만으로 스레드나 풀을 시작하지 않아야 합니다.
+"""
+import os
+import atexit
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from inference.speech_analysis_model import extract_features
+
+# 실행 방식
+EXECUTOR_SERIAL = 'serial'
+EXECUTOR_THREAD = 'thread'
+EXECUTOR_PROCESS = 'process'
+EXECUTOR_AUTO = 'auto'  # 작업자를 둘 이상 쓸 수 있고 세그먼트가 충분하면 프로세스 풀, 아니면 직렬
+
+# 상수 정의 (환경 변수로 조정 가능)
+FEATURE_EXECUTOR = os.environ.get('FEATURE_EXECUTOR', EXECUTOR_SERIAL)
+ANALYSIS_WORKERS = int(os.environ.get('ANALYSIS_WORKERS', 2))     # 동시 분석 작업 수 (app과 같은 설정)
+INFERENCE_THREADS = int(os.environ.get('INFERENCE_THREADS', 1))   # 분석 작업당 추론 스레드 수 (optimized_model과 같은 설정)
+# 기본 작업자 수: 동시 분석 작업과 추론 스레드가 쓰고 남는 코어만 사용 (호스트 과다 구독 방지)
+FEATURE_WORKERS = int(os.environ.get('FEATURE_WORKERS', 0)) or max(
+    1, (os.cpu_count() or 1) // max(ANALYSIS_WORKERS * INFERENCE_THREADS, 1))
+MIN_PARALLEL_SEGMENTS = 64    # 이보다 세그먼트가 적으면 직렬 처리 (약 6초 녹음)
+SHARDS_PER_WORKER = 4         # 작업자당 샤드 수 (부하 분산 및 진행 상황 보고 단위)
+PROCESS_START_METHOD = 'spawn'  # torch/스레드가 있는 프로세스에서 fork는 안전하지 않음
+
+logger = logging.getLogger(__name__)
+
+# 실행 방식과 작업자 수별 풀 (프로세스 전역, 재사용)
+_pools = {}
+_pools_lock = threading.Lock()
+_in_worker = False  # 프로세스 풀 작업자 안에서는 항상 직렬 (풀 중첩 방지)
+
+def _init_worker():
+    """프로세스 풀 작업자 초기화"""
+    global _in_worker
+    _in_worker = True
+
+def resolve_executor(executor, n_segments, max_workers):
+    """세그먼트 수와 작업자 수를 고려해 실제 실행 방식 결정"""
+    if _in_worker:
+        return EXECUTOR_SERIAL
+    if executor == EXECUTOR_AUTO:
+        executor = EXECUTOR_PROCESS if max_workers > 1 else EXECUTOR_SERIAL
+    if executor not in (EXECUTOR_SERIAL, EXECUTOR_THREAD, EXECUTOR_PROCESS):
+        raise ValueError(f"알 수 없는 특성 추출 실행 방식입니다: {executor}")
+    if n_segments < MIN_PARALLEL_SEGMENTS or max_workers <= 1:
+        return EXECUTOR_SERIAL
+    return executor
+
+def shard_bounds(n_segments, n_shards):
+    """세그먼트 인덱스를 연속된 샤드 (시작, 끝) 목록으로 분할"""
+    edges = np.linspace(0, n_segments, min(n_shards, n_segments) + 1).astype(int)
+    return [(int(lo), int(hi)) for lo, hi in zip(edges[:-1], edges[1:]) if hi > lo]
+
+def get_pool(executor, max_workers):
+    """실행 방식과 작업자 수에 맞는 공유 풀 반환"""
+    key = (executor, max_workers)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            if executor == EXECUTOR_PROCESS:
+                pool = ProcessPoolExecutor(max_workers=max_workers,
+                                           mp_context=multiprocessing.get_context(PROCESS_START_METHOD),
+                                           initializer=_init_worker)
+            else:
+                pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='features')
+            _pools[key] = pool
+        return pool
+
+@atexit.register
+def shutdown_pools():
+    """생성된 풀 전체 종료"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
+
+def _extract_rows(audio, sr, start_samples, end_samples, pitch_means):
+    """세그먼트 구간별 특성 벡터 계산 (실패한 세그먼트는 None)"""
+    rows = []
+    for start_idx, end_idx, pitch_mean in zip(start_samples, end_samples, pitch_means):
+        try:
+            rows.append(extract_features(audio[start_idx:end_idx], sr, pitch_mean))
+        except Exception as e:
+            logger.warning("세그먼트 분석 중 오류 발생: %s", e)
+            rows.append(None)
+    return rows
+
+def _extract_shard_shared(shm_name, shape, dtype, sr, start_samples, end_samples, pitch_means):
+    """공유 메모리의 오디오에 연결하여 샤드 하나의 특성 계산 (프로세스 작업자용)"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        audio = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        rows = _extract_rows(audio, sr, start_samples, end_samples, pitch_means)
+        del audio
+        return rows
+    finally:
+        shm.close()
+
+def extract_features_parallel(y, sr, start_samples, end_samples, pitch_means,
+                              executor=FEATURE_EXECUTOR, max_workers=FEATURE_WORKERS,
+                              progress_callback=None):
+    """
+    세그먼트 구간별 특성 벡터를 (필요하면 병렬로) 계산
+
+    Parameters:
+    -----------
+    y : numpy.ndarray
+        전체 오디오 데이터
+    sr : int
+        샘플링 레이트
+    start_samples, end_samples : array-like
+        세그먼트 시작/끝 샘플 인덱스
+    pitch_means : array-like
+        세그먼트별 피치 평균
+    executor : str
+        'serial', 'thread', 'process' 또는 'auto'
+    max_workers : int
+        작업자 수
+    progress_callback : callable or None
+        진행 상황 보고 함수 (완료한 세그먼트 수, 전체 세그먼트 수)
+
+    Returns:
+    --------
+    list
+        세그먼트 순서대로 정렬된 특성 벡터 목록 (실패한 세그먼트는 None)
+    """
+    start_samples = [int(s) for s in start_samples]
+    end_samples = [int(e) for e in end_samples]
+    pitch_means = [float(p) for p in pitch_means]
+    n_segments = len(start_samples)
+
+    executor = resolve_executor(executor, n_segments, max_workers)
+    if executor == EXECUTOR_SERIAL:
+        rows = []
+        for i in range(n_segments):
+            rows.extend(_extract_rows(y, sr, start_samples[i:i + 1], end_samples[i:i + 1], pitch_means[i:i + 1]))
+            if progress_callback is not None:
+                progress_callback(i + 1, n_segments)
+        return rows
+
+    shards = shard_bounds(n_segments, max_workers * SHARDS_PER_WORKER)
+    pool = get_pool(executor, max_workers)
+    shm = None
+    futures = {}
+
+    try:
+        if executor == EXECUTOR_PROCESS:
+            # 오디오는 공유 메모리에 한 번만 복사 (작업자에는 이름만 전달)
+            y = np.ascontiguousarray(y)
+            shm = shared_memory.SharedMemory(create=True, size=max(y.nbytes, 1))
+            np.ndarray(y.shape, dtype=y.dtype, buffer=shm.buf)[:] = y
+            futures = {pool.submit(_extract_shard_shared, shm.name, y.shape, y.dtype.str, sr,
+                                   start_samples[lo:hi], end_samples[lo:hi], pitch_means[lo:hi]): k
+                       for k, (lo, hi) in enumerate(shards)}
+        else:
+            futures = {pool.submit(_extract_rows, y, sr,
+                                   start_samples[lo:hi], end_samples[lo:hi], pitch_means[lo:hi]): k
+                       for k, (lo, hi) in enumerate(shards)}
+
+        # 완료 순서와 관계없이 샤드 순서대로 결과 배치
+        shard_rows = [None] * len(shards)
+        done = 0
+        for future in as_completed(futures):
+            k = futures[future]
+            shard_rows[k] = future.result()
+            done += len(shard_rows[k])
+            if progress_callback is not None:
+                progress_callback(done, n_segments)
+    finally:
+        # 샤드 하나가 실패하면 남은 샤드는 취소하고, 실행 중인 샤드가 끝난 뒤에 공유 메모리 해제
+        for future in futures:
+            future.cancel()
+        wait(futures)
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+    return [row for rows in shard_rows for row in rows]
@@ -1,10 +1,99 @@
 """
 피치 분석 관련 함수
+
+세그먼트 피치 배열을 np.digitize로 음역(밴드)에 배정하고, 밴드별 평균 피치와 라벨 점수는
+bincount 집계로 한 번에 계산합니다. 밴드는 PITCH_BANDS 환경 변수로 정합니다.
+
+- 'range' (기본): 7개 음역 (매우 낮은 음역 ~ 매우 높은 음역)
+- 'semitone': 반음 단위 음이름 밴드 (예: 'A3', 음계 연습용)
+- 쉼표로 구분한 경계 주파수 (예: '80,130,180,240'): 'lo-hiHz' 이름의 밴드
+
+모든 방식에서 첫 밴드보다 낮은 피치는 첫 밴드, 마지막 밴드보다 높은 피치는 마지막 밴드에 넣습니다.
 """
+import os
+from collections import namedtuple
+
 import numpy as np
-from collections import defaultdict
 
-def group_segments_by_pitch(segments):
+from inference.speech_analysis_model import LABEL_NAMES, LABEL_CODES
+
+# 피치 범위 정의 (Hz)
+# 여성 음역대: 약 160-1200 Hz, 남성 음역대: 약 85-500 Hz
+# 7개 그룹으로 나눔 (낮은 음부터 높은 음까지)
+PITCH_RANGES = (
+    ("매우 낮은 음역", 80, 130),
+    ("낮은 음역", 130, 180),
+    ("중하 음역", 180, 240),
+    ("중간 음역", 240, 300),
+    ("중상 음역", 300, 400),
+    ("높은 음역", 400, 600),
+    ("매우 높은 음역", 600, 1200)
+)
+
+# 상수 정의
+PITCH_BANDS_RANGE = 'range'
+PITCH_BANDS_SEMITONE = 'semitone'
+PITCH_BANDS = os.environ.get('PITCH_BANDS', PITCH_BANDS_RANGE)
+NOTE_NAMES = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
+A4_FREQ = 440.0
+A4_MIDI = 69
+SEMITONE_FMIN = 80.0     # 세그먼트 대표 피치 추적 범위와 같음
+SEMITONE_FMAX = 1200.0
+RESULT_LABEL_KEYS = ('vocalCord', 'contact', 'larynx', 'strength')
+DEFAULT_LABEL = "M_M"    # 밴드에 유효한 라벨이 없을 때
+
+# 라벨 점수 (L_L=1 ~ H_H=9)는 라벨 코드 + 1이므로 점수 -> 라벨은 LABEL_NAMES[점수 - 1]
+SCORE_LABELS = [str(name) for name in LABEL_NAMES]
+
+# 밴드 정의: 이름, 밴드 사이 경계 주파수 (len(names) - 1개, 오름차순), 조언에 사용할 음역 이름
+PitchBands = namedtuple('PitchBands', ['names', 'edges', 'registers'])
+
+def _register_of(freq):
+    """주파수가 속한 PITCH_RANGES 음역 이름 (범위 밖이면 가장 가까운 끝 음역)"""
+    inner_edges = [low for _, low, _ in PITCH_RANGES[1:]]
+    return PITCH_RANGES[int(np.digitize(freq, inner_edges))][0]
+
+def range_bands(ranges=PITCH_RANGES):
+    """(이름, 하한, 상한) 목록으로 정의한 음역 밴드"""
+    names = [name for name, _, _ in ranges]
+    edges = np.array([low for _, low, _ in ranges[1:]], dtype=np.float64)
+    return PitchBands(names, edges, names)
+
+def semitone_bands(fmin=SEMITONE_FMIN, fmax=SEMITONE_FMAX):
+    """
+    반음 단위 음이름 밴드 (평균율, A4 = 440Hz)
+
+    음 하나의 밴드는 앞뒤 반음과의 중간(±50센트)까지입니다.
+    """
+    low_note = int(np.round(A4_MIDI + 12 * np.log2(fmin / A4_FREQ)))
+    high_note = int(np.round(A4_MIDI + 12 * np.log2(fmax / A4_FREQ)))
+    notes = np.arange(low_note, high_note + 1)
+    names = [f"{NOTE_NAMES[note % 12]}{note // 12 - 1}" for note in notes.tolist()]
+    edges = A4_FREQ * 2.0 ** ((notes[1:] - 0.5 - A4_MIDI) / 12)
+    centers = A4_FREQ * 2.0 ** ((notes - A4_MIDI) / 12)
+    return PitchBands(names, edges, [_register_of(center) for center in centers])
+
+def edge_bands(edges):
+    """경계 주파수 목록 (최저, ..., 최고)으로 정의한 'lo-hiHz' 밴드"""
+    edges = sorted(float(edge) for edge in edges)
+    if len(edges) < 2:
+        raise ValueError("피치 밴드 경계는 2개 이상이어야 합니다.")
+    pairs = list(zip(edges[:-1], edges[1:]))
+    names = [f"{low:g}-{high:g}Hz" for low, high in pairs]
+    registers = [_register_of(np.sqrt(low * high)) for low, high in pairs]
+    return PitchBands(names, np.array(edges[1:-1], dtype=np.float64), registers)
+
+def pitch_bands(spec=PITCH_BANDS):
+    """PITCH_BANDS 형식의 설정 문자열 -> PitchBands"""
+    if spec == PITCH_BANDS_RANGE:
+        return range_bands()
+    if spec == PITCH_BANDS_SEMITONE:
+        return semitone_bands()
+    return edge_bands(spec.split(','))
+
+DEFAULT_PITCH_BANDS = pitch_bands()
+
+def group_segments_by_pitch(segments, label_codes=None, bands=None, weights=None):
     """
     세그먼트를 피치별로 그룹화하고 평균값을 계산
     
@@ -12,6 +101,13 @@ def group_segments_by_pitch(segments):
     -----------
     segments : list
         분석된 세그먼트 목록
+    label_codes : numpy.ndarray or None
+        segments와 같은 순서의 (N, 4) 라벨 코드 (None이면 라벨 문자열에서 만듦)
+    bands : PitchBands or None
+        피치 밴드 정의 (None이면 PITCH_BANDS 설정)
+    weights : array-like or None
+        segments와 같은 순서의 세그먼트별 가중치 (적응형 분할에서 대표하는 격자 윈도우 수,
+        평균 피치와 평균 점수에 적용, None이면 모두 1)
     
     Returns:
     --------
@@ -20,120 +116,75 @@ def group_segments_by_pitch(segments):
     """
     if not segments:
         return []
+    bands = bands or DEFAULT_PITCH_BANDS
     
-    # 피치 범위 정의 (Hz)
-    # 여성 음역대: 약 160-1200 Hz, 남성 음역대: 약 85-500 Hz
-    # 7개 그룹으로 나눔 (낮은 음부터 높은 음까지)
-    pitch_ranges = [
-        {"name": "매우 낮은 음역", "min": 80, "max": 130},
-        {"name": "낮은 음역", "min": 130, "max": 180},
-        {"name": "중하 음역", "min": 180, "max": 240},
-        {"name": "중간 음역", "min": 240, "max": 300},
-        {"name": "중상 음역", "min": 300, "max": 400},
-        {"name": "높은 음역", "min": 400, "max": 600},
-        {"name": "매우 높은 음역", "min": 600, "max": 1200}
-    ]
-    
-    # 피치 그룹별 세그먼트 분류
-    pitch_groups_data = defaultdict(list)
-    
-    for segment in segments:
-        if "pitch" not in segment:
-            continue
-            
-        pitch = segment["pitch"]
-        group_found = False
-        
-        for pitch_range in pitch_ranges:
-            if pitch_range["min"] <= pitch < pitch_range["max"]:
-                pitch_groups_data[pitch_range["name"]].append(segment)
-                group_found = True
-                break
-        
-        # 범위를 벗어나는 경우
-        if not group_found:
-            if pitch < pitch_ranges[0]["min"]:
-                pitch_groups_data[pitch_ranges[0]["name"]].append(segment)
-            elif pitch >= pitch_ranges[-1]["max"]:
-                pitch_groups_data[pitch_ranges[-1]["name"]].append(segment)
-    
-    # 각 그룹별 평균 계산
-    pitch_groups = []
+    # 피치가 있는 세그먼트만 사용
+    rows = [i for i, segment in enumerate(segments) if "pitch" in segment]
+    if not rows:
+        return []
+    pitched = [segments[i] for i in rows]
+    pitches = np.array([segment["pitch"] for segment in pitched], dtype=np.float64)
+    starts = np.array([segment["startTimeSec"] for segment in pitched], dtype=np.float64)
+    ends = np.array([segment["endTimeSec"] for segment in pitched], dtype=np.float64)
+    if label_codes is not None:
+        codes = np.asarray(label_codes, dtype=np.int64)[rows]
+    else:
+        codes = np.array([[LABEL_CODES.get(segment.get(key), -1) for key in RESULT_LABEL_KEYS]
+                          for segment in pitched], dtype=np.int64)
+    
+    weights = np.ones(len(rows)) if weights is None else np.asarray(weights, dtype=np.float64)[rows]
+    
+    # 밴드 배정과 밴드별 집계
+    n_bands = len(bands.names)
+    band = np.digitize(pitches, bands.edges)
+    counts = np.bincount(band, minlength=n_bands)
+    weight_sums = np.bincount(band, weights=weights, minlength=n_bands)
+    avg_pitches = np.bincount(band, weights=pitches * weights, minlength=n_bands) / np.maximum(weight_sums, 1)
+    first_start = np.full(n_bands, np.inf)
+    last_end = np.full(n_bands, -np.inf)
+    first_seen = np.full(n_bands, len(band))
+    np.minimum.at(first_start, band, starts)
+    np.maximum.at(last_end, band, ends)
+    np.minimum.at(first_seen, band, np.arange(len(band)))
+    
+    # 속성별 평균 점수 (라벨 코드 + 1)를 반올림하여 라벨로 변환 (유효한 라벨만 평균)
+    avg_labels = {}
+    for k, key in enumerate(RESULT_LABEL_KEYS):
+        valid = codes[:, k] >= 0
+        score_counts = np.bincount(band[valid], weights=weights[valid], minlength=n_bands)
+        score_sums = np.bincount(band[valid], weights=(codes[valid, k] + 1) * weights[valid], minlength=n_bands)
+        avg_scores = np.round(score_sums / np.maximum(score_counts, 1)).astype(np.int64)
+        avg_labels[key] = [SCORE_LABELS[score - 1] if n > 0 else DEFAULT_LABEL
+                           for score, n in zip(avg_scores.tolist(), score_counts.tolist())]
+    
+    # 밴드별 세그먼트 번호 (입력 순서 유지)
+    indices = np.array([segment["segmentIndex"] for segment in pitched])
+    band_indices = np.split(indices[np.argsort(band, kind='stable')], np.cumsum(counts)[:-1])
     
-    # 속성별 코드와 점수 매핑
-    attribute_mapping = {
-        "vocalCord": {"L_L": 1, "L_M": 2, "L_H": 3, "M_L": 4, "M_M": 5, "M_H": 6, "H_L": 7, "H_M": 8, "H_H": 9},
-        "contact": {"L_L": 1, "L_M": 2, "L_H": 3, "M_L": 4, "M_M": 5, "M_H": 6, "H_L": 7, "H_M": 8, "H_H": 9},
-        "larynx": {"L_L": 1, "L_M": 2, "L_H": 3, "M_L": 4, "M_M": 5, "M_H": 6, "H_L": 7, "H_M": 8, "H_H": 9},
-        "strength": {"L_L": 1, "L_M": 2, "L_H": 3, "M_L": 4, "M_M": 5, "M_H": 6, "H_L": 7, "H_M": 8, "H_H": 9}
-    }
-    
-    # 점수에서 코드로 변환하는 함수
-    def score_to_code(attribute, score):
-        for code, value in attribute_mapping[attribute].items():
-            if value == score:
-                return code
-        # 기본값 반환
-        return "M_M"
-    
-    for group_name, group_segments in pitch_groups_data.items():
-        if not group_segments:
-            continue
-            
-        # 평균 피치 계산
-        avg_pitch = np.mean([s["pitch"] for s in group_segments if "pitch" in s])
-        
-        # 각 속성의 평균 점수 계산
-        attributes = {"vocalCord": [], "contact": [], "larynx": [], "strength": []}
-        
-        for segment in group_segments:
-            for attr, attr_name in zip(
-                ["vocalCord", "contact", "larynx", "strength"],
-                ["vocal_cord", "contact", "larynx", "strength"]
-            ):
-                attr_key = attr  # JSON에서 사용하는 키
-                if attr_key in segment and segment[attr_key] in attribute_mapping[attr]:
-                    attributes[attr].append(attribute_mapping[attr][segment[attr_key]])
-        
-        # 평균 점수 계산 및 코드로 변환
-        avg_attributes = {}
-        for attr, scores in attributes.items():
-            if scores:
-                avg_score = round(np.mean(scores))
-                avg_attributes[attr] = score_to_code(attr, avg_score)
-            else:
-                avg_attributes[attr] = "M_M"  # 기본값
-        
-        # 시간 범위 계산
-        start_times = [s["startTimeSec"] for s in group_segments]
-        end_times = [s["endTimeSec"] for s in group_segments]
-        
-        # 해당 피치 그룹에 대한 피드백 생성
-        group_feedback = generate_pitch_group_feedback(group_name, avg_attributes)
-        
-        # 그룹 정보 저장
-        group_info = {
-            "pitchGroup": group_name,
-            "avgPitch": float(f"{avg_pitch:.2f}"),
-            "startTimeSec": float(f"{min(start_times):.2f}") if start_times else 0.0,
-            "endTimeSec": float(f"{max(end_times):.2f}") if end_times else 0.0,
-            "segmentCount": len(group_segments),
-            "vocalCord": avg_attributes["vocalCord"],
-            "contact": avg_attributes["contact"],
-            "larynx": avg_attributes["larynx"],
-            "strength": avg_attributes["strength"],
-            "feedback": group_feedback,
-            "segmentIndices": [s["segmentIndex"] for s in group_segments]
-        }
-        
-        pitch_groups.append(group_info)
+    pitch_groups = []
+    # 처음 나타난 순서로 만든 뒤 평균 피치 순으로 정렬 (평균 피치가 같으면 먼저 나타난 밴드가 앞)
+    for b in sorted(np.flatnonzero(counts).tolist(), key=lambda b: first_seen[b]):
+        attributes = {key: avg_labels[key][b] for key in RESULT_LABEL_KEYS}
+        pitch_groups.append({
+            "pitchGroup": bands.names[b],
+            "avgPitch": float(f"{avg_pitches[b]:.2f}"),
+            "startTimeSec": float(f"{first_start[b]:.2f}"),
+            "endTimeSec": float(f"{last_end[b]:.2f}"),
+            "segmentCount": int(counts[b]),
+            "vocalCord": attributes["vocalCord"],
+            "contact": attributes["contact"],
+            "larynx": attributes["larynx"],
+            "strength": attributes["strength"],
+            "feedback": generate_pitch_group_feedback(bands.names[b], attributes, bands.registers[b]),
+            "segmentIndices": band_indices[b].tolist()
+        })
     
     # 피치가 낮은 순으로 정렬
     pitch_groups.sort(key=lambda x: x["avgPitch"])
     
     return pitch_groups
 
-def generate_pitch_group_feedback(group_name, attributes):
+def generate_pitch_group_feedback(group_name, attributes, register=None):
     """
     피치 그룹별 피드백 생성
     
@@ -143,107 +194,96 @@ def generate_pitch_group_feedback(group_name, attributes):
         피치 그룹 이름
     attributes : dict
         평균 속성 값
+    register : str or None
+        추가 조언에 사용할 음역 이름 (None이면 group_name, 음이름 밴드는 그 음이 속한 음역)
     
     Returns:
     --------
     str
         생성된 피드백
     """
-    # 각 속성 코드별 설명
-    vocal_cord_feedback = {
-        "L_L": "성대가 매우 얇게 진동합니다.",
-        "L_M": "성대가 얇게 진동합니다.",
-        "L_H": "성대가 얇지만 강하게 진동합니다.",
-        "M_L": "성대가 적절한 두께로 진동하나 약간 부족합니다.",
-        "M_M": "성대가 적절한 두께로 진동합니다.",
-        "M_H": "성대가 적절한 두께로 강하게 진동합니다.",
-        "H_L": "성대가 두껍게 진동하나 약간 약합니다.",
-        "H_M": "성대가 두껍게 진동합니다.",
-        "H_H": "성대가 매우 두껍고 강하게 진동합니다."
-    }
-    
-    contact_feedback = {
-        "L_L": "성대 접촉이 매우 약합니다.",
-        "L_M": "성대 접촉이 약합니다.",
-        "L_H": "성대 접촉이 약하지만 긴장되어 있습니다.",
-        "M_L": "성대 접촉이 적절하나 약간 부족합니다.",
-        "M_M": "성대 접촉이 적절합니다.",
-        "M_H": "성대 접촉이 적절하나 약간 긴장되어 있습니다.",
-        "H_L": "성대 접촉이 강하나 약간 느슨합니다.",
-        "H_M": "성대 접촉이 강합니다.",
-        "H_H": "성대 접촉이 매우 강하고 긴장되어 있습니다."
-    }
-    
-    larynx_feedback = {
-        "L_L": "후두 위치가 매우 낮습니다.",
-        "L_M": "후두 위치가 낮습니다.",
-        "L_H": "후두 위치가 낮고 긴장되어 있습니다.",
-        "M_L": "후두 위치가 적절하나 약간 낮습니다.",
-        "M_M": "후두 위치가 적절합니다.",
-        "M_H": "후두 위치가 적절하나 약간 높습니다.",
-        "H_L": "후두 위치가 높으나 약간 이완되어 있습니다.",
-        "H_M": "후두 위치가 높습니다.",
-        "H_H": "후두 위치가 매우 높고 긴장되어 있습니다."
-    }
-    
-    strength_feedback = {
-        "L_L": "발성 강도가 매우 약합니다.",
-        "L_M": "발성 강도가 약합니다.",
-        "L_H": "발성 강도가 약하지만 힘이 들어갑니다.",
-        "M_L": "발성 강도가 적절하나 약간 부족합니다.",
-        "M_M": "발성 강도가 적절합니다.",
-        "M_H": "발성 강도가 적절하나 약간 강합니다.",
-        "H_L": "발성 강도가 강하나 약간 부족한 느낌입니다.",
-        "H_M": "발성 강도가 강합니다.",
-        "H_H": "발성 강도가 매우 강하고 긴장되어 있습니다."
-    }
-    
-    # 피치 그룹별 기본 피드백
-    pitch_group_base_feedback = {
-        "매우 낮은 음역": f"{group_name}에서는 ",
-        "낮은 음역": f"{group_name}에서는 ",
-        "중하 음역": f"{group_name}에서는 ",
-        "중간 음역": f"{group_name}에서는 ",
-        "중상 음역": f"{group_name}에서는 ",
-        "높은 음역": f"{group_name}에서는 ",
-        "매우 높은 음역": f"{group_name}에서는 "
-    }
-    
-    # 피드백 생성
-    feedback_parts = []
-    
     # 기본 피드백으로 시작
-    feedback = pitch_group_base_feedback.get(group_name, f"{group_name}에서는 ")
+    feedback = f"{group_name}에서는 "
     
     # 각 속성에 대한 피드백 추가
-    if attributes.get("vocalCord") in vocal_cord_feedback:
-        feedback_parts.append(vocal_cord_feedback[attributes["vocalCord"]])
-    
-    if attributes.get("contact") in contact_feedback:
-        feedback_parts.append(contact_feedback[attributes["contact"]])
-    
-    if attributes.get("larynx") in larynx_feedback:
-        feedback_parts.append(larynx_feedback[attributes["larynx"]])
-    
-    if attributes.get("strength") in strength_feedback:
-        feedback_parts.append(strength_feedback[attributes["strength"]])
+    feedback_parts = []
+    for key, table in ATTRIBUTE_FEEDBACK:
+        if attributes.get(key) in table:
+            feedback_parts.append(table[attributes[key]])
     
     # 피드백 조합
     feedback += " ".join(feedback_parts)
     
-    # 피치 그룹별 추가 조언
-    pitch_advice = {
-        "매우 낮은 음역": "이 매우 낮은 음역대에서는 성대를 충분히 두껍게 유지하며 편안하게 발성하는 것이 중요합니다.",
-        "낮은 음역": "이 낮은 음역대에서는 성대 접촉을 적절히 유지하면서 후두를 이완시키는 것이 도움이 됩니다.",
-        "중하 음역": "이 중하 음역대는 대화에서 자주 사용되는 범위로, 자연스럽고 편안한 발성을 유지하세요.",
-        "중간 음역": "이 중간 음역대에서는 균형 잡힌 발성이 중요하며, 과도한 힘을 빼고 자연스럽게 발성하세요.",
-        "중상 음역": "이 중상 음역대에서는 성대가 너무 얇아지지 않도록 하면서 후두 긴장을 조절하세요.",
-        "높은 음역": "이 높은 음역대에서는 후두가 과도하게 상승하지 않도록 주의하면서 성대 접촉을 유지하세요.",
-        "매우 높은 음역": "이 매우 높은 음역대에서는 후두 긴장을 최소화하고 가벼운 발성을 유지하는 것이 중요합니다."
-    }
-    
     # 추가 조언 추가
-    if group_name in pitch_advice:
-        feedback += " " + pitch_advice[group_name]
+    advice = PITCH_ADVICE.get(register or group_name)
+    if advice is not None:
+        feedback += " " + advice
     
-    return feedback
\ No newline at end of file
+    return feedback
+
+# 각 속성 코드별 설명
+VOCAL_CORD_FEEDBACK = {
+    "L_L": "성대가 매우 얇게 진동합니다.",
+    "L_M": "성대가 얇게 진동합니다.",
+    "L_H": "성대가 얇지만 강하게 진동합니다.",
+    "M_L": "성대가 적절한 두께로 진동하나 약간 부족합니다.",
+    "M_M": "성대가 적절한 두께로 진동합니다.",
+    "M_H": "성대가 적절한 두께로 강하게 진동합니다.",
+    "H_L": "성대가 두껍게 진동하나 약간 약합니다.",
+    "H_M": "성대가 두껍게 진동합니다.",
+    "H_H": "성대가 매우 두껍고 강하게 진동합니다."
+}
+
+CONTACT_FEEDBACK = {
+    "L_L": "성대 접촉이 매우 약합니다.",
+    "L_M": "성대 접촉이 약합니다.",
+    "L_H": "성대 접촉이 약하지만 긴장되어 있습니다.",
+    "M_L": "성대 접촉이 적절하나 약간 부족합니다.",
+    "M_M": "성대 접촉이 적절합니다.",
+    "M_H": "성대 접촉이 적절하나 약간 긴장되어 있습니다.",
+    "H_L": "성대 접촉이 강하나 약간 느슨합니다.",
+    "H_M": "성대 접촉이 강합니다.",
+    "H_H": "성대 접촉이 매우 강하고 긴장되어 있습니다."
+}
+
+LARYNX_FEEDBACK = {
+    "L_L": "후두 위치가 매우 낮습니다.",
+    "L_M": "후두 위치가 낮습니다.",
+    "L_H": "후두 위치가 낮고 긴장되어 있습니다.",
+    "M_L": "후두 위치가 적절하나 약간 낮습니다.",
+    "M_M": "후두 위치가 적절합니다.",
+    "M_H": "후두 위치가 적절하나 약간 높습니다.",
+    "H_L": "후두 위치가 높으나 약간 이완되어 있습니다.",
+    "H_M": "후두 위치가 높습니다.",
+    "H_H": "후두 위치가 매우 높고 긴장되어 있습니다."
+}
+
+STRENGTH_FEEDBACK = {
+    "L_L": "발성 강도가 매우 약합니다.",
+    "L_M": "발성 강도가 약합니다.",
+    "L_H": "발성 강도가 약하지만 힘이 들어갑니다.",
+    "M_L": "발성 강도가 적절하나 약간 부족합니다.",
+    "M_M": "발성 강도가 적절합니다.",
+    "M_H": "발성 강도가 적절하나 약간 강합니다.",
+    "H_L": "발성 강도가 강하나 약간 부족한 느낌입니다.",
+    "H_M": "발성 강도가 강합니다.",
+    "H_H": "발성 강도가 매우 강하고 긴장되어 있습니다."
+}
+
+# 음역별 추가 조언
+PITCH_ADVICE = {
+    "매우 낮은 음역": "이 매우 낮은 음역대에서는 성대를 충분히 두껍게 유지하며 편안하게 발성하는 것이 중요합니다.",
+    "낮은 음역": "이 낮은 음역대에서는 성대 접촉을 적절히 유지하면서 후두를 이완시키는 것이 도움이 됩니다.",
+    "중하 음역": "이 중하 음역대는 대화에서 자주 사용되는 범위로, 자연스럽고 편안한 발성을 유지하세요.",
+    "중간 음역": "이 중간 음역대에서는 균형 잡힌 발성이 중요하며, 과도한 힘을 빼고 자연스럽게 발성하세요.",
+    "중상 음역": "이 중상 음역대에서는 성대가 너무 얇아지지 않도록 하면서 후두 긴장을 조절하세요.",
+    "높은 음역": "이 높은 음역대에서는 후두가 과도하게 상승하지 않도록 주의하면서 성대 접촉을 유지하세요.",
+    "매우 높은 음역": "이 매우 높은 음역대에서는 후두 긴장을 최소화하고 가벼운 발성을 유지하는 것이 중요합니다."
+}
+
+ATTRIBUTE_FEEDBACK = (
+    ("vocalCord", VOCAL_CORD_FEEDBACK),
+    ("contact", CONTACT_FEEDBACK),
+    ("larynx", LARYNX_FEEDBACK),
+    ("strength", STRENGTH_FEEDBACK)
+)
@@ -0,0 +1,281 @@
+"""
+분석 결과 캐시 (내용 주소 기반)
+
+디코딩된 PCM의 해시, 모델 체크섬, 분석 파라미터를 묶은 키로 분석 결과를 캐시합니다.
+같은 녹음을 다시 제출하면 파이프라인 전체를 건너뜁니다.
+메모리 LRU 계층과 디스크 계층(총 크기 상한, 오래 사용하지 않은 파일부터 삭제)을 두며,
+모델이 핫 스왑되면 이전 모델로 만든 항목을 모두 무효화합니다.
+
+디스크 계층은 RESULT_CACHE_DISK=1일 때만 사용하며, 기본 위치는 실행 위치와 관계없이
+저장소의 cache/results입니다. 디스크 사용량은 시작할 때 한 번 읽은 뒤 쓰기/삭제마다
+갱신하므로 저장할 때 디렉터리 전체를 다시 읽지 않습니다.
+"""
+import os
+import copy
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# 상수 정의 (환경 변수로 조정 가능)
+CACHE_SCHEMA_VERSION = 1    # 결과 형식이 바뀌면 증가 (이전 캐시 항목 무시)
+RESULT_CACHE_ENABLED = os.environ.get('RESULT_CACHE_ENABLED', '1') != '0'
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('RESULT_CACHE_MAX_ENTRIES', 128))
+RESULT_CACHE_DISK = os.environ.get('RESULT_CACHE_DISK', '0') == '1'    # 디스크 계층 사용 여부
+RESULT_CACHE_DIR = os.environ.get(
+    'RESULT_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'results')
+)
+RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+logger = logging.getLogger(__name__)
+
+def audio_digest(y, sr):
+    """디코딩된 PCM (float32)과 샘플링 레이트의 SHA-256"""
+    digest = hashlib.sha256()
+    digest.update(str(int(sr)).encode())
+    digest.update(np.ascontiguousarray(y, dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+def make_cache_key(y, sr, model_checksum, params):
+    """
+    캐시 키 생성
+
+    Parameters:
+    -----------
+    y : numpy.ndarray
+        디코딩된 오디오
+    sr : int
+        샘플링 레이트
+    model_checksum : str
+        모델 체크포인트 SHA-256
+    params : dict
+        결과에 영향을 주는 분석 파라미터
+
+    Returns:
+    --------
+    str
+        캐시 키 (16진수)
+    """
+    digest = hashlib.sha256()
+    digest.update(audio_digest(y, sr).encode())
+    digest.update(model_checksum.encode())
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    digest.update(str(CACHE_SCHEMA_VERSION).encode())
+    return digest.hexdigest()
+
+class ResultCache:
+    """메모리 LRU + 디스크 2계층 분석 결과 캐시"""
+
+    def __init__(self, max_entries=RESULT_CACHE_MAX_ENTRIES, disk_dir=None, disk_max_bytes=RESULT_CACHE_MAX_BYTES):
+        """disk_dir가 None이면 디스크 계층을 사용하지 않음"""
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # 키 -> (모델 체크섬, 결과)
+        self._disk_index = OrderedDict()  # 디스크 파일 이름 -> 크기 (오래 사용하지 않은 순서)
+        self._disk_bytes = 0
+        self._watched = set()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            for _, size, name in sorted(self._disk_entries()):
+                self._disk_index[name] = size
+                self._disk_bytes += size
+
+    def _disk_path(self, key, model_checksum):
+        # 파일 이름에 모델 버전을 붙여 모델 교체 시 이전 항목을 찾아 지울 수 있도록 함
+        return os.path.join(self.disk_dir, f"{model_checksum[:12]}_{key}.json")
+
+    def get(self, key, model_checksum):
+        """
+        캐시된 결과 조회
+
+        Returns:
+        --------
+        dict or None
+            결과 사본 (없으면 None)
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return copy.deepcopy(entry[1])
+
+        result = self._read_disk(key, model_checksum)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, model_checksum, result)
+        return copy.deepcopy(result)
+
+    def put(self, key, model_checksum, result):
+        """결과 저장 (메모리와 디스크)"""
+        result = copy.deepcopy(result)
+        with self._lock:
+            self._remember(key, model_checksum, result)
+            self.stores += 1
+        self._write_disk(key, model_checksum, result)
+
+    def watch(self, registry):
+        """모델 레지스트리의 모델이 교체되면 캐시를 무효화하도록 등록"""
+        with self._lock:
+            if id(registry) in self._watched:
+                return
+            self._watched.add(id(registry))
+        registry.add_reload_listener(lambda info: self.invalidate_model(info['checksum']))
+
+    def invalidate_model(self, current_checksum):
+        """현재 모델이 아닌 모델로 만든 항목 전체 삭제"""
+        with self._lock:
+            stale = [key for key, (checksum, _) in self._memory.items() if checksum != current_checksum]
+            for key in stale:
+                del self._memory[key]
+            self.invalidations += 1
+
+        removed = 0
+        prefix = f"{current_checksum[:12]}_"
+        for name in self._disk_files():
+            if not name.startswith(prefix):
+                removed += self._remove_file(name)
+        logger.info("모델 교체로 결과 캐시 무효화 (메모리 %d개, 디스크 %d개)", len(stale), removed)
+
+    def clear(self):
+        """캐시 전체 삭제"""
+        with self._lock:
+            self._memory.clear()
+        for name in self._disk_files():
+            self._remove_file(name)
+
+    def stats(self):
+        """캐시 상태 (적중/미스 수 등) 반환"""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "enabled": RESULT_CACHE_ENABLED,
+                "memoryEntries": len(self._memory),
+                "maxEntries": self.max_entries,
+                "diskDir": self.disk_dir,
+                "diskBytes": self._disk_bytes,
+                "diskMaxBytes": self.disk_max_bytes,
+                "memoryHits": self.memory_hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "hitRate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+    def _remember(self, key, model_checksum, result):
+        """메모리 계층에 추가 후 LRU 제거 (호출자가 잠금 보유)"""
+        self._memory[key] = (model_checksum, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _read_disk(self, key, model_checksum):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key, model_checksum)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            os.utime(path)  # 재시작 후에도 디스크 LRU 순서 유지
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            name = os.path.basename(path)
+            if name in self._disk_index:
+                self._disk_index.move_to_end(name)
+        return result
+
+    def _write_disk(self, key, model_checksum, result):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key, model_checksum)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            logger.error("결과 캐시 저장 중 오류 발생: %s", e)
+            return
+        
+        with self._lock:
+            name = os.path.basename(path)
+            self._disk_bytes += size - self._disk_index.pop(name, 0)
+            self._disk_index[name] = size
+        self._enforce_disk_limit()
+
+    def _disk_files(self):
+        if not self.disk_dir:
+            return []
+        try:
+            return [name for name in os.listdir(self.disk_dir) if name.endswith('.json')]
+        except OSError:
+            return []
+
+    def _disk_entries(self):
+        """디스크 항목 (수정 시각, 크기, 이름) 목록"""
+        entries = []
+        for name in self._disk_files():
+            try:
+                stat = os.stat(os.path.join(self.disk_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        return entries
+
+    def _enforce_disk_limit(self):
+        """디스크 총 크기가 상한을 넘으면 가장 오래 사용하지 않은 파일부터 삭제"""
+        with self._lock:
+            evicted = []
+            while self._disk_bytes > self.disk_max_bytes and self._disk_index:
+                name, size = self._disk_index.popitem(last=False)
+                self._disk_bytes -= size
+                self.evictions += 1
+                evicted.append(name)
+        for name in evicted:
+            self._remove_file(name)
+
+    def _remove_file(self, name):
+        with self._lock:
+            self._disk_bytes -= self._disk_index.pop(name, 0)
+        try:
+            os.remove(os.path.join(self.disk_dir, name))
+            return 1
+        except OSError:
+            return 0
+
+# 프로세스 전역 캐시
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_result_cache():
+    """프로세스 전역 결과 캐시 반환 (비활성화된 경우 None)"""
+    global _cache
+    if not RESULT_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache(disk_dir=RESULT_CACHE_DIR if RESULT_CACHE_DISK else None)
+        return _cache
@@ -0,0 +1,121 @@
+"""
+분석 결과 압축 형식 (compact)
+
+기본 응답은 0.1초 세그먼트마다 같은 키의 객체를 반복하고, 통합 세그먼트와 피치 그룹은
+라벨 문자열과 긴 피드백 문장을 반복합니다. 압축 형식은 목록을 키별 열 배열로 바꾸고,
+라벨과 피드백 문장은 한 번만 담은 사전의 인덱스로 바꿉니다.
+
+    {
+        "format": "compact", "version": 1,
+        "labels": ["H_H", ...], "texts": ["후두의 ...", ...],
+        "labelColumns": ["vocalCord", ...], "textColumns": ["feedback"],
+        "segments": {"startTimeSec": [...], "pitch": [..., null], "vocalCord": [0, ...], ...},
+        ...
+    }
+
+열 길이는 모두 같으며, 원래 객체에 없던 값은 null입니다. 목록이 아닌 값(wavKey 등)은
+그대로 둡니다. 이 모듈은 표준 라이브러리만 사용합니다.
+"""
+
+# 상수 정의
+COMPACT_FORMAT = 'compact'
+COMPACT_VERSION = 1
+COLUMNAR_KEYS = ('segments', 'consolidatedSegments', 'pitchGroups')
+LABEL_COLUMNS = ('vocalCord', 'contact', 'larynx', 'strength')
+TEXT_COLUMNS = ('feedback',)
+
+class _Dictionary:
+    """문자열 -> 인덱스 사전 (처음 나온 순서 유지)"""
+
+    def __init__(self):
+        self.index = {}
+
+    def code(self, value):
+        if value is None:
+            return None
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.index)
+        return code
+
+    def values(self):
+        return list(self.index)
+
+def _columns(rows, labels, texts):
+    """객체 목록 -> 키별 열 배열 (키는 처음 나온 순서)"""
+    keys = {}
+    for row in rows:
+        for key in row:
+            keys.setdefault(key, None)
+
+    columns = {}
+    for key in keys:
+        column = [row.get(key) for row in rows]
+        if key in LABEL_COLUMNS:
+            column = [labels.code(value) for value in column]
+        elif key in TEXT_COLUMNS:
+            column = [texts.code(value) for value in column]
+        columns[key] = column
+    return columns
+
+def to_compact(result):
+    """
+    분석 결과를 압축 형식으로 변환
+
+    Parameters:
+    -----------
+    result : dict
+        analyze_audio 등이 반환한 분석 결과
+
+    Returns:
+    --------
+    dict
+        압축 형식 결과 (JSON/msgpack 직렬화 가능)
+    """
+    labels = _Dictionary()
+    texts = _Dictionary()
+    compact = {"format": COMPACT_FORMAT, "version": COMPACT_VERSION}
+    for key, value in result.items():
+        if key in COLUMNAR_KEYS and isinstance(value, list):
+            compact[key] = _columns(value, labels, texts)
+        else:
+            compact[key] = value
+
+    compact["labels"] = labels.values()
+    compact["texts"] = texts.values()
+    compact["labelColumns"] = list(LABEL_COLUMNS)
+    compact["textColumns"] = list(TEXT_COLUMNS)
+    return compact
+
+def from_compact(compact):
+    """
+    압축 형식을 기본 결과 형식으로 복원 (null 값은 키를 생략)
+
+    Returns:
+    --------
+    dict
+        to_compact에 넘긴 결과와 같은 딕셔너리
+    """
+    labels = compact["labels"]
+    texts = compact["texts"]
+    label_columns = set(compact["labelColumns"])
+    text_columns = set(compact["textColumns"])
+    metadata = {"format", "version", "labels", "texts", "labelColumns", "textColumns"}
+
+    result = {}
+    for key, value in compact.items():
+        if key in metadata:
+            continue
+        if key not in COLUMNAR_KEYS or not isinstance(value, dict):
+            result[key] = value
+            continue
+
+        n_rows = len(next(iter(value.values()), []))
+        rows = [{} for _ in range(n_rows)]
+        for column, values in value.items():
+            lookup = labels if column in label_columns else texts if column in text_columns else None
+            for row, item in zip(rows, values):
+                if item is not None:
+                    row[column] = lookup[item] if lookup is not None else item
+        result[key] = rows
+    return result
@@ -2,16 +2,47 @@
 세그먼트 처리 유틸리티 함수
 """
 import os
-from inference.speech_analysis_model import generate_segment_feedback
+import operator
 
-def consolidate_segments(segments):
+import numpy as np
+
+from inference.speech_analysis_model import (
+    LABEL_NAMES, LABEL_CODES, SEGMENT_FEEDBACK_TABLE, generate_segment_feedback
+)
+
+# 상수 정의
+RESULT_LABEL_KEYS = ('vocalCord', 'contact', 'larynx', 'strength')  # HEAD_NAMES 순서의 결과 키
+CONTIGUOUS_GAP_SEC = 0.05  # 앞 세그먼트 끝과 다음 세그먼트 시작 차이가 이 미만이면 연속으로 간주
+_TIME_COLUMNS = operator.itemgetter('startTimeSec', 'endTimeSec', 'segmentIndex')
+_LABEL_COLUMNS = operator.itemgetter(*RESULT_LABEL_KEYS)
+
+def label_code_column(labels):
+    """
+    라벨 문자열 목록 -> 정수 코드 배열
+
+    LABEL_NAMES의 라벨은 LABEL_CODES 값으로, 그 밖의 라벨은 서로 구분되는 9 이상의 코드로 바꿉니다.
+    """
+    codes = np.fromiter(map(LABEL_CODES.get, labels, [-1] * len(labels)), dtype=np.int64, count=len(labels))
+    if codes.min() < 0:
+        label_codes = dict(LABEL_CODES)
+        codes = np.fromiter((label_codes.setdefault(label, len(label_codes)) for label in labels),
+                            dtype=np.int64, count=len(labels))
+    return codes
+
+def consolidate_segments(segments, label_codes=None):
     """
     동일한 분석 결과를 가진 연속된 세그먼트를 하나로 통합
     
+    라벨을 (N, 4) 정수 코드 행렬로 바꾼 뒤, 이웃한 세그먼트의 라벨이 모두 같고 시간 간격이
+    CONTIGUOUS_GAP_SEC 미만인 구간을 NumPy 런 렝스 인코딩으로 한 번에 찾습니다.
+    구간별 피드백은 미리 계산한 SEGMENT_FEEDBACK_TABLE에서 조회합니다.
+    
     Parameters:
     -----------
     segments : list
         세그먼트 정보 목록
+    label_codes : numpy.ndarray or None
+        segments와 같은 순서의 (N, 4) 라벨 코드 (None이면 라벨 문자열에서 만듦)
         
     Returns:
     --------
@@ -21,70 +52,55 @@ def consolidate_segments(segments):
     if not segments:
         return []
     
-    # 시간 순으로 정렬
-    sorted_segments = sorted(segments, key=lambda x: x['startTimeSec'])
+    # 필요한 값을 열 단위로 한 번에 읽고 시간 순으로 정렬 (시작 시간이 같으면 입력 순서 유지,
+    # 분석 결과는 대개 이미 정렬되어 있음)
+    sorted_segments = segments
+    columns = list(zip(*map(_TIME_COLUMNS, segments)))
+    starts = np.array(columns[0], dtype=np.float64)
+    ends = np.array(columns[1], dtype=np.float64)
+    indices = list(columns[2])
+    if label_codes is None:
+        codes = np.stack([label_code_column(column) for column in zip(*map(_LABEL_COLUMNS, segments))], axis=1)
+    else:
+        codes = np.asarray(label_codes, dtype=np.int64)
     
-    consolidated = []
-    current_group = {
-        "startTimeSec": sorted_segments[0]['startTimeSec'],
-        "endTimeSec": sorted_segments[0]['endTimeSec'],
-        "segmentIndices": [sorted_segments[0]['segmentIndex']],
-        "vocalCord": sorted_segments[0]['vocalCord'],
-        "contact": sorted_segments[0]['contact'],
-        "larynx": sorted_segments[0]['larynx'],
-        "strength": sorted_segments[0]['strength']
-    }
+    if np.any(starts[1:] < starts[:-1]):
+        order = np.argsort(starts, kind='stable')
+        sorted_segments = [segments[i] for i in order.tolist()]
+        indices = [indices[i] for i in order.tolist()]
+        starts, ends, codes = starts[order], ends[order], codes[order]
     
-    for i in range(1, len(sorted_segments)):
-        segment = sorted_segments[i]
-        
-        # 특성 값이 모두 동일한지 확인
-        if (segment['vocalCord'] == current_group['vocalCord'] and
-            segment['contact'] == current_group['contact'] and
-            segment['larynx'] == current_group['larynx'] and
-            segment['strength'] == current_group['strength']):
-            
-            # 시간적으로 붙어있는지 확인
-            if abs(segment['startTimeSec'] - current_group['endTimeSec']) < 0.05:  # 50ms 이내면 연속으로 간주
-                # 그룹 확장
-                current_group['endTimeSec'] = segment['endTimeSec']
-                current_group['segmentIndices'].append(segment['segmentIndex'])
-            else:
-                # 붙어있지 않으면 새 그룹 시작 (같은 특성이지만 시간적으로 분리)
-                consolidated.append(current_group)
-                current_group = {
-                    "startTimeSec": segment['startTimeSec'],
-                    "endTimeSec": segment['endTimeSec'],
-                    "segmentIndices": [segment['segmentIndex']],
-                    "vocalCord": segment['vocalCord'],
-                    "contact": segment['contact'],
-                    "larynx": segment['larynx'],
-                    "strength": segment['strength']
-                }
-        else:
-            # 특성이 다르면 새 그룹 시작
-            consolidated.append(current_group)
-            current_group = {
-                "startTimeSec": segment['startTimeSec'],
-                "endTimeSec": segment['endTimeSec'],
-                "segmentIndices": [segment['segmentIndex']],
-                "vocalCord": segment['vocalCord'],
-                "contact": segment['contact'],
-                "larynx": segment['larynx'],
-                "strength": segment['strength']
-            }
+    # 특성 값이 모두 같고 시간적으로 붙어 있으면 앞 세그먼트와 같은 구간
+    same_labels = np.all(codes[1:] == codes[:-1], axis=1)
+    contiguous = np.abs(starts[1:] - ends[:-1]) < CONTIGUOUS_GAP_SEC
+    run_starts = np.flatnonzero(np.concatenate(([True], ~(same_labels & contiguous))))
+    run_ends = np.append(run_starts[1:], len(sorted_segments))
     
-    # 마지막 그룹 추가
-    consolidated.append(current_group)
+    # 구간별 피드백 (모든 라벨이 표에 있으면 코드 배열로 한 번에 조회)
+    run_codes = codes[run_starts]
+    if run_codes.max() < len(LABEL_NAMES):
+        feedbacks = SEGMENT_FEEDBACK_TABLE[tuple(run_codes.T)]
+    else:
+        feedbacks = [generate_segment_feedback({
+            "vocal_cord": sorted_segments[first]["vocalCord"],
+            "contact": sorted_segments[first]["contact"],
+            "larynx": sorted_segments[first]["larynx"],
+            "strength": sorted_segments[first]["strength"]
+        }) for first in run_starts]
     
-    # 그룹 번호 및 피드백 추가
-    for i, group in enumerate(consolidated, 1):
-        group["groupIndex"] = i
-        group["feedback"] = generate_segment_feedback({
-            "vocal_cord": group["vocalCord"],
-            "contact": group["contact"],
-            "larynx": group["larynx"],
-            "strength": group["strength"]
+    consolidated = []
+    for group_index, (first, last, feedback) in enumerate(zip(run_starts.tolist(), run_ends.tolist(), feedbacks), 1):
+        head = sorted_segments[first]
+        consolidated.append({
+            "startTimeSec": head['startTimeSec'],
+            "endTimeSec": sorted_segments[last - 1]['endTimeSec'],
+            "segmentIndices": indices[first:last],
+            "vocalCord": head['vocalCord'],
+            "contact": head['contact'],
+            "larynx": head['larynx'],
+            "strength": head['strength'],
+            "groupIndex": group_index,
+            "feedback": feedback
         })
     
     return consolidated
@@ -0,0 +1,86 @@
+"""
+침묵 구간 게이팅
+
+녹음 전체의 프레임 RMS를 한 번 계산하고, 그 분포에서 잡음 바닥(noise floor)을
+추정하여 녹음마다 적응형 임계값을 정합니다. 모든 후보 윈도우의 유지/제외 여부는
+누적합을 이용해 한 번의 NumPy 연산으로 결정합니다.
+"""
+import numpy as np
+
+from inference.frame_cache import frame_ranges
+
+# 상수 정의
+NOISE_FLOOR_PERCENTILE = 5    # 잡음 바닥 추정에 사용할 프레임 RMS 백분위
+LOUD_PERCENTILE = 95          # 발성 수준 추정에 사용할 프레임 RMS 백분위
+NOISE_FLOOR_MARGIN_DB = 10.0  # 잡음 바닥 위 여유 (dB)
+MIN_DYNAMIC_RANGE_DB = 15.0   # 잡음 바닥과 발성 수준 차이가 이보다 작으면 침묵 구간이 없다고 판단
+MIN_GATE_THRESHOLD = 1e-3     # 디지털 무음 수준 (이보다 낮은 임계값은 사용하지 않음)
+
+def db_to_amplitude(db):
+    """dB를 진폭 비율로 변환"""
+    return 10.0 ** (db / 20.0)
+
+def estimate_noise_floor(frame_rms):
+    """
+    프레임 RMS 분포에서 잡음 바닥 추정
+
+    Parameters:
+    -----------
+    frame_rms : numpy.ndarray
+        녹음 전체의 프레임별 RMS
+
+    Returns:
+    --------
+    tuple
+        (잡음 바닥 RMS, 발성 수준 RMS)
+    """
+    if len(frame_rms) == 0:
+        return 0.0, 0.0
+    noise_floor, loud_level = np.percentile(frame_rms, [NOISE_FLOOR_PERCENTILE, LOUD_PERCENTILE])
+    return float(noise_floor), float(loud_level)
+
+def adaptive_threshold(frame_rms):
+    """
+    녹음에 맞춘 침묵 판정 RMS 임계값
+
+    잡음 바닥보다 NOISE_FLOOR_MARGIN_DB 높은 값을 사용하되, 잡음 바닥과 발성 수준의
+    (dB 기준) 중간을 넘지 않도록 제한합니다. 두 수준의 차이가 MIN_DYNAMIC_RANGE_DB보다
+    작으면 녹음 전체가 발성이라고 보고 디지털 무음만 제외합니다.
+    """
+    noise_floor, loud_level = estimate_noise_floor(frame_rms)
+    if noise_floor <= 0 or loud_level < noise_floor * db_to_amplitude(MIN_DYNAMIC_RANGE_DB):
+        return MIN_GATE_THRESHOLD
+
+    threshold = min(noise_floor * db_to_amplitude(NOISE_FLOOR_MARGIN_DB), np.sqrt(noise_floor * loud_level))
+    return max(float(threshold), MIN_GATE_THRESHOLD)
+
+def gate_windows(frame_rms, start_samples, end_samples, hop_length, energy_threshold=None):
+    """
+    후보 윈도우 전체의 유지/제외 마스크 계산
+
+    Parameters:
+    -----------
+    frame_rms : numpy.ndarray
+        녹음 전체의 프레임별 RMS
+    start_samples : array-like
+        윈도우 시작 샘플 인덱스
+    end_samples : array-like
+        윈도우 끝 샘플 인덱스
+    hop_length : int
+        프레임 홉 길이
+    energy_threshold : float or None
+        고정 RMS 임계값 (None이면 잡음 바닥에서 적응형으로 결정)
+
+    Returns:
+    --------
+    tuple
+        (유지 여부 불리언 배열, 사용한 임계값)
+    """
+    threshold = adaptive_threshold(frame_rms) if energy_threshold is None else energy_threshold
+    return window_rms(frame_rms, start_samples, end_samples, hop_length) >= threshold, threshold
+
+def window_rms(frame_rms, start_samples, end_samples, hop_length):
+    """윈도우별 평균 프레임 RMS (누적합으로 한 번에 계산)"""
+    cumulative = np.concatenate([[0.0], np.cumsum(frame_rms)])
+    f0, f1 = frame_ranges(start_samples, end_samples, len(frame_rms), hop_length)
+    return (cumulative[f1] - cumulative[f0]) / (f1 - f0)
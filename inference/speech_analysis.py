@@ -2,14 +2,26 @@
 음성 분석을 위한 메인 모듈
 """
 import os
-import librosa
-import torch
+import logging
 import numpy as np
 
 # 모델 임포트
-from inference.speech_analysis_model import VoiceAnalysisModel, predict_voice_quality, generate_feedback, extract_features
+from inference.speech_analysis_model import (
+    predict_label_codes, generate_feedback, LABEL_NAMES, HEAD_NAMES
+)
+from inference.model_registry import get_registry
 from inference.segment_utils import consolidate_segments, generate_test_result
-from inference.pitch_analysis import group_segments_by_pitch
+from inference.pitch_analysis import group_segments_by_pitch, PITCH_BANDS
+from inference.frame_cache import AnalysisContext
+from inference.silence_gate import (
+    gate_windows, NOISE_FLOOR_PERCENTILE, LOUD_PERCENTILE, NOISE_FLOOR_MARGIN_DB,
+    MIN_DYNAMIC_RANGE_DB, MIN_GATE_THRESHOLD
+)
+from inference.result_cache import get_result_cache, make_cache_key
+from inference.audio_io import load_audio
+from inference.parallel_features import extract_features_parallel, FEATURE_EXECUTOR
+from inference.metrics import span, record_segments, record_fallback
+from inference.adaptive_segments import AdaptiveSelector, adaptive_params
 
 # 상수 정의
 SAMPLE_RATE = 22050
@@ -17,9 +29,22 @@ N_MFCC = 13
 N_FFT = 2048
 HOP_LENGTH = 512
 MICRO_SEGMENT_DURATION = 0.2  # 0.2초 단위로 분석
-MIN_ENERGY_THRESHOLD = 0.01   # 침묵 감지 임계값
+SEGMENT_OVERLAP = 0.5         # 미세 세그먼트 간 겹침 비율
+MIN_ENERGY_THRESHOLD = 0.01   # 고정 침묵 감지 임계값 (기본은 잡음 바닥 기반 적응형)
 
-def split_wav_to_micro_segments(y, sr, segment_duration=MICRO_SEGMENT_DURATION, overlap=0.5, energy_threshold=MIN_ENERGY_THRESHOLD):
+# 특성 추출 방식
+FEATURE_MODE_SEGMENT = 'segment'          # 세그먼트마다 독립적으로 추출 (학습 시와 동일)
+FEATURE_MODE_FRAME_CACHE = 'frame_cache'  # 녹음 전체 프레임을 한 번 분석 후 누적합으로 풀링
+FEATURE_MODE = FEATURE_MODE_SEGMENT
+
+# 세그먼트 분할 방식
+SEGMENTATION_GRID = 'grid'          # 격자의 모든 미세 세그먼트 분석
+SEGMENTATION_ADAPTIVE = 'adaptive'  # 음마다 대표 윈도우만 분석하고 라벨이 바뀌는 곳만 격자 단위로 분석
+SEGMENTATION_MODE = os.environ.get('SEGMENTATION_MODE', SEGMENTATION_GRID)
+
+logger = logging.getLogger(__name__)
+
+def split_wav_to_micro_segments(y, sr, segment_duration=MICRO_SEGMENT_DURATION, overlap=SEGMENT_OVERLAP, energy_threshold=None, context=None):
     """
     오디오를 미세 세그먼트로 분할하고 소음/침묵 구간 필터링
     
@@ -33,72 +58,176 @@ def split_wav_to_micro_segments(y, sr, segment_duration=MICRO_SEGMENT_DURATION,
         세그먼트 지속 시간(초)
     overlap : float
         세그먼트 간 겹침 비율
-    energy_threshold : float
-        RMS 에너지 임계값 (침묵 검출용)
+    energy_threshold : float or None
+        RMS 에너지 임계값 (침묵 검출용, None이면 잡음 바닥에서 적응형으로 결정)
+    context : AnalysisContext or None
+        녹음 전체 RMS/피치 추적을 공유할 분석 컨텍스트 (None이면 새로 생성)
         
     Returns:
     --------
     list
         (시작 시간, 종료 시간, 세그먼트 오디오, 피치) 튜플 목록
     """
+    if context is None:
+        context = AnalysisContext(y, sr)
+    
     duration = len(y) / sr
-    segments = []
     
     # 단계 크기 계산 (겹침 고려)
     step = segment_duration * (1 - overlap)
     start_times = np.arange(0, duration - segment_duration/2, step)
     
-    for start_time in start_times:
-        end_time = start_time + segment_duration
-        
-        # 세그먼트 경계가 오디오 길이를 초과하지 않도록 조정
-        if end_time > duration:
-            end_time = duration
-        
-        # 세그먼트 오디오 추출
-        start_idx = int(start_time * sr)
-        end_idx = int(end_time * sr)
-        segment_audio = y[start_idx:end_idx]
-        
-        # 세그먼트가 너무 짧으면 무시
-        if len(segment_audio) < 0.5 * segment_duration * sr:
-            continue
+    # 세그먼트 경계가 오디오 길이를 초과하지 않도록 조정
+    end_times = np.minimum(start_times + segment_duration, duration)
+    start_samples = (start_times * sr).astype(np.int64)
+    end_samples = (end_times * sr).astype(np.int64)
+    
+    # 세그먼트가 너무 짧으면 무시
+    keep = (end_samples - start_samples) >= 0.5 * segment_duration * sr
+    
+    # 침묵 구간 제외 (녹음 전체 프레임 RMS로 모든 윈도우를 한 번에 판정)
+    if np.any(keep):
+        voiced, threshold = gate_windows(context.rms, start_samples, end_samples, context.hop_length, energy_threshold)
+        keep &= voiced
+        logger.debug("침묵 판정 RMS 임계값: %.4f", threshold)
+    
+    if not np.any(keep):
+        return []
+    
+    start_times, end_times = start_times[keep], end_times[keep]
+    start_samples, end_samples = start_samples[keep], end_samples[keep]
+    
+    # 피치는 유지된 구간에서만 한 번 추적하고 세그먼트 프레임 구간별로 평균
+    context.restrict_to(start_samples, end_samples)
+    avg_pitches = context.pitch.segment_pitches(start_samples, end_samples)
+    
+    return [(float(start_time), float(end_time), y[start_idx:end_idx], float(avg_pitch))
+            for start_time, end_time, start_idx, end_idx, avg_pitch
+            in zip(start_times, end_times, start_samples, end_samples, avg_pitches)]
+
+def extract_segment_features(y, sr, segments, feature_mode=FEATURE_MODE, context=None, progress_callback=None,
+                             executor=FEATURE_EXECUTOR):
+    """
+    미세 세그먼트 목록의 특성 행렬 계산
+    
+    Parameters:
+    -----------
+    y : numpy.ndarray
+        전체 오디오 데이터
+    sr : int
+        샘플링 레이트
+    segments : list
+        split_wav_to_micro_segments 결과
+    feature_mode : str
+        'segment' (세그먼트별 추출) 또는 'frame_cache' (녹음 전체 프레임 캐시)
+    context : AnalysisContext or None
+        세그먼트 분할 때 사용한 분석 컨텍스트 (None이면 새로 생성)
+    progress_callback : callable or None
+        진행 상황 보고 함수 (완료한 세그먼트 수, 전체 세그먼트 수)
+    executor : str
+        세그먼트 모드 실행 방식 ('serial', 'thread', 'process', 'auto')
         
-        # RMS 에너지 계산하여 침묵 구간 감지
-        rms = librosa.feature.rms(y=segment_audio)[0]
-        if np.mean(rms) < energy_threshold:
-            continue  # 침묵 구간 무시
+    Returns:
+    --------
+    tuple
+        ((세그먼트 번호, 시작 시간, 종료 시간, 피치) 목록, (N, F) 특성 행렬 또는 None)
+    """
+    if context is None:
+        context = AnalysisContext(y, sr)
+    
+    start_samples = [int(start_time * sr) for start_time, _, _, _ in segments]
+    end_samples = [int(end_time * sr) for _, end_time, _, _ in segments]
+    
+    if feature_mode == FEATURE_MODE_FRAME_CACHE:
+        valid_segments = [(segment_idx, start_time, end_time, avg_pitch)
+                          for segment_idx, (start_time, end_time, _, avg_pitch) in enumerate(segments, 1)]
+        return valid_segments, context.frames.segment_features(start_samples, end_samples)
+    
+    # 피치 평균은 공유 피치 추적 결과 사용 (세그먼트마다 piptrack을 다시 실행하지 않음)
+    pitch_means = context.pitch.feature_pitch_means(start_samples, end_samples)
+    
+    # 세그먼트 순서를 유지한 채 샤드 단위로 병렬 추출 (짧은 녹음은 직렬)
+    rows = extract_features_parallel(y, sr, start_samples, end_samples, pitch_means,
+                                     executor=executor, progress_callback=progress_callback)
+    
+    valid_segments = []
+    feature_rows = []
+    
+    for segment_idx, ((start_time, end_time, _, avg_pitch), row) in enumerate(zip(segments, rows), 1):
+        if row is not None:
+            feature_rows.append(row)
+            valid_segments.append((segment_idx, start_time, end_time, avg_pitch))
+    
+    return valid_segments, np.stack(feature_rows) if feature_rows else None
+
+def predict_adaptive_segments(model, y, sr, segments, feature_mode=FEATURE_MODE, context=None, progress_callback=None):
+    """
+    적응형 분할로 일부 미세 세그먼트만 분석 (inference.adaptive_segments)
+    
+    음마다 대표 윈도우를 먼저 분석하고, 라벨이 다른 이웃 윈도우 사이만 차례로 더 분석합니다.
+    분석 회차마다 특성 추출과 예측 단계를 한 번씩 기록합니다.
+    
+    Parameters:
+    -----------
+    model : object
+        모델 레지스트리의 모델
+    y, sr, segments, feature_mode, context
+        extract_segment_features와 동일
+    progress_callback : callable or None
+        진행 상황 보고 함수 (라벨이 정해진 격자 윈도우 수, 전체 격자 윈도우 수)
+    
+    Returns:
+    --------
+    tuple
+        ((세그먼트 번호, 범위 시작 시간, 범위 끝 시간, 피치) 목록, (N, 4) 라벨 코드 또는 None,
+         세그먼트별 대표 격자 윈도우 수 또는 None)
+    """
+    if context is None:
+        context = AnalysisContext(y, sr)
+    
+    selector = AdaptiveSelector(segments, context, MICRO_SEGMENT_DURATION * (1 - SEGMENT_OVERLAP))
+    if progress_callback is not None:
+        progress_callback(0, selector.n_windows)
+    
+    windows = selector.initial_windows()
+    n_analyzed = 0
+    while len(windows):
+        with span('extract_features'):
+            valid_segments, features = extract_segment_features(
+                y, sr, [segments[i] for i in windows.tolist()], feature_mode, context)
+        rows = [int(windows[segment_idx - 1]) for segment_idx, _, _, _ in valid_segments]
+        codes = None
+        if features is not None:
+            with span('predict'):
+                codes = predict_label_codes(model, features)
         
-        # 피치 추출
-        try:
-            pitches, magnitudes = librosa.piptrack(
-                y=segment_audio, 
-                sr=sr, 
-                n_fft=N_FFT, 
-                hop_length=HOP_LENGTH,
-                fmin=80,  # 최소 주파수(Hz) 설정
-                fmax=1200  # 최대 주파수(Hz) 설정
-            )
-            
-            # 유효한 피치 값 추출
-            valid_pitches = []
-            for t in range(pitches.shape[1]):
-                index = magnitudes[:, t].argmax()
-                pitch = pitches[index, t]
-                if pitch > 0:  # 0이 아닌 피치만 고려
-                    valid_pitches.append(pitch)
-            
-            # 피치가 있는 경우만 평균 계산
-            avg_pitch = np.mean(valid_pitches) if valid_pitches else 0.0
-        except Exception as e:
-            print(f"피치 추출 중 오류 발생: {e}")
-            avg_pitch = 0.0
-            
-        segments.append((start_time, end_time, segment_audio, avg_pitch))
-    
-    return segments
+        n_analyzed += len(windows)
+        windows = selector.update(windows, rows, codes)
+        if progress_callback is not None:
+            progress_callback(selector.n_windows - selector.pending, selector.n_windows)
+    
+    logger.info("적응형 분할: 음 %d개, 격자 윈도우 %d개 중 %d개 분석",
+                selector.n_notes, selector.n_windows, n_analyzed)
+    return selector.segments()
+
+def analysis_params(feature_mode=FEATURE_MODE, segmentation=SEGMENTATION_MODE):
+    """결과에 영향을 주는 분석 파라미터 (결과 캐시 키에 포함)"""
+    return {
+        "sampleRate": SAMPLE_RATE,
+        "segmentDuration": MICRO_SEGMENT_DURATION,
+        "overlap": SEGMENT_OVERLAP,
+        "nFft": N_FFT,
+        "hopLength": HOP_LENGTH,
+        "energyThreshold": "adaptive",
+        "silenceGate": [NOISE_FLOOR_PERCENTILE, LOUD_PERCENTILE, NOISE_FLOOR_MARGIN_DB,
+                        MIN_DYNAMIC_RANGE_DB, MIN_GATE_THRESHOLD],
+        "featureMode": feature_mode,
+        "pitchBands": PITCH_BANDS,
+        "segmentation": [segmentation] + (adaptive_params() if segmentation == SEGMENTATION_ADAPTIVE else [])
+    }
 
-def analyze_wav_file(wav_path, model_path="models/best_voice_model.pt"):
+def analyze_wav_file(wav_path, model_path="models/best_voice_model.pt", feature_mode=FEATURE_MODE, progress_callback=None,
+                     use_cache=True):
     """
     WAV 파일을 분석하여 JSON 형식으로 결과 생성
     
@@ -108,113 +237,191 @@ def analyze_wav_file(wav_path, model_path="models/best_voice_model.pt"):
         WAV 파일 경로
     model_path : str
         학습된 모델 파일 경로
+    feature_mode : str
+        특성 추출 방식 ('segment' 또는 'frame_cache')
+    progress_callback : callable or None
+        진행 상황 보고 함수 (완료한 세그먼트 수, 전체 세그먼트 수)
+    use_cache : bool
+        결과 캐시 사용 여부
     
     Returns:
     --------
     dict
         분석 결과 (JSON 형식으로 저장 가능)
     """
-    # 디바이스 설정
-    device = torch.device('mps' if torch.backends.mps.is_available() else 'cuda' if torch.cuda.is_available() else 'cpu')
-    print(f"Using device: {device}")
+    # 긴 녹음은 전체를 메모리에 올리지 않고 블록 단위로 분석 (WINDOWED_MIN_SEC 설정 시)
+    from inference.windowed import use_windowed, analyze_wav_blocks
+    if use_windowed(wav_path):
+        return analyze_wav_blocks(wav_path, os.path.basename(wav_path), model_path, progress_callback)
     
     # WAV 파일 로드
     try:
-        y, sr = librosa.load(wav_path, sr=SAMPLE_RATE)
-        print(f"오디오 로드 성공: {wav_path}, 길이: {len(y)/sr:.2f}초")
+        with span('load'):
+            y, sr = load_audio(wav_path, SAMPLE_RATE)
+        logger.info("오디오 로드 성공: %s, 길이: %.2f초", wav_path, len(y) / sr)
     except Exception as e:
-        print(f"오디오 파일 로드 중 오류 발생: {e}")
+        logger.error("오디오 파일 로드 중 오류 발생: %s", e)
+        record_fallback('load_error')
         return generate_test_result(wav_path)
     
-    # 모델 로드 - 입력 크기는 실제 특성 추출 함수와 일치
-    # 테스트 추출로 크기 확인
-    test_segment = y[:int(MICRO_SEGMENT_DURATION * sr)] if len(y) > int(MICRO_SEGMENT_DURATION * sr) else y
-    test_features = extract_features(test_segment, sr)
-    input_size = test_features.shape[0]
+    return analyze_audio(y, sr, os.path.basename(wav_path), model_path, feature_mode, progress_callback, use_cache)
+
+def analyze_audio(y, sr, wav_key, model_path="models/best_voice_model.pt", feature_mode=FEATURE_MODE, progress_callback=None,
+                  use_cache=True, segmentation=SEGMENTATION_MODE):
+    """
+    디코딩된 오디오를 분석하여 JSON 형식으로 결과 생성
     
-    model = VoiceAnalysisModel(input_size=input_size).to(device)
+    Parameters:
+    -----------
+    y : numpy.ndarray
+        오디오 데이터 (SAMPLE_RATE)
+    sr : int
+        샘플링 레이트
+    wav_key : str
+        결과에 표시할 파일 이름
+    model_path, feature_mode, progress_callback, use_cache
+        analyze_wav_file과 동일
+    segmentation : str
+        세그먼트 분할 방식 ('grid' 또는 'adaptive')
     
-    try:
-        # 모델 디렉토리 확인
-        model_dir = os.path.dirname(model_path)
-        if not os.path.exists(model_dir):
-            os.makedirs(model_dir, exist_ok=True)
-            print(f"모델 디렉토리 '{model_dir}'를 생성했습니다.")
-        
-        # 모델 파일이 존재하는지 확인
-        if not os.path.exists(model_path):
-            print(f"경고: 모델 파일 '{model_path}'이 존재하지 않습니다. 테스트 모드로 실행합니다.")
-            # 테스트 모드: 랜덤한 결과 생성
-            return generate_test_result(wav_path)
-        
-        model.load_state_dict(torch.load(model_path, map_location=device))
-        model.eval()
-        print(f"모델 '{model_path}'을 성공적으로 로드했습니다.")
-    except Exception as e:
-        print(f"모델 로드 중 오류 발생: {e}")
+    Returns:
+    --------
+    dict
+        분석 결과 (JSON 형식으로 저장 가능)
+    """
+    # 모델 가져오기 - 프로세스 전역 레지스트리에서 한 번만 로드하여 재사용
+    registry = get_registry(model_path)
+    model, model_info = registry.snapshot()
+    if model is None:
+        logger.warning("모델 '%s'을 사용할 수 없습니다 (%s). 테스트 모드로 실행합니다.",
+                       model_path, registry.stats()['lastError'])
         # 테스트 모드: 랜덤한 결과 생성
-        return generate_test_result(wav_path)
+        record_fallback('model_unavailable')
+        return generate_test_result(wav_key)
+    
+    # 같은 오디오/모델/파라미터 조합은 캐시된 결과 사용
+    cache = get_result_cache() if use_cache else None
+    if cache is not None:
+        cache.watch(registry)
+        with span('cache_lookup'):
+            params = dict(analysis_params(feature_mode, segmentation), inferenceMode=model_info["mode"])
+            cache_key = make_cache_key(y, sr, model_info["checksum"], params)
+            cached = cache.get(cache_key, model_info["checksum"])
+        if cached is not None:
+            logger.info("캐시된 분석 결과 사용 (키: %s)", cache_key[:12])
+            cached["wavKey"] = wav_key
+            if progress_callback is not None:
+                progress_callback(len(cached["segments"]), len(cached["segments"]))
+            return cached
     
     # 미세 세그먼트로 나누기
-    print("오디오를 0.2초 단위 미세 세그먼트로 분할 중...")
-    segments = split_wav_to_micro_segments(y, sr)
-    print(f"총 {len(segments)}개의 미세 세그먼트 생성됨")
+    context = AnalysisContext(y, sr)
+    with span('split'):
+        segments = split_wav_to_micro_segments(y, sr, context=context)
+    logger.info("총 %d개의 미세 세그먼트 생성됨", len(segments))
     
     if len(segments) == 0:
-        print("경고: 유효한 세그먼트가 없습니다. 테스트 모드로 실행합니다.")
-        return generate_test_result(wav_path)
+        record_fallback('no_segments')
+        return generate_test_result(wav_key)
+    
+    if segmentation == SEGMENTATION_ADAPTIVE:
+        # 음마다 대표 윈도우만 분석 (세그먼트마다 대표하는 격자 범위를 시간 범위로 사용)
+        valid_segments, label_codes, weights = predict_adaptive_segments(
+            model, y, sr, segments, feature_mode, context, progress_callback)
+    else:
+        # 세그먼트별 특성 추출
+        if progress_callback is not None:
+            progress_callback(0, len(segments))
+        with span('extract_features'):
+            valid_segments, features = extract_segment_features(y, sr, segments, feature_mode, context, progress_callback)
+        
+        # 모든 세그먼트를 한 번의 순전파로 예측
+        label_codes = weights = None
+        if features is not None:
+            with span('predict'):
+                label_codes = predict_label_codes(model, features)
     
-    # 세그먼트별 분석
     segment_results = []
     segment_predictions = []
     
-    for segment_idx, (start_time, end_time, segment_audio, avg_pitch) in enumerate(segments, 1):
-        try:
-            # 미세 세그먼트 분석
-            predictions = predict_voice_quality(model, segment_audio, sr)
-            
-            # 결과 저장
-            segment_info = {
-                "segmentIndex": segment_idx,
-                "startTimeSec": float(f"{start_time:.2f}"),
-                "endTimeSec": float(f"{end_time:.2f}"),
-                "vocalCord": predictions['vocal_cord'],
-                "contact": predictions['contact'],
-                "larynx": predictions['larynx'],
-                "strength": predictions['strength']
-            }
-            
-            # 피치 정보 추가 (유효한 경우)
-            if avg_pitch > 0:
-                segment_info["pitch"] = float(f"{avg_pitch:.2f}")
-            
-            segment_results.append(segment_info)
+    if label_codes is not None:
+        labels = {key: LABEL_NAMES[label_codes[:, i]].tolist() for i, key in enumerate(HEAD_NAMES)}
+        
+        for row, (segment_idx, start_time, end_time, avg_pitch) in enumerate(valid_segments):
+            predictions = {key: str(values[row]) for key, values in labels.items()}
+            segment_results.append(build_segment_result(segment_idx, start_time, end_time, avg_pitch, predictions))
             segment_predictions.append(predictions)
-            
-        except Exception as e:
-            print(f"세그먼트 분석 중 오류 발생: {e}")
     
     # 세그먼트가 충분한지 확인
     if len(segment_results) == 0:
-        print("경고: 분석에 성공한 세그먼트가 없습니다. 테스트 모드로 실행합니다.")
-        return generate_test_result(wav_path)
+        record_fallback('no_valid_segments')
+        return generate_test_result(wav_key)
+    
+    record_segments(len(segment_results))
+    result = summarize_segments(wav_key, segment_results, segment_predictions, label_codes, weights)
+    if cache is not None:
+        cache.put(cache_key, model_info["checksum"], result)
     
+    return result
+
+def build_segment_result(segment_idx, start_time, end_time, avg_pitch, predictions):
+    """세그먼트 하나의 결과 딕셔너리 구성 (JSON 응답 형식)"""
+    segment_info = {
+        "segmentIndex": segment_idx,
+        "startTimeSec": float(f"{start_time:.2f}"),
+        "endTimeSec": float(f"{end_time:.2f}"),
+        "vocalCord": predictions['vocal_cord'],
+        "contact": predictions['contact'],
+        "larynx": predictions['larynx'],
+        "strength": predictions['strength']
+    }
+    
+    # 피치 정보 추가 (유효한 경우)
+    if avg_pitch > 0:
+        segment_info["pitch"] = float(f"{avg_pitch:.2f}")
+    
+    return segment_info
+
+def summarize_segments(wav_key, segment_results, segment_predictions, label_codes=None, weights=None):
+    """
+    세그먼트 결과를 통합/그룹화하여 최종 분석 결과 구성
+    
+    Parameters:
+    -----------
+    wav_key : str
+        결과에 표시할 파일 이름
+    segment_results : list
+        build_segment_result로 만든 세그먼트 결과 목록
+    segment_predictions : list
+        세그먼트별 예측 딕셔너리 목록
+    label_codes : numpy.ndarray or None
+        segment_results와 같은 순서의 (N, 4) 라벨 코드 (있으면 통합/그룹화 시 라벨 문자열을 다시 읽지 않음)
+    weights : numpy.ndarray or None
+        세그먼트별 피치 그룹 집계 가중치 (적응형 분할에서 대표하는 격자 윈도우 수)
+    
+    Returns:
+    --------
+    dict
+        분석 결과 (JSON 형식으로 저장 가능)
+    """
     # 세그먼트를 통합하여 구간별 피드백 생성
-    consolidated_segments = consolidate_segments(segment_results)
+    with span('consolidate'):
+        consolidated_segments = consolidate_segments(segment_results, label_codes)
     
     # 피치별 그룹화 및 분석
-    pitch_groups = group_segments_by_pitch(segment_results)
+    with span('group_by_pitch'):
+        pitch_groups = group_segments_by_pitch(segment_results, label_codes, weights=weights)
     
     # 전체 피드백 생성 (첫 번째 세그먼트 기반)
     try:
         feedback = generate_feedback(segment_predictions[0])
     except Exception as e:
-        print(f"피드백 생성 중 오류 발생: {e}")
+        logger.error("피드백 생성 중 오류 발생: %s", e)
         feedback = "자동 생성된 피드백을 제공할 수 없습니다."
     
     # 결과 JSON 구성
     result = {
-        "wavKey": os.path.basename(wav_path),
+        "wavKey": wav_key,
         "scaleType": feedback,
         "segments": segment_results,  # 원시 세그먼트 결과 (차트용)
         "consolidatedSegments": consolidated_segments,  # 통합된 세그먼트 (UI 표시용)
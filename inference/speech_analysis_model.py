@@ -1,9 +1,10 @@
-import torch
-import torch.nn as nn
-import torch.nn.functional as F
-import librosa
+import itertools
+import importlib
+
 import numpy as np
 
+from inference.feature_engine import compute_segment_features
+
 # 상수 정의
 SAMPLE_RATE = 22050
 N_MFCC = 13
@@ -11,48 +12,17 @@ N_FFT = 2048
 HOP_LENGTH = 512
 MICRO_SEGMENT_DURATION = 0.2  # 0.2초 단위 세그먼트
 
-class VoiceAnalysisModel(nn.Module):
-    """음성 분석을 위한 딥러닝 모델"""
-    
-    def __init__(self, input_size=63, hidden_size1=256, hidden_size2=128, hidden_size3=64):
-        super(VoiceAnalysisModel, self).__init__()
-        
-        # 특성 추출 레이어 - 학습된 모델과 일치하도록 설정
-        self.shared_layers = nn.Sequential(
-            nn.Linear(input_size, hidden_size1),
-            nn.ReLU(),
-            nn.Dropout(0.3),
-            nn.Linear(hidden_size1, hidden_size2),
-            nn.ReLU(),
-            nn.Dropout(0.2),
-            nn.Linear(hidden_size2, hidden_size3),
-            nn.ReLU()
-        )
-        
-        # 분류 헤드 (모든 헤드는 6개 클래스로)
-        self.vocal_cord_head = nn.Linear(hidden_size3, 6)
-        self.contact_head = nn.Linear(hidden_size3, 6)
-        self.larynx_head = nn.Linear(hidden_size3, 6)
-        self.strength_head = nn.Linear(hidden_size3, 6)
-    
-    def forward(self, x):
-        # 특성 추출
-        x = self.shared_layers(x)
-        
-        # 각 특성에 대한 분류
-        vocal_cord = self.vocal_cord_head(x)
-        contact = self.contact_head(x)
-        larynx = self.larynx_head(x)
-        strength = self.strength_head(x)
-        
-        return {
-            'vocal_cord': vocal_cord,
-            'contact': contact,
-            'larynx': larynx,
-            'strength': strength
-        }
+# torch가 필요한 이름은 처음 접근할 때 inference.torch_model에서 불러옴 (PEP 562)
+_TORCH_ATTRIBUTES = ('VoiceAnalysisModel', 'decode_label', 'decode_label_codes')
 
-def extract_features(audio, sr=SAMPLE_RATE):
+# 라벨 정의
+HEAD_NAMES = ['vocal_cord', 'contact', 'larynx', 'strength']
+LABEL_LEVELS = ['L', 'M', 'H']
+# 라벨 코드 = 앞 상태 인덱스 * 3 + 뒤 상태 인덱스 (예: 'M_H' -> 5)
+LABEL_NAMES = np.array([f"{first}_{second}" for first in LABEL_LEVELS for second in LABEL_LEVELS])
+LABEL_CODES = {str(name): code for code, name in enumerate(LABEL_NAMES)}
+
+def extract_features(audio, sr=SAMPLE_RATE, pitch_mean=None):
     """
     오디오에서 특성 추출 - 미세 세그먼트 특화 기능 추가
     
@@ -62,6 +32,8 @@ def extract_features(audio, sr=SAMPLE_RATE):
         오디오 데이터
     sr : int
         샘플링 레이트
+    pitch_mean : float or None
+        미리 계산한 피치 평균 (None이면 세그먼트에서 직접 추적)
             
     Returns:
     --------
@@ -73,114 +45,111 @@ def extract_features(audio, sr=SAMPLE_RATE):
     if len(audio) < min_samples:
         audio = np.pad(audio, (0, min_samples - len(audio)), 'constant')
     
-    # MFCC 추출
-    mfccs = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=N_MFCC, n_fft=N_FFT, hop_length=HOP_LENGTH)
-    mfccs = np.mean(mfccs.T, axis=0)  # 평균값으로 요약
-    
-    # 스펙트로그램 추출
-    mel_spec = librosa.feature.melspectrogram(y=audio, sr=sr, n_fft=N_FFT, hop_length=HOP_LENGTH)
-    log_mel_spec = librosa.power_to_db(mel_spec)
-    log_mel_spec = np.mean(log_mel_spec, axis=1)  # 주파수 차원으로 평균
-    
-    # 제로 크로싱 레이트, 스펙트럴 센트로이드, 피치 추정
-    zero_crossing = librosa.feature.zero_crossing_rate(audio)
-    zero_crossing = np.mean(zero_crossing)
-    spectral_centroid = librosa.feature.spectral_centroid(y=audio, sr=sr)
-    spectral_centroid = np.mean(spectral_centroid)
-    pitches, magnitudes = librosa.piptrack(y=audio, sr=sr, n_fft=N_FFT, hop_length=HOP_LENGTH)
-    pitch_mean = np.mean(pitches[magnitudes > 0]) if np.any(magnitudes > 0) else 0
-    
-    # 추가 특성
-    # RMS 에너지 (볼륨)
-    rms = librosa.feature.rms(y=audio)[0]
-    rms_mean = np.mean(rms)
-    rms_var = np.var(rms)
-    
-    # 스펙트럴 플럭스 (스펙트럼 변화율)
-    spec_flux = np.mean(librosa.onset.onset_strength(y=audio, sr=sr))
-    
-    # 스펙트럴 롤오프 (주파수 에너지 분포)
-    rolloff = librosa.feature.spectral_rolloff(y=audio, sr=sr)[0]
-    rolloff_mean = np.mean(rolloff)
-    
-    # 스펙트럴 대비 (고주파 대역 대비)
-    contrast = librosa.feature.spectral_contrast(y=audio, sr=sr)
-    contrast_mean = np.mean(contrast)
-    
-    # 시간적 특성 (미세 세그먼트 시작/중간/끝 RMS)
-    n_frames = len(rms)
-    if n_frames >= 3:
-        rms_start = np.mean(rms[:n_frames//3])
-        rms_middle = np.mean(rms[n_frames//3:(2*n_frames)//3])
-        rms_end = np.mean(rms[(2*n_frames)//3:])
-    else:
-        rms_start = rms_middle = rms_end = rms_mean
-    
-    # 특성 결합
-    features = np.concatenate([
-        mfccs, 
-        log_mel_spec, 
-        [zero_crossing, spectral_centroid, pitch_mean, 
-         rms_mean, rms_var, spec_flux, rolloff_mean, contrast_mean,
-         rms_start, rms_middle, rms_end]
-    ])
-    
-    print(f"특성 벡터 차원: {features.shape}")
-    
-    return features
+    # 단일 스펙트럼 특성 엔진으로 추출 (세그먼트당 STFT 1회)
+    return compute_segment_features(audio, sr, pitch_mean)
 
-def decode_label(outputs):
+def predict_label_codes(model, features):
     """
-    모델 출력을 라벨 문자열로 디코딩
+    특성 행렬 전체에 대해 한 번의 순전파로 라벨 코드 예측
     
     Parameters:
     -----------
-    outputs : torch.Tensor
-        모델 출력 텐서 (6개 요소: 앞 3개는 시작 상태, 뒤 3개는 종료 상태)
+    model : VoiceAnalysisModel or NumpyVoiceModel
+        eval 모드의 torch 모델 또는 NumPy 백엔드 모델
+    features : numpy.ndarray
+        (N, F) 특성 행렬
         
     Returns:
     --------
-    str
-        디코딩된 라벨 (예: 'H_L')
+    numpy.ndarray
+        (N, 4) 라벨 코드 배열
     """
-    mapping = {0: 'L', 1: 'M', 2: 'H'}
+    features = np.asarray(features, dtype=np.float32)
+    if len(features) == 0:
+        return np.zeros((0, len(HEAD_NAMES)), dtype=np.int64)
     
-    # 첫번째 부분 (앞의 3개 요소)
-    first_probs = outputs[:3]
-    first_idx = torch.argmax(first_probs).item()
+    # NumPy 백엔드는 자체 예측 메서드를 가지므로 torch를 임포트하지 않음
+    if hasattr(model, 'predict_label_codes'):
+        return model.predict_label_codes(features)
     
-    # 두번째 부분 (뒤의 3개 요소)
-    second_probs = outputs[3:]
-    second_idx = torch.argmax(second_probs).item()
+    from inference.torch_model import predict_label_codes as predict_with_torch
+    return predict_with_torch(model, features)
+
+def predict_voice_quality_batch(model, features):
+    """
+    배치 음성 품질 예측 함수
     
-    return f"{mapping[first_idx]}_{mapping[second_idx]}"
+    Parameters:
+    -----------
+    model : VoiceAnalysisModel or NumpyVoiceModel
+        eval 모드의 모델
+    features : numpy.ndarray
+        (N, F) 특성 행렬 (세그먼트별 특성 벡터를 쌓은 것)
+        
+    Returns:
+    --------
+    dict
+        헤드 이름별 (N,) 라벨 문자열 배열
+    """
+    codes = predict_label_codes(model, features)
+    return {key: LABEL_NAMES[codes[:, i]] for i, key in enumerate(HEAD_NAMES)}
 
 def predict_voice_quality(model, audio, sr=SAMPLE_RATE):
     """음성 품질 예측 함수"""
-    # 디바이스 설정
-    device = next(model.parameters()).device
-    
     # 특성 추출
     features = extract_features(audio, sr)
     
-    # 텐서로 변환 및 배치 차원 추가
-    features_tensor = torch.FloatTensor(features).unsqueeze(0).to(device)
+    # 배치 크기 1로 예측
+    predictions = predict_voice_quality_batch(model, features[np.newaxis, :])
     
-    # 예측
-    with torch.no_grad():
-        outputs = model(features_tensor)
+    return {key: str(labels[0]) for key, labels in predictions.items()}
+
+def generate_segment_feedback(predictions):
+    """
+    개별 세그먼트에 대한 간결한 피드백 (미리 계산한 SEGMENT_FEEDBACK_TABLE에서 조회)
+    
+    Parameters:
+    -----------
+    predictions : dict
+        예측 결과 (특성별 라벨)
         
-        # 각 특성에 대한 출력 디코딩
-        predictions = {}
-        for key, value in outputs.items():
-            pred_tensor = value[0]  # 첫 번째(유일한) 배치 항목
-            
-            # 라벨 디코딩
-            predictions[key] = decode_label(pred_tensor)
+    Returns:
+    --------
+    str
+        세그먼트별 피드백
+    """
+    codes = _label_codes(predictions)
+    if codes is None:
+        return _build_segment_feedback(predictions)
+    return SEGMENT_FEEDBACK_TABLE[codes]
+
+def generate_feedback(predictions):
+    """
+    전체 피드백 (미리 계산한 FEEDBACK_TABLE에서 조회)
     
-    return predictions
+    Parameters:
+    -----------
+    predictions : dict
+        예측 결과 (특성별 라벨)
+        
+    Returns:
+    --------
+    str
+        생성된 피드백 문자열
+    """
+    codes = _label_codes(predictions)
+    if codes is None:
+        return _build_feedback(predictions)
+    return FEEDBACK_TABLE[codes]
 
-def generate_segment_feedback(predictions):
+def _label_codes(predictions):
+    """헤드별 라벨 -> 피드백 표 인덱스 (HEAD_NAMES 순서, 알 수 없는 라벨이 있으면 None)"""
+    try:
+        return tuple(LABEL_CODES[predictions[key]] for key in HEAD_NAMES)
+    except (KeyError, TypeError):
+        return None
+
+def _build_segment_feedback(predictions):
     """
     개별 세그먼트에 대한 간결한 피드백 생성
     
@@ -229,7 +198,7 @@ def generate_segment_feedback(predictions):
     return f"성대 진동: {predictions['vocal_cord']}, 접촉: {predictions['contact']}, " + \
            f"후두 위치: {predictions['larynx']}, 발성 강도: {predictions['strength']}"
 
-def generate_feedback(predictions):
+def _build_feedback(predictions):
     """
     전체 피드백 생성 함수 (종합 분석)
     
@@ -286,3 +255,19 @@ def generate_feedback(predictions):
         feedback += "또한 부분적으로 필요보다 좀 더 가볍게 진동하는 경향도 보입니다. "
     
     return feedback.strip()
+
+def _build_feedback_table(build):
+    """라벨 조합 9^4개 전체의 피드백 표 (인덱스는 HEAD_NAMES 순서의 라벨 코드)"""
+    names = [str(name) for name in LABEL_NAMES]
+    table = np.empty(len(names) ** len(HEAD_NAMES), dtype=object)
+    table[:] = [build(dict(zip(HEAD_NAMES, labels))) for labels in itertools.product(names, repeat=len(HEAD_NAMES))]
+    return table.reshape((len(names),) * len(HEAD_NAMES))
+
+# 피드백 문장은 라벨 조합으로만 정해지므로 임포트 시 한 번 계산 (코드 배열로 한 번에 조회 가능)
+SEGMENT_FEEDBACK_TABLE = _build_feedback_table(_build_segment_feedback)
+FEEDBACK_TABLE = _build_feedback_table(_build_feedback)
+
+def __getattr__(name):
+    if name not in _TORCH_ATTRIBUTES:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    return getattr(importlib.import_module('inference.torch_model'), name)
@@ -0,0 +1,323 @@
+"""
+녹음 중 실시간 스트리밍 분석
+
+녹음되는 PCM 청크를 받는 즉시 미세 세그먼트 파이프라인을 점진적으로 실행합니다.
+프레임(RMS, 피치)은 필요한 샘플이 모두 도착한 프레임부터 계산하고, 윈도우는 마지막
+프레임이 준비되는 대로 특성 추출과 예측까지 마쳐 결과를 바로 돌려줍니다.
+청크 사이에는 아직 끝나지 않은 윈도우/프레임이 필요로 하는 샘플만 남겨 둡니다.
+마지막 청크가 도착하면 남은 꼬리 윈도우를 처리한 뒤 통합/피치 그룹화만 수행합니다.
+
+침묵 판정 임계값은 그때까지 받은 프레임에서 추정하므로, 녹음 전체로 추정하는
+analyze_wav_file과 경계 근처 세그먼트의 포함 여부가 다를 수 있습니다.
+"""
+import os
+import time
+import uuid
+import logging
+import threading
+
+import librosa
+import numpy as np
+import soxr
+
+from inference.feature_engine import SAMPLE_RATE, N_FFT, HOP_LENGTH
+from inference.frame_cache import frame_count, frame_ranges, pitch_columns
+from inference.silence_gate import adaptive_threshold
+from inference.speech_analysis_model import extract_features, predict_label_codes, LABEL_NAMES, HEAD_NAMES
+from inference.model_registry import get_registry
+from inference.speech_analysis import MICRO_SEGMENT_DURATION, build_segment_result, summarize_segments
+from inference.segment_utils import generate_test_result
+from inference.metrics import span, record_segments, record_fallback
+
+# 상수 정의
+STREAM_DTYPE = '<f4'             # 청크 형식: 리틀 엔디언 float32 모노 PCM
+GATE_WARMUP_SEC = 1.0            # 적응형 침묵 임계값을 추정하기 전 최소 수신 길이(초)
+STREAM_IDLE_TIMEOUT_SEC = 120    # 청크가 이 시간 동안 오지 않은 스트림은 폐기
+STREAM_MAX_SESSIONS = int(os.environ.get('STREAM_MAX_SESSIONS', 32))  # 동시에 열 수 있는 스트림 수
+
+logger = logging.getLogger(__name__)
+
+class StreamingAnalyzer:
+    """스트림 하나의 점진적 미세 세그먼트 분석 상태"""
+
+    def __init__(self, model_path="models/best_voice_model.pt", input_sr=SAMPLE_RATE, wav_key="stream.wav",
+                 segment_duration=MICRO_SEGMENT_DURATION, overlap=0.5, energy_threshold=None):
+        self.sr = SAMPLE_RATE
+        self.wav_key = wav_key
+        self.segment_duration = segment_duration
+        self.step = segment_duration * (1 - overlap)
+        self.energy_threshold = energy_threshold
+        self.n_fft = N_FFT
+        self.hop_length = HOP_LENGTH
+        self.model = get_registry(model_path).get()
+
+        # 브라우저 샘플링 레이트가 다르면 상태를 유지하는 스트림 리샘플러 사용
+        self._resampler = None
+        if input_sr != SAMPLE_RATE:
+            self._resampler = soxr.ResampleStream(input_sr, SAMPLE_RATE, 1, dtype='float32')
+
+        # 수신한 오디오 (self._offset 이전 샘플은 더 이상 필요 없어 버림)
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._offset = 0
+        self.n_samples = 0
+
+        # 완료된 프레임의 RMS와 피치 열 (frame_cache.pitch_columns 형식)
+        self._rms = np.zeros(0)
+        self._pitch = np.zeros((0, 4))
+
+        self._next_window = 0
+        self._segment_idx = 0
+        self.segment_results = []
+        self.segment_predictions = []
+        self._label_codes = []   # 예측 배치별 (n, 4) 라벨 코드
+        self.finished = False
+        self.last_activity = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def received_sec(self):
+        """지금까지 받은 오디오 길이(초)"""
+        return self.n_samples / self.sr
+
+    @property
+    def windows_done(self):
+        """지금까지 처리한 윈도우 수 (침묵으로 제외한 윈도우 포함)"""
+        return self._next_window
+
+    def feed(self, chunk):
+        """
+        PCM 청크 추가 후 새로 완료된 세그먼트 분석
+
+        Parameters:
+        -----------
+        chunk : numpy.ndarray
+            모노 float32 오디오 청크 (입력 샘플링 레이트)
+
+        Returns:
+        --------
+        list
+            이번 청크로 완료된 세그먼트 결과 목록 (analyze_wav_file의 segments 형식)
+        """
+        with self._lock:
+            if self.finished:
+                raise RuntimeError("이미 종료된 스트림입니다.")
+            with span('stream_chunk'):
+                self._append(chunk)
+                self._advance_frames(final=False)
+                return self._analyze(self._collect_windows(final=False))
+
+    def finish(self, chunk=None):
+        """
+        마지막 청크 처리 후 최종 분석 결과 반환
+
+        Returns:
+        --------
+        dict
+            analyze_wav_file과 같은 형식의 분석 결과
+        """
+        with self._lock:
+            if self.finished:
+                raise RuntimeError("이미 종료된 스트림입니다.")
+            if chunk is not None:
+                self._append(chunk)
+            if self._resampler is not None:
+                self._append_resampled(self._resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True))
+            with span('stream_chunk'):
+                self._advance_frames(final=True)
+                self._analyze(self._collect_windows(final=True))
+            self.finished = True
+
+        logger.info("스트림 '%s' 종료: %.2f초, 세그먼트 %d개", self.wav_key, self.received_sec, len(self.segment_results))
+        if self.model is None or len(self.segment_results) == 0:
+            record_fallback('model_unavailable' if self.model is None else 'no_valid_segments')
+            return generate_test_result(self.wav_key)
+
+        record_segments(len(self.segment_results))
+
+        # 남은 작업은 통합과 피치 그룹화뿐
+        return summarize_segments(self.wav_key, self.segment_results, self.segment_predictions,
+                                  np.concatenate(self._label_codes))
+
+    def _append(self, chunk):
+        chunk = np.asarray(chunk, dtype=np.float32)
+        if self._resampler is not None:
+            chunk = self._resampler.resample_chunk(chunk)
+        self._append_resampled(chunk)
+
+    def _append_resampled(self, chunk):
+        self._buffer = np.concatenate([self._buffer, chunk])
+        self.n_samples += len(chunk)
+        self.last_activity = time.monotonic()
+
+    def _samples(self, start, end):
+        """절대 샘플 구간 [start, end) (녹음 범위 밖은 0으로 채움)"""
+        out = np.zeros(end - start, dtype=np.float32)
+        lo, hi = max(start, self._offset), min(end, self.n_samples)
+        if hi > lo:
+            out[lo - start:hi - start] = self._buffer[lo - self._offset:hi - self._offset]
+        return out
+
+    def _advance_frames(self, final):
+        """필요한 샘플이 모두 도착한 프레임의 RMS와 피치 계산 (중심 정렬 프레임)"""
+        half = self.n_fft // 2
+        if final:
+            target = frame_count(self.n_samples, self.hop_length)
+        else:
+            target = max((self.n_samples - half) // self.hop_length + 1, 0)
+
+        j0 = len(self._rms)
+        if target <= j0:
+            return
+
+        block = self._samples(j0 * self.hop_length - half, (target - 1) * self.hop_length + half)
+        frames = librosa.util.frame(block, frame_length=self.n_fft, hop_length=self.hop_length)
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=0))
+        S = np.abs(librosa.stft(block, n_fft=self.n_fft, hop_length=self.hop_length, center=False))
+
+        self._rms = np.concatenate([self._rms, rms])
+        self._pitch = np.vstack([self._pitch, pitch_columns(S, self.sr)])
+
+    def _collect_windows(self, final):
+        """
+        프레임이 모두 준비된 다음 윈도우들을 꺼내 침묵 구간 제외
+
+        윈도우 격자와 길이 규칙은 split_wav_to_micro_segments와 같습니다.
+        """
+        # 적응형 임계값은 충분한 오디오를 받은 뒤부터 사용
+        if not final and self.energy_threshold is None and self.received_sec < GATE_WARMUP_SEC:
+            return []
+
+        n_frames = len(self._rms)
+        duration = self.n_samples / self.sr
+        windows = []
+
+        while True:
+            start_time = self._next_window * self.step
+            if final:
+                if not start_time < duration - self.segment_duration / 2:
+                    break
+                end_time = min(start_time + self.segment_duration, duration)
+            else:
+                end_time = start_time + self.segment_duration
+
+            start_idx, end_idx = int(start_time * self.sr), int(end_time * self.sr)
+            f0, f1 = frame_ranges([start_idx], [end_idx], n_frames if final else np.iinfo(np.int64).max,
+                                  self.hop_length)
+            if not final and (end_idx > self.n_samples or f1[0] > n_frames):
+                break
+
+            self._next_window += 1
+            # 세그먼트가 너무 짧으면 무시
+            if end_idx - start_idx >= 0.5 * self.segment_duration * self.sr:
+                windows.append((start_time, end_time, start_idx, end_idx, int(f0[0]), int(f1[0])))
+
+        if not windows:
+            return []
+
+        threshold = adaptive_threshold(self._rms) if self.energy_threshold is None else self.energy_threshold
+        return [window for window in windows if np.mean(self._rms[window[4]:window[5]]) >= threshold]
+
+    def _analyze(self, windows):
+        """윈도우들의 특성 추출과 예측 (한 번의 순전파) 후 결과 추가"""
+        valid_segments = []
+        feature_rows = []
+
+        for start_time, end_time, start_idx, end_idx, f0, f1 in windows:
+            self._segment_idx += 1
+            segment_pitch, voiced, feature_sum, feature_count = self._pitch[f0:f1].sum(axis=0)
+            avg_pitch = segment_pitch / voiced if voiced > 0 else 0.0
+            pitch_mean = feature_sum / feature_count if feature_count > 0 else 0.0
+
+            try:
+                feature_rows.append(extract_features(self._samples(start_idx, end_idx), self.sr, pitch_mean))
+                valid_segments.append((self._segment_idx, start_time, end_time, avg_pitch))
+            except Exception as e:
+                logger.warning("세그먼트 분석 중 오류 발생: %s", e)
+
+        self._trim()
+
+        if not feature_rows or self.model is None:
+            return []
+
+        label_codes = predict_label_codes(self.model, np.stack(feature_rows))
+        self._label_codes.append(label_codes)
+        labels = {key: LABEL_NAMES[label_codes[:, i]].tolist() for i, key in enumerate(HEAD_NAMES)}
+        new_results = []
+        for row, (segment_idx, start_time, end_time, avg_pitch) in enumerate(valid_segments):
+            predictions = {key: str(values[row]) for key, values in labels.items()}
+            new_results.append(build_segment_result(segment_idx, start_time, end_time, avg_pitch, predictions))
+            self.segment_predictions.append(predictions)
+
+        self.segment_results.extend(new_results)
+        return new_results
+
+    def _trim(self):
+        """다음 윈도우와 다음 프레임이 필요로 하지 않는 앞쪽 샘플 버리기"""
+        next_window_start = int(self._next_window * self.step * self.sr)
+        next_frame_start = len(self._rms) * self.hop_length - self.n_fft // 2
+        keep_from = min(next_window_start, next_frame_start, self.n_samples)
+        if keep_from > self._offset:
+            self._buffer = self._buffer[keep_from - self._offset:]
+            self._offset = keep_from
+
+class StreamLimitReached(Exception):
+    """열린 스트림이 너무 많아 새 스트림을 시작할 수 없음"""
+
+class StreamSessions:
+    """
+    진행 중인 스트림 분석 세션 저장소
+
+    오랫동안 청크가 없는 세션은 세션을 만들거나 조회하거나 셀 때마다 정리하며,
+    동시에 열 수 있는 세션 수는 max_sessions로 제한합니다.
+    """
+
+    def __init__(self, idle_timeout=STREAM_IDLE_TIMEOUT_SEC, max_sessions=STREAM_MAX_SESSIONS):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def create(self, model_path, input_sr=SAMPLE_RATE):
+        """
+        새 스트림 세션 생성 후 (스트림 ID, 분석기) 반환
+
+        Raises:
+        -------
+        StreamLimitReached
+            열린 세션 수가 max_sessions에 도달한 경우
+        """
+        stream_id = str(uuid.uuid4())
+        with self._lock:
+            self._expire_idle()
+            if len(self._sessions) >= self.max_sessions:
+                raise StreamLimitReached(f"진행 중인 스트림이 너무 많습니다 (최대 {self.max_sessions}개).")
+            analyzer = StreamingAnalyzer(model_path, input_sr, wav_key=f"{stream_id}.wav")
+            self._sessions[stream_id] = analyzer
+        return stream_id, analyzer
+
+    def get(self, stream_id):
+        """세션 조회 (없거나 만료되었으면 None)"""
+        with self._lock:
+            self._expire_idle()
+            return self._sessions.get(stream_id)
+
+    def count(self):
+        """진행 중인 세션 수"""
+        with self._lock:
+            self._expire_idle()
+            return len(self._sessions)
+
+    def pop(self, stream_id):
+        """세션 제거 후 반환 (없으면 None)"""
+        with self._lock:
+            return self._sessions.pop(stream_id, None)
+
+    def _expire_idle(self):
+        """오랫동안 청크가 없는 세션 삭제 (호출자가 잠금 보유)"""
+        now = time.monotonic()
+        expired = [stream_id for stream_id, analyzer in self._sessions.items()
+                   if now - analyzer.last_activity > self.idle_timeout]
+        for stream_id in expired:
+            del self._sessions[stream_id]
+        if expired:
+            logger.info("유휴 스트림 %d개 폐기", len(expired))
@@ -0,0 +1,126 @@
+"""
+PyTorch 모델 정의와 torch 기반 추론
+
+VoiceAnalysisModel과 torch 텐서를 다루는 디코딩/예측 함수입니다. NumPy 추론 백엔드를
+사용하는 서비스 작업자는 이 모듈을 임포트하지 않으므로 torch를 불러오지 않습니다.
+"""
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+from inference.speech_analysis_model import HEAD_NAMES
+
+class VoiceAnalysisModel(nn.Module):
+    """음성 분석을 위한 딥러닝 모델"""
+
+    def __init__(self, input_size=63, hidden_size1=256, hidden_size2=128, hidden_size3=64):
+        super(VoiceAnalysisModel, self).__init__()
+
+        # 특성 추출 레이어 - 학습된 모델과 일치하도록 설정
+        self.shared_layers = nn.Sequential(
+            nn.Linear(input_size, hidden_size1),
+            nn.ReLU(),
+            nn.Dropout(0.3),
+            nn.Linear(hidden_size1, hidden_size2),
+            nn.ReLU(),
+            nn.Dropout(0.2),
+            nn.Linear(hidden_size2, hidden_size3),
+            nn.ReLU()
+        )
+
+        # 분류 헤드 (모든 헤드는 6개 클래스로)
+        self.vocal_cord_head = nn.Linear(hidden_size3, 6)
+        self.contact_head = nn.Linear(hidden_size3, 6)
+        self.larynx_head = nn.Linear(hidden_size3, 6)
+        self.strength_head = nn.Linear(hidden_size3, 6)
+
+    def forward(self, x):
+        # 특성 추출
+        x = self.shared_layers(x)
+
+        # 각 특성에 대한 분류
+        vocal_cord = self.vocal_cord_head(x)
+        contact = self.contact_head(x)
+        larynx = self.larynx_head(x)
+        strength = self.strength_head(x)
+
+        return {
+            'vocal_cord': vocal_cord,
+            'contact': contact,
+            'larynx': larynx,
+            'strength': strength
+        }
+
+def decode_label(outputs):
+    """
+    모델 출력을 라벨 문자열로 디코딩
+
+    Parameters:
+    -----------
+    outputs : torch.Tensor
+        모델 출력 텐서 (6개 요소: 앞 3개는 시작 상태, 뒤 3개는 종료 상태)
+
+    Returns:
+    --------
+    str
+        디코딩된 라벨 (예: 'H_L')
+    """
+    mapping = {0: 'L', 1: 'M', 2: 'H'}
+
+    # 첫번째 부분 (앞의 3개 요소)
+    first_probs = outputs[:3]
+    first_idx = torch.argmax(first_probs).item()
+
+    # 두번째 부분 (뒤의 3개 요소)
+    second_probs = outputs[3:]
+    second_idx = torch.argmax(second_probs).item()
+
+    return f"{mapping[first_idx]}_{mapping[second_idx]}"
+
+def decode_label_codes(outputs):
+    """
+    여러 세그먼트의 모델 출력을 한 번에 라벨 코드로 디코딩
+
+    Parameters:
+    -----------
+    outputs : dict
+        헤드 이름별 (N, 6) 출력 텐서
+
+    Returns:
+    --------
+    numpy.ndarray
+        (N, 4) 라벨 코드 배열 (HEAD_NAMES 순서, 값은 LABEL_NAMES 인덱스)
+    """
+    # (N, 4, 6) -> (N, 4, 2, 3): 헤드별 시작/종료 상태의 3개 점수
+    stacked = torch.stack([outputs[key] for key in HEAD_NAMES], dim=1)
+    idx = stacked.reshape(stacked.shape[0], len(HEAD_NAMES), 2, 3).argmax(dim=3)
+    codes = idx[..., 0] * 3 + idx[..., 1]
+
+    # 디바이스 동기화는 여기서 한 번만 발생
+    return codes.cpu().numpy()
+
+def predict_label_codes(model, features):
+    """
+    torch 모델로 특성 행렬 전체에 대해 한 번의 순전파로 라벨 코드 예측
+
+    Parameters:
+    -----------
+    model : VoiceAnalysisModel or torch.jit.ScriptModule
+        eval 모드의 모델
+    features : numpy.ndarray
+        (N, F) float32 특성 행렬 (비어 있지 않음)
+
+    Returns:
+    --------
+    numpy.ndarray
+        (N, 4) 라벨 코드 배열
+    """
+    # 고정된 TorchScript 모델은 파라미터가 없으며 CPU에서 실행
+    parameter = next(model.parameters(), None)
+    device = parameter.device if parameter is not None else torch.device('cpu')
+
+    features_tensor = torch.from_numpy(features).to(device)
+    with torch.no_grad():
+        outputs = model(features_tensor)
+
+    return decode_label_codes(outputs)
@@ -0,0 +1,87 @@
+"""
+시작 시 워밍업
+
+배포 직후 첫 요청이 numba JIT 컴파일(piptrack 등), 모델 로드 비용을
+떠안지 않도록, 일반적인 녹음 길이의 합성 음계 톤으로 analyze_wav_file 파이프라인
+전체를 미리 실행합니다. 톤 길이는 병렬 특성 추출 기준(MIN_PARALLEL_SEGMENTS)보다 짧게 두어
+FEATURE_EXECUTOR 설정과 관계없이 직렬로 추출하므로, 워밍업이 프로세스 풀 작업자를 띄우지 않습니다.
+워밍업 분석은 기록하지 않는 요청 추적 안에서 실행하므로 서비스 지표(/metrics)에 섞이지 않습니다.
+"""
+import os
+import time
+import logging
+import tempfile
+
+import numpy as np
+import soundfile as sf
+
+from inference.feature_engine import SAMPLE_RATE
+from inference.metrics import request_trace
+from inference.speech_analysis import analyze_wav_file
+
+# 상수 정의
+WARMUP_DURATIONS_SEC = (1.0, 5.0)         # 워밍업할 녹음 길이 (짧은 녹음 / 일반 음계, 병렬 특성 추출 기준 미만)
+WARMUP_BASE_FREQ = 220.0                   # 합성 음계 시작 음 (A3)
+WARMUP_SCALE_STEPS = (0, 2, 4, 5, 7, 5, 4, 2)  # 5도 음계 (반음 단위)
+WARMUP_HARMONICS = 5
+WARMUP_NOTE_GAP = 0.05                     # 음 사이 무음 비율 (침묵 판정 경로도 실행)
+
+logger = logging.getLogger(__name__)
+
+def synthetic_scale(duration, sr=SAMPLE_RATE):
+    """
+    배음이 있는 합성 음계 톤 생성
+
+    Parameters:
+    -----------
+    duration : float
+        길이(초)
+    sr : int
+        샘플링 레이트
+
+    Returns:
+    --------
+    numpy.ndarray
+        float32 오디오
+    """
+    n_samples = int(duration * sr)
+    t = np.arange(n_samples) / sr
+
+    # 음계를 녹음 길이에 맞게 반복
+    note_len = max(duration / len(WARMUP_SCALE_STEPS), 0.25)
+    note_idx = (t // note_len).astype(int) % len(WARMUP_SCALE_STEPS)
+    freqs = WARMUP_BASE_FREQ * 2.0 ** (np.asarray(WARMUP_SCALE_STEPS)[note_idx] / 12.0)
+    phase = 2 * np.pi * np.cumsum(freqs) / sr
+
+    y = sum(np.sin(k * phase) / k for k in range(1, WARMUP_HARMONICS + 1))
+    y *= (t % note_len) >= WARMUP_NOTE_GAP * note_len
+    return (0.3 * y / np.max(np.abs(y))).astype(np.float32)
+
+def run_warmup(model_path="models/best_voice_model.pt", durations=WARMUP_DURATIONS_SEC):
+    """
+    합성 톤으로 분석 파이프라인 전체 실행
+
+    Returns:
+    --------
+    dict
+        길이별 소요 시간과 전체 소요 시간(초)
+    """
+    start = time.perf_counter()
+    timings = {}
+
+    for duration in durations:
+        fd, tmp_path = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        try:
+            sf.write(tmp_path, synthetic_scale(duration), SAMPLE_RATE)
+            tone_start = time.perf_counter()
+            with request_trace(record=False):
+                analyze_wav_file(tmp_path, model_path, use_cache=False)
+            timings[duration] = time.perf_counter() - tone_start
+        finally:
+            os.remove(tmp_path)
+        logger.info("워밍업: %.0f초 톤 분석 %.2f초", duration, timings[duration])
+
+    total = time.perf_counter() - start
+    logger.info("워밍업 완료: 총 %.2f초", total)
+    return {"durations": timings, "totalSec": total}
@@ -0,0 +1,173 @@
+"""
+긴 녹음의 블록 단위 분석 (메모리 사용량 일정)
+
+analyze_wav_file은 녹음 전체를 디코딩해 메모리에 올리므로 레슨 전체 녹음처럼 긴 파일은
+작업자 메모리를 많이 차지합니다. 이 모드는 soundfile.blocks로 파일을 일정 길이 블록씩
+읽어 스트리밍 분석기(StreamingAnalyzer)에 넘기며, 분석기는 아직 끝나지 않은 윈도우와
+프레임이 필요로 하는 샘플만 다음 블록으로 넘기므로 오디오 메모리는 녹음 길이와 무관합니다.
+
+침묵 판정 임계값은 analyze_wav_file과 같이 녹음 전체의 프레임 RMS로 정하기 위해, 먼저
+파일을 한 번 훑어 프레임 RMS만 계산합니다 (파일을 두 번 읽음). 결과 캐시는 사용하지 않습니다.
+
+WINDOWED_MIN_SEC가 0보다 크면 이보다 긴 녹음은 analyze_wav_file과 업로드 분석에서 자동으로
+이 모드를 사용합니다.
+"""
+import os
+import logging
+
+import librosa
+import numpy as np
+import soundfile as sf
+import soxr
+
+from inference.feature_engine import SAMPLE_RATE, N_FFT, HOP_LENGTH
+from inference.audio_io import to_mono, RESAMPLE_QUALITY
+from inference.frame_cache import frame_count
+from inference.silence_gate import adaptive_threshold
+from inference.speech_analysis import MICRO_SEGMENT_DURATION, SEGMENT_OVERLAP
+from inference.streaming import StreamingAnalyzer
+from inference.metrics import span
+
+# 상수 정의
+WINDOWED_MIN_SEC = float(os.environ.get('WINDOWED_MIN_SEC', 0))      # 이 길이 이상이면 블록 단위 분석 (0이면 사용 안 함)
+WINDOWED_BLOCK_SEC = float(os.environ.get('WINDOWED_BLOCK_SEC', 10))  # 한 번에 읽는 블록 길이(초)
+
+logger = logging.getLogger(__name__)
+
+def audio_duration(source):
+    """
+    soundfile로 읽을 수 있는 녹음의 길이(초)
+
+    Parameters:
+    -----------
+    source : str or file-like
+        파일 경로 또는 탐색 가능한 파일 객체 (읽은 뒤 처음 위치로 되돌림)
+
+    Returns:
+    --------
+    float or None
+        길이 (soundfile이 읽지 못하는 형식이면 None)
+    """
+    try:
+        with sf.SoundFile(source) as f:
+            duration = f.frames / f.samplerate
+    except Exception:
+        duration = None
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return duration
+
+def use_windowed(source):
+    """WINDOWED_MIN_SEC 설정에 따라 블록 단위 분석을 사용할지 여부"""
+    if WINDOWED_MIN_SEC <= 0:
+        return False
+    duration = audio_duration(source)
+    return duration is not None and duration >= WINDOWED_MIN_SEC
+
+def read_blocks(source, block_sec=WINDOWED_BLOCK_SEC, target_sr=SAMPLE_RATE):
+    """
+    녹음을 블록 단위로 읽어 분석 샘플링 레이트의 float32 모노 블록 생성
+
+    리샘플링은 상태를 유지하는 soxr 스트림 리샘플러로 블록 경계 없이 이어서 수행합니다.
+
+    Yields:
+    -------
+    numpy.ndarray
+        float32 모노 오디오 블록
+    """
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    with sf.SoundFile(source) as f:
+        resampler = None
+        if f.samplerate != target_sr:
+            resampler = soxr.ResampleStream(f.samplerate, target_sr, 1, dtype='float32', quality=RESAMPLE_QUALITY)
+
+        for block in f.blocks(blocksize=max(int(block_sec * f.samplerate), 1), dtype='float32', always_2d=True):
+            block = to_mono(block)
+            yield resampler.resample_chunk(block) if resampler is not None else block
+
+        if resampler is not None:
+            yield resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+
+def _frame_rms(block, n_fft, hop_length):
+    frames = librosa.util.frame(block, frame_length=n_fft, hop_length=hop_length)
+    return np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=0))
+
+def scan_frame_rms(blocks, n_fft=N_FFT, hop_length=HOP_LENGTH):
+    """
+    블록을 차례로 받아 녹음 전체의 중심 정렬 프레임 RMS 계산
+
+    프레임 경계에 걸친 샘플만 다음 블록으로 넘기며, 녹음 앞뒤는 0으로 채웁니다
+    (StreamingAnalyzer와 같은 프레임 격자).
+
+    Returns:
+    --------
+    numpy.ndarray
+        프레임별 RMS
+    """
+    buffer = np.zeros(n_fft // 2, dtype=np.float32)
+    n_samples = 0
+    parts = []
+    for block in blocks:
+        n_samples += len(block)
+        buffer = np.concatenate([buffer, block])
+        n_ready = (len(buffer) - n_fft) // hop_length + 1
+        if n_ready > 0:
+            parts.append(_frame_rms(buffer[:(n_ready - 1) * hop_length + n_fft], n_fft, hop_length))
+            buffer = buffer[n_ready * hop_length:]
+
+    remaining = frame_count(n_samples, hop_length) - sum(len(part) for part in parts)
+    if remaining > 0:
+        needed = (remaining - 1) * hop_length + n_fft
+        buffer = np.pad(buffer, (0, max(needed - len(buffer), 0)))[:needed]
+        parts.append(_frame_rms(buffer, n_fft, hop_length))
+    return np.concatenate(parts) if parts else np.zeros(0)
+
+def analyze_wav_blocks(source, wav_key, model_path="models/best_voice_model.pt", progress_callback=None,
+                       block_sec=WINDOWED_BLOCK_SEC):
+    """
+    녹음을 블록 단위로 읽으며 분석 (analyze_wav_file과 같은 결과 형식)
+
+    Parameters:
+    -----------
+    source : str or file-like
+        soundfile로 읽을 수 있는 녹음 파일 경로 또는 탐색 가능한 파일 객체
+    wav_key : str
+        결과에 표시할 파일 이름
+    model_path : str
+        학습된 모델 파일 경로
+    progress_callback : callable or None
+        진행 상황 보고 함수 (처리한 윈도우 수, 예상 전체 윈도우 수)
+    block_sec : float
+        한 번에 읽는 블록 길이(초)
+
+    Returns:
+    --------
+    dict
+        분석 결과 (JSON 형식으로 저장 가능)
+    """
+    duration = audio_duration(source)
+    if duration is None:
+        raise ValueError(f"블록 단위로 읽을 수 없는 형식입니다: {wav_key}")
+
+    # 1차: 프레임 RMS만 계산하여 녹음 전체 기준 침묵 임계값 결정
+    with span('split'):
+        threshold = adaptive_threshold(scan_frame_rms(read_blocks(source, block_sec)))
+    logger.info("블록 단위 분석 시작: %s, 길이: %.2f초, 침묵 판정 RMS 임계값: %.4f", wav_key, duration, threshold)
+
+    # 2차: 블록을 스트리밍 분석기에 차례로 전달
+    analyzer = StreamingAnalyzer(model_path, SAMPLE_RATE, wav_key=wav_key, energy_threshold=threshold)
+    step = MICRO_SEGMENT_DURATION * (1 - SEGMENT_OVERLAP)
+    total = max(int(np.ceil((duration - MICRO_SEGMENT_DURATION / 2) / step)), 0)
+    if progress_callback is not None:
+        progress_callback(0, total)
+
+    for block in read_blocks(source, block_sec):
+        analyzer.feed(block)
+        if progress_callback is not None:
+            progress_callback(min(analyzer.windows_done, total), total)
+
+    result = analyzer.finish()
+    if progress_callback is not None:
+        progress_callback(total, total)
+    return result
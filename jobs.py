@@ -0,0 +1,146 @@
+"""
+비동기 분석 작업 관리
+
+업로드 요청은 작업 ID만 받고 바로 반환하며, 분석은 크기가 제한된 작업자 풀에서
+실행됩니다. 클라이언트는 작업 상태를 폴링하거나 SSE 스트림으로 진행 상황을 받습니다.
+"""
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# 작업 상태
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+# 상수 정의
+DEFAULT_MAX_WORKERS = 2       # 동시에 실행할 분석 작업 수
+DEFAULT_MAX_PENDING = 16      # 대기 + 실행 중인 작업 최대 수
+DEFAULT_RETENTION_SEC = 600   # 완료된 작업 결과 보관 시간(초)
+
+class JobQueueFull(Exception):
+    """대기 중인 작업이 너무 많아 새 작업을 받을 수 없음"""
+
+class AnalysisJob:
+    """분석 작업 하나의 상태"""
+
+    def __init__(self, job_id, filename=None):
+        self.job_id = job_id
+        self.filename = filename
+        self.status = STATUS_QUEUED
+        self.done = 0
+        self.total = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.version = 0  # 상태가 바뀔 때마다 증가 (SSE 변경 감지용)
+
+    @property
+    def finished(self):
+        return self.status in (STATUS_DONE, STATUS_FAILED)
+
+    def to_dict(self, include_result=True):
+        """JSON 응답용 딕셔너리"""
+        data = {
+            "jobId": self.job_id,
+            "filename": self.filename,
+            "status": self.status,
+            "progress": {"done": self.done, "total": self.total}
+        }
+        if self.error is not None:
+            data["error"] = self.error
+        if include_result and self.status == STATUS_DONE:
+            data["result"] = self.result
+        return data
+
+class JobManager:
+    """작업자 풀과 작업 상태 저장소"""
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, max_pending=DEFAULT_MAX_PENDING,
+                 retention_sec=DEFAULT_RETENTION_SEC):
+        self.max_pending = max_pending
+        self.retention_sec = retention_sec
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis')
+        self._jobs = {}
+        self._pending = 0
+        self._changed = threading.Condition()
+
+    def submit(self, func, *args, filename=None, **kwargs):
+        """
+        분석 작업 등록
+
+        func는 progress_callback 키워드 인자를 받아 (완료 수, 전체 수)를 보고해야 하며,
+        None을 반환하면 실패로 처리합니다.
+
+        Returns:
+        --------
+        AnalysisJob
+            등록된 작업
+
+        Raises:
+        -------
+        JobQueueFull
+            대기 중인 작업이 max_pending개 이상인 경우
+        """
+        with self._changed:
+            self._expire_finished()
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(f"대기 중인 분석 작업이 너무 많습니다 ({self._pending}개).")
+            job = AnalysisJob(str(uuid.uuid4()), filename)
+            self._jobs[job.job_id] = job
+            self._pending += 1
+
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def get(self, job_id):
+        """작업 조회 (없으면 None)"""
+        with self._changed:
+            return self._jobs.get(job_id)
+
+    def queue_depth(self):
+        """대기 + 실행 중인 작업 수"""
+        with self._changed:
+            return self._pending
+
+    def wait_for_change(self, job, version, timeout):
+        """작업 버전이 version에서 바뀌거나 timeout이 지날 때까지 대기 후 현재 버전 반환"""
+        with self._changed:
+            self._changed.wait_for(lambda: job.version != version, timeout=timeout)
+            return job.version
+
+    def _update(self, job, **fields):
+        with self._changed:
+            for key, value in fields.items():
+                setattr(job, key, value)
+            job.version += 1
+            self._changed.notify_all()
+
+    def _run(self, job, func, args, kwargs):
+        self._update(job, status=STATUS_RUNNING)
+
+        def progress_callback(done, total):
+            self._update(job, done=done, total=total)
+
+        try:
+            result = func(*args, progress_callback=progress_callback, **kwargs)
+            if result is None:
+                self._update(job, status=STATUS_FAILED, error='분석에 실패했습니다.', finished_at=time.time())
+            else:
+                self._update(job, status=STATUS_DONE, result=result, finished_at=time.time())
+        except Exception as e:
+            self._update(job, status=STATUS_FAILED, error=f'분석 중 오류 발생: {str(e)}', finished_at=time.time())
+        finally:
+            with self._changed:
+                self._pending -= 1
+
+    def _expire_finished(self):
+        """보관 시간이 지난 완료 작업 삭제 (호출자가 잠금 보유)"""
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and now - job.finished_at > self.retention_sec]
+        for job_id in expired:
+            del self._jobs[job_id]
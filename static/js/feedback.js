@@ -18,7 +18,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const storedResult = sessionStorage.getItem('analysisResult');
     
     if (storedResult) {
-        analysisResult = JSON.parse(storedResult);
+        analysisResult = decodeAnalysisResult(JSON.parse(storedResult));
         displayAnalysisResult();
     } else {
         // 분석 결과가 없으면 메시지 표시
@@ -9,6 +9,15 @@ let recordedBlob = null;
 let analysisResult = null;
 let visualizationChart = null;
 
+// 분석 작업 상태 폴링 주기 (SSE를 사용할 수 없을 때)
+const JOB_POLL_INTERVAL_MS = 1000;
+
+// 스트리밍 분석 청크 길이(초)
+const STREAM_CHUNK_SEC = 0.5;
+
+// 녹음 중 스트리밍 분석 상태
+let liveStream = null;
+
 // DOM 요소들
 const playScaleButton = document.getElementById('play-scale');
 const startRecordingButton = document.getElementById('start-recording');
@@ -61,8 +70,9 @@ function startRecording() {
     startRecordingButton.disabled = true;
     stopRecordingButton.disabled = false;
     
-    // 녹음 시작
-    recorder.start();
+    // 녹음 시작 (녹음 중 PCM 청크를 스트리밍 분석으로 전송)
+    liveStream = null;
+    recorder.start(handlePcmChunk);
 }
 
 /**
@@ -78,6 +88,137 @@ function stopRecording() {
     
     // 녹음 종료
     recorder.stop(processRecording);
+    
+    // 스트리밍 분석 마무리
+    finishLiveStream();
+}
+
+/**
+ * 녹음 중 PCM 청크 처리 (STREAM_CHUNK_SEC 단위로 모아 서버에 전송)
+ * @param {Float32Array} samples - PCM 샘플
+ * @param {number} sampleRate - 샘플링 레이트
+ */
+function handlePcmChunk(samples, sampleRate) {
+    if (!liveStream) {
+        liveStream = openLiveStream(sampleRate);
+    }
+    
+    liveStream.pending.push(samples);
+    liveStream.pendingLength += samples.length;
+    
+    if (liveStream.pendingLength >= sampleRate * STREAM_CHUNK_SEC) {
+        const state = liveStream;
+        const chunk = takePendingSamples(state);
+        state.queue = state.queue.then(info => sendStreamChunk(state, info, chunk));
+    }
+}
+
+/**
+ * 스트리밍 분석 세션 시작
+ * @param {number} sampleRate - 샘플링 레이트
+ * @returns {Object} 스트리밍 상태
+ */
+function openLiveStream(sampleRate) {
+    const state = {
+        pending: [],
+        pendingLength: 0,
+        segments: [],
+        queue: null
+    };
+    
+    // 청크는 순서대로 전송 (이전 요청이 끝난 뒤 다음 청크 전송)
+    state.queue = fetch(`/stream?sr=${sampleRate}`, { method: 'POST' })
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) {
+                throw new Error(data.error || '스트리밍 분석을 시작할 수 없습니다.');
+            }
+            return data;
+        });
+    
+    return state;
+}
+
+/**
+ * 모아 둔 PCM 샘플을 하나의 버퍼로 합침
+ * @param {Object} state - 스트리밍 상태
+ * @returns {Float32Array} 합친 샘플
+ */
+function takePendingSamples(state) {
+    const chunk = new Float32Array(state.pendingLength);
+    let offset = 0;
+    state.pending.forEach(samples => {
+        chunk.set(samples, offset);
+        offset += samples.length;
+    });
+    
+    state.pending = [];
+    state.pendingLength = 0;
+    return chunk;
+}
+
+/**
+ * PCM 청크 전송 후 새로 완료된 세그먼트 표시
+ * @param {Object} state - 스트리밍 상태
+ * @param {Object} info - 스트리밍 세션 정보
+ * @param {Float32Array} chunk - PCM 청크
+ */
+function sendStreamChunk(state, info, chunk) {
+    return fetch(info.chunkUrl, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/octet-stream' },
+        body: chunk.buffer
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (!data.success) {
+            throw new Error(data.error || '스트리밍 분석 중 오류가 발생했습니다.');
+        }
+        
+        state.segments.push(...data.segments);
+        analysisStatusText.textContent = `실시간 분석 중... (${state.segments.length}개 세그먼트)`;
+        return info;
+    });
+}
+
+/**
+ * 남은 샘플을 보내고 최종 분석 결과 표시
+ */
+function finishLiveStream() {
+    if (!liveStream) {
+        return;
+    }
+    
+    const state = liveStream;
+    const chunk = takePendingSamples(state);
+    
+    analysisStatusText.textContent = '분석 마무리 중...';
+    analysisLoader.classList.add('active');
+    
+    state.queue
+        .then(info => fetch(`${info.finishUrl}?format=compact`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/octet-stream' },
+            body: chunk.buffer
+        }))
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) {
+                throw new Error(data.error || '스트리밍 분석 중 오류가 발생했습니다.');
+            }
+            
+            // 분석 결과 저장 및 표시 (압축 형식 복원)
+            analysisResult = decodeAnalysisResult(data.result);
+            analysisStatusText.textContent = '분석 완료';
+            analysisLoader.classList.remove('active');
+            displayAnalysisResult();
+        })
+        .catch(error => {
+            // 스트리밍 분석에 실패하면 녹음 파일 업로드 분석 사용
+            console.error('스트리밍 분석 오류:', error);
+            analysisStatusText.textContent = '실시간 분석 실패 - 분석 시작 버튼으로 다시 분석하세요.';
+            analysisLoader.classList.remove('active');
+        });
 }
 
 /**
@@ -112,6 +253,12 @@ function analyzeRecording() {
     const formData = new FormData();
     formData.append('audio', recordedBlob, 'recording.wav');
     
+    // 분석은 백그라운드 작업으로 등록하고 진행 상황을 받음
+    formData.append('mode', 'async');
+    
+    // 긴 녹음도 응답이 작도록 압축 형식 요청 (작업 상태/이벤트 URL에도 적용됨)
+    formData.append('format', 'compact');
+    
     // 서버에 오디오 업로드 및 분석
     fetch('/upload', {
         method: 'POST',
@@ -119,19 +266,28 @@ function analyzeRecording() {
     })
     .then(response => response.json())
     .then(data => {
-        if (data.success) {
-            // 분석 결과 저장
-            analysisResult = data.result;
-            
-            // 분석 상태 업데이트
-            analysisStatusText.textContent = '분석 완료';
-            analysisLoader.classList.remove('active');
-            
-            // 결과 표시
-            displayAnalysisResult();
-        } else {
+        if (!data.success) {
             throw new Error(data.error || '파일 업로드 중 오류가 발생했습니다.');
         }
+        
+        // 동기 모드 응답은 결과를 바로 포함
+        if (data.result) {
+            return data.result;
+        }
+        
+        // 비동기 작업 완료 대기
+        return waitForJob(data);
+    })
+    .then(result => {
+        // 분석 결과 저장 (압축 형식 복원)
+        analysisResult = decodeAnalysisResult(result);
+        
+        // 분석 상태 업데이트
+        analysisStatusText.textContent = '분석 완료';
+        analysisLoader.classList.remove('active');
+        
+        // 결과 표시
+        displayAnalysisResult();
     })
     .catch(error => {
         console.error('오류:', error);
@@ -143,6 +299,68 @@ function analyzeRecording() {
     });
 }
 
+/**
+ * 분석 작업 진행 상황 표시
+ */
+function updateJobProgress(job) {
+    const progress = job.progress || {};
+    if (progress.total > 0) {
+        analysisStatusText.textContent = `분석 중... (${progress.done}/${progress.total})`;
+    }
+}
+
+/**
+ * 분석 작업 완료 대기 (SSE 사용, 지원하지 않거나 연결이 끊기면 폴링)
+ */
+function waitForJob(job) {
+    if (!window.EventSource) {
+        return pollJob(job.statusUrl);
+    }
+    
+    return new Promise((resolve, reject) => {
+        const source = new EventSource(job.eventsUrl);
+        
+        source.addEventListener('progress', event => {
+            updateJobProgress(JSON.parse(event.data));
+        });
+        
+        source.addEventListener('done', event => {
+            source.close();
+            resolve(JSON.parse(event.data).result);
+        });
+        
+        source.addEventListener('failed', event => {
+            source.close();
+            reject(new Error(JSON.parse(event.data).error || '분석에 실패했습니다.'));
+        });
+        
+        source.onerror = () => {
+            source.close();
+            pollJob(job.statusUrl).then(resolve, reject);
+        };
+    });
+}
+
+/**
+ * 분석 작업 상태 폴링
+ */
+function pollJob(statusUrl) {
+    return fetch(statusUrl)
+        .then(response => response.json())
+        .then(job => {
+            if (job.status === 'done') {
+                return job.result;
+            }
+            if (job.status === 'failed' || job.error) {
+                throw new Error(job.error || '분석에 실패했습니다.');
+            }
+            
+            updateJobProgress(job);
+            return new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS))
+                .then(() => pollJob(statusUrl));
+        });
+}
+
 /**
  * 분석 결과 표시
  */
@@ -1,18 +1,26 @@
 /**
  * 오디오 녹음 관리 JavaScript 파일
  * 브라우저의 MediaRecorder API를 사용하여 오디오 녹음 기능을 구현합니다.
+ * 스트리밍 분석을 위해 녹음 중인 PCM 샘플도 청크 단위로 전달할 수 있습니다.
  */
 
+// 스트리밍 분석용 PCM 설정
+const PCM_SAMPLE_RATE = 22050;   // 서버 분석 샘플링 레이트 (지원하지 않으면 브라우저 기본값 사용)
+const PCM_BUFFER_SIZE = 4096;    // 한 번에 전달할 샘플 수
+
 // 레코더 객체
 let recorder = {
     stream: null,
     mediaRecorder: null,
     audioChunks: [],
+    audioContext: null,
+    pcmProcessor: null,
     
     /**
      * 녹음 초기화 및 시작
+     * @param {Function} onPcmChunk - (선택) 녹음 중 PCM 청크를 받을 콜백 (Float32Array, 샘플링 레이트)
      */
-    start: function() {
+    start: function(onPcmChunk) {
         this.audioChunks = [];
         
         // 마이크 접근 권한 요청
@@ -30,6 +38,11 @@ let recorder = {
                     }
                 };
                 
+                // 스트리밍 분석용 PCM 캡처
+                if (onPcmChunk && typeof onPcmChunk === 'function') {
+                    this.startPcmCapture(stream, onPcmChunk);
+                }
+                
                 // 녹음 시작
                 this.mediaRecorder.start();
                 console.log('녹음이 시작되었습니다.');
@@ -45,6 +58,51 @@ let recorder = {
             });
     },
     
+    /**
+     * 마이크 스트림에서 PCM 샘플 캡처 시작
+     * @param {MediaStream} stream - 마이크 스트림
+     * @param {Function} onPcmChunk - PCM 청크 콜백
+     */
+    startPcmCapture: function(stream, onPcmChunk) {
+        const AudioContextClass = window.AudioContext || window.webkitAudioContext;
+        if (!AudioContextClass) {
+            return;
+        }
+        
+        try {
+            this.audioContext = new AudioContextClass({ sampleRate: PCM_SAMPLE_RATE });
+        } catch (error) {
+            // 샘플링 레이트 지정을 지원하지 않으면 기본값 사용 (서버에서 리샘플링)
+            this.audioContext = new AudioContextClass();
+        }
+        
+        const source = this.audioContext.createMediaStreamSource(stream);
+        this.pcmProcessor = this.audioContext.createScriptProcessor(PCM_BUFFER_SIZE, 1, 1);
+        this.pcmProcessor.onaudioprocess = (event) => {
+            // 입력 버퍼는 재사용되므로 복사하여 전달
+            const samples = new Float32Array(event.inputBuffer.getChannelData(0));
+            onPcmChunk(samples, this.audioContext.sampleRate);
+        };
+        
+        source.connect(this.pcmProcessor);
+        this.pcmProcessor.connect(this.audioContext.destination);
+    },
+    
+    /**
+     * PCM 캡처 종료
+     */
+    stopPcmCapture: function() {
+        if (this.pcmProcessor) {
+            this.pcmProcessor.onaudioprocess = null;
+            this.pcmProcessor.disconnect();
+            this.pcmProcessor = null;
+        }
+        if (this.audioContext) {
+            this.audioContext.close();
+            this.audioContext = null;
+        }
+    },
+    
     /**
      * 녹음 종료 및 처리
      * @param {Function} callback - 녹음 완료 후 실행할 콜백 함수
@@ -56,6 +114,9 @@ let recorder = {
             return;
         }
         
+        // PCM 캡처는 즉시 종료 (남은 청크는 호출자가 마무리)
+        this.stopPcmCapture();
+        
         // 녹음 종료 이벤트 핸들러
         this.mediaRecorder.onstop = () => {
             // 오디오 데이터 처리
@@ -0,0 +1,61 @@
+/**
+ * 분석 결과 형식 JavaScript 파일
+ * 압축 형식(format=compact) 결과를 기본 결과 형식으로 복원합니다.
+ */
+
+// 열 배열로 전송되는 결과 목록
+const COMPACT_COLUMNAR_KEYS = ['segments', 'consolidatedSegments', 'pitchGroups'];
+
+// 압축 형식의 메타데이터 키 (복원한 결과에는 포함하지 않음)
+const COMPACT_METADATA_KEYS = ['format', 'version', 'labels', 'texts', 'labelColumns', 'textColumns'];
+
+/**
+ * 열 배열을 객체 목록으로 복원
+ * @param {Object} columns - 키별 열 배열
+ * @param {Object} lookups - 키별 사전 (라벨/피드백 열)
+ * @returns {Array} 객체 목록 (null 값은 키 생략)
+ */
+function compactColumnsToRows(columns, lookups) {
+    const keys = Object.keys(columns);
+    const rowCount = keys.length > 0 ? columns[keys[0]].length : 0;
+    const rows = [];
+
+    for (let i = 0; i < rowCount; i++) {
+        const row = {};
+        keys.forEach(key => {
+            const value = columns[key][i];
+            if (value === null || value === undefined) {
+                return;
+            }
+            row[key] = lookups[key] ? lookups[key][value] : value;
+        });
+        rows.push(row);
+    }
+    return rows;
+}
+
+/**
+ * 분석 결과 복원 (압축 형식이 아니면 그대로 반환)
+ * @param {Object} result - 서버 분석 결과
+ * @returns {Object} 기본 형식 분석 결과
+ */
+function decodeAnalysisResult(result) {
+    if (!result || result.format !== 'compact') {
+        return result;
+    }
+
+    const lookups = {};
+    result.labelColumns.forEach(key => { lookups[key] = result.labels; });
+    result.textColumns.forEach(key => { lookups[key] = result.texts; });
+
+    const decoded = {};
+    Object.keys(result).forEach(key => {
+        if (COMPACT_METADATA_KEYS.includes(key)) {
+            return;
+        }
+        const value = result[key];
+        const columnar = COMPACT_COLUMNAR_KEYS.includes(key) && value && !Array.isArray(value);
+        decoded[key] = columnar ? compactColumnsToRows(value, lookups) : value;
+    });
+    return decoded;
+}
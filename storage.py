@@ -0,0 +1,228 @@
+"""
+업로드 녹음 저장소 관리
+
+업로드된 녹음은 요청 처리 스레드가 아닌 전용 저장 스레드에서 디스크에 씁니다.
+보관 기간(TTL)이 지난 파일과, 총 크기 상한을 넘을 때 가장 먼저 저장된 파일부터
+삭제합니다. 저장된 녹음은 분석이 끝난 뒤 다시 읽지 않으므로 저장 순서(수정 시각)가 곧 사용
+순서입니다. 분석이 끝난 녹음은 선택적으로 무손실 FLAC으로 압축하여 보관합니다.
+
+저장소 디렉터리의 오디오 파일은 모두 삭제 대상이므로, 저장소 전용 디렉터리(버전 관리에
+포함되지 않는 곳)를 사용해야 합니다. 정리는 저장할 때마다, 그리고 서버가 cleanup_async를
+호출할 때 실행되며 객체를 만드는 것만으로는 파일을 지우지 않습니다.
+"""
+import os
+import time
+import shutil
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# 상수 정의
+DEFAULT_TTL_SEC = 7 * 24 * 3600          # 녹음 보관 기간(초), 0이면 기간 제한 없음
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024   # 저장소 총 크기 상한 (1GB), 0이면 제한 없음
+LOSSLESS_SUBTYPES = {'PCM_S8', 'PCM_U8', 'PCM_16', 'PCM_24'}  # FLAC으로 무손실 변환 가능한 형식
+TMP_SUFFIX = '.tmp'
+AUDIO_EXTENSIONS = ('.wav', '.flac')  # 저장소가 관리하는 파일 (README 등 다른 파일은 건드리지 않음)
+
+logger = logging.getLogger(__name__)
+
+class UploadStorage:
+    """업로드 디렉터리의 비동기 저장, 보관 기간, 크기 상한, 압축 관리"""
+
+    def __init__(self, root, ttl_sec=DEFAULT_TTL_SEC, max_bytes=DEFAULT_MAX_BYTES, compress=False):
+        self.root = root
+        self.ttl_sec = ttl_sec
+        self.max_bytes = max_bytes
+        self.compress = compress
+
+        os.makedirs(root, exist_ok=True)
+
+        # 디스크 작업은 단일 스레드에서 순서대로 처리
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='storage')
+        self._lock = threading.Lock()
+        self._pinned = set()  # 분석 중이라 삭제하면 안 되는 파일
+
+        self.writes = 0
+        self.bytes_written = 0
+        self.expired = 0
+        self.evicted = 0
+        self.compressed = 0
+        self.bytes_saved = 0
+
+    def cleanup_async(self):
+        """보관 기간/크기 상한 정리를 백그라운드에서 실행 (서버 시작 시 호출)"""
+        return self._executor.submit(self.enforce_limits)
+
+    def path(self, filename):
+        """저장소 안의 파일 경로"""
+        return os.path.join(self.root, filename)
+
+    def save_async(self, data, filename):
+        """
+        녹음 바이트를 백그라운드에서 저장
+
+        저장이 끝날 때까지 파일은 삭제 대상에서 제외되며, 분석이 끝나면 release 또는
+        archive_async로 해제해야 합니다.
+
+        Returns:
+        --------
+        concurrent.futures.Future
+            저장 완료 시 파일 경로를 결과로 가지는 Future
+        """
+        with self._lock:
+            self._pinned.add(filename)
+        return self._executor.submit(self._write, data, filename)
+
+    def save_stream(self, stream, filename):
+        """
+        파일 객체 내용을 메모리에 모두 올리지 않고 바로 저장 (긴 녹음 업로드용)
+
+        save_async와 같이 분석이 끝날 때까지 삭제 대상에서 제외됩니다.
+
+        Returns:
+        --------
+        str
+            저장한 파일 경로
+        """
+        with self._lock:
+            self._pinned.add(filename)
+        path = self.path(filename)
+        tmp_path = path + TMP_SUFFIX
+        with open(tmp_path, 'wb') as f:
+            shutil.copyfileobj(stream, f)
+        os.replace(tmp_path, path)
+
+        size = os.path.getsize(path)
+        with self._lock:
+            self.writes += 1
+            self.bytes_written += size
+        self._executor.submit(self.enforce_limits)
+        return path
+
+    def release(self, filename):
+        """분석이 끝난 파일을 삭제 대상에 다시 포함"""
+        with self._lock:
+            self._pinned.discard(filename)
+
+    def archive_async(self, filename):
+        """분석이 끝난 파일 해제 후 (설정된 경우) 백그라운드에서 FLAC 압축"""
+        self.release(filename)
+        if self.compress:
+            return self._executor.submit(self._compress, filename)
+        return None
+
+    def discard_async(self, filename):
+        """분석하지 않기로 한 업로드를 해제하고 백그라운드에서 삭제 (진행 중인 저장이 끝난 뒤 실행)"""
+        self.release(filename)
+        return self._executor.submit(self._remove, filename)
+
+    def stats(self):
+        """저장소 상태 반환"""
+        entries = self._entries()
+        return {
+            "root": self.root,
+            "files": len(entries),
+            "totalBytes": sum(size for _, size, _ in entries),
+            "maxBytes": self.max_bytes,
+            "ttlSec": self.ttl_sec,
+            "compress": self.compress,
+            "writes": self.writes,
+            "bytesWritten": self.bytes_written,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "compressed": self.compressed,
+            "bytesSaved": self.bytes_saved
+        }
+
+    def _write(self, data, filename):
+        path = self.path(filename)
+        tmp_path = path + TMP_SUFFIX
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self.writes += 1
+            self.bytes_written += len(data)
+        self.enforce_limits()
+        return path
+
+    def _remove(self, filename):
+        try:
+            os.remove(self.path(filename))
+        except OSError:
+            pass
+
+    def _compress(self, filename):
+        """WAV를 무손실 FLAC으로 변환 (PCM 정수 형식이 아니거나 읽을 수 없으면 그대로 둠)"""
+        import soundfile as sf  # 압축을 사용할 때만 임포트
+
+        path = self.path(filename)
+        try:
+            info = sf.info(path)
+            if info.format != 'WAV' or info.subtype not in LOSSLESS_SUBTYPES:
+                return None
+            data, sr = sf.read(path, dtype='int32' if info.subtype == 'PCM_24' else 'int16', always_2d=True)
+        except Exception:
+            return None
+
+        flac_path = os.path.splitext(path)[0] + '.flac'
+        original_size = os.path.getsize(path)
+        stat = os.stat(path)
+        try:
+            sf.write(flac_path + TMP_SUFFIX, data, sr, format='FLAC',
+                     subtype='PCM_24' if info.subtype == 'PCM_24' else 'PCM_16')
+            os.replace(flac_path + TMP_SUFFIX, flac_path)
+            # 보관 기간 계산을 위해 원본 시각 유지
+            os.utime(flac_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            os.remove(path)
+        except Exception as e:
+            logger.error("녹음 압축 중 오류 발생 (%s): %s", filename, e)
+            return None
+
+        self.compressed += 1
+        self.bytes_saved += original_size - os.path.getsize(flac_path)
+        return flac_path
+
+    def _entries(self):
+        """저장된 파일 (수정 시각, 크기, 이름) 목록"""
+        entries = []
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return entries
+        for name in names:
+            if not name.lower().endswith(AUDIO_EXTENSIONS):
+                continue
+            try:
+                stat = os.stat(self.path(name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        return entries
+
+    def enforce_limits(self):
+        """보관 기간이 지난 파일 삭제 후 총 크기가 상한 이하가 될 때까지 먼저 저장된 파일부터 삭제"""
+        now = time.time()
+        with self._lock:
+            pinned = set(self._pinned)
+
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+
+        for mtime, size, name in entries:
+            if name in pinned:
+                continue
+            expired = self.ttl_sec and now - mtime > self.ttl_sec
+            over_limit = self.max_bytes and total > self.max_bytes
+            if not expired and not over_limit:
+                continue
+            try:
+                os.remove(self.path(name))
+            except OSError:
+                continue
+            total -= size
+            if expired:
+                self.expired += 1
+            else:
+                self.evicted += 1
@@ -0,0 +1,20 @@
+"""
+WSGI 진입점
+
+    gunicorn -w 2 wsgi:app
+
+app 모듈은 임포트만으로는 백그라운드 작업을 시작하지 않으므로, 이 모듈이 작업자 프로세스마다
+start_background_tasks를 호출하여 업로드 저장소 정리와 오디오 스택 로드 + 워밍업을 시작합니다.
+/ready는 워밍업이 끝난 뒤에 200을 반환하므로 로드 밸런서 준비 상태 확인에 사용합니다.
+
+작업자를 fork하기 전에 앱을 임포트하는 설정(gunicorn --preload 등)에서는 fork 전에 시작한
+스레드가 작업자에 복사되지 않으므로, 이 모듈 대신 fork 뒤 훅에서 호출해야 합니다.
+
+    # gunicorn.conf.py
+    def post_fork(server, worker):
+        from app import start_background_tasks
+        start_background_tasks()
+"""
+from app import app, start_background_tasks
+
+start_background_tasks()